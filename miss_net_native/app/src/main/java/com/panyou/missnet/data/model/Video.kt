@@ -17,7 +17,9 @@ data class Video(
     val tags: List<String> = emptyList()
 ,
     @SerialName("inventory_status") val inventoryStatus: String? = null,
-    @SerialName("detail_status") val detailStatus: String? = null
+    @SerialName("detail_status") val detailStatus: String? = null,
+    @SerialName("content_key") val contentKey: String? = null,
+    val variant: String? = null
 ) {
     val displayDate: String?
         get() = sourceReleaseDate?.takeIf { it.isNotBlank() }
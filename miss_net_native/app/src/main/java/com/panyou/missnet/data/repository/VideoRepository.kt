@@ -8,6 +8,8 @@ import io.github.jan.supabase.postgrest.query.Order
 import io.github.jan.supabase.postgrest.rpc
 import kotlinx.serialization.SerialName
 import kotlinx.serialization.Serializable
+import kotlinx.serialization.json.JsonArray
+import kotlinx.serialization.json.JsonPrimitive
 import kotlinx.serialization.json.buildJsonObject
 import kotlinx.serialization.json.put
 import javax.inject.Inject
@@ -204,6 +206,20 @@ class VideoRepository @Inject constructor(
         }
     }
 
+    suspend fun getVideoVariants(externalIds: List<String>): Map<String, List<VideoVariant>> {
+        if (externalIds.isEmpty()) return emptyMap()
+        return try {
+            supabase.postgrest
+                .rpc("get_video_variants", buildJsonObject {
+                    put("external_ids", JsonArray(externalIds.map { JsonPrimitive(it) }))
+                })
+                .decodeList<VideoVariantRow>()
+                .associate { it.externalId to it.variants }
+        } catch (_: Exception) {
+            emptyMap()
+        }
+    }
+
     private suspend fun getRecentVideosDirect(limit: Int = 20, category: String = "new", offset: Int = 0): List<Video> {
         return try {
             rememberVideos(supabase.postgrest["videos"].select {
@@ -434,3 +450,19 @@ data class TagAggregateRow(
     @SerialName("video_count") val videoCount: Int = 0,
     @SerialName("latest_release_date") val latestReleaseDate: String? = null,
 )
+
+@Serializable
+data class VideoVariant(
+    @SerialName("external_id") val externalId: String,
+    val variant: String = "original",
+    val title: String? = null,
+    @SerialName("source_url") val sourceUrl: String? = null,
+    @SerialName("cover_url") val coverUrl: String? = null,
+)
+
+@Serializable
+data class VideoVariantRow(
+    @SerialName("external_id") val externalId: String,
+    @SerialName("content_key") val contentKey: String,
+    val variants: List<VideoVariant> = emptyList(),
+)
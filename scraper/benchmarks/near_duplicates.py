@@ -0,0 +1,106 @@
+# Near-duplicate index benchmark on a synthetic catalog-sized corpus.
+#
+#   python -m scraper.benchmarks.near_duplicates --rows 200000 --batch 50
+#
+# Needs the scraper requirements installed, since it imports scraper.main.
+import argparse
+import json
+import random
+import time
+
+from scraper import main as scraper
+
+
+def random_word(rng: random.Random) -> str:
+    return "".join(chr(rng.randint(0x4E00, 0x9FA5)) for _ in range(rng.randint(2, 4)))
+
+
+def mutate_title(title: str, rng: random.Random) -> str:
+    choice = rng.randrange(3)
+    if choice == 0:
+        return f"【高清】{title}"
+    if choice == 1:
+        return title.replace(" ", "  ") + " !"
+    index = rng.randrange(len(title))
+    return title[:index] + title[index + 1:]
+
+
+def build_corpus(rows: int, duplicate_ratio: float = 0.05, seed: int = 7) -> tuple[list[dict], dict]:
+    rng = random.Random(seed)
+    vocabulary = [random_word(rng) for _ in range(5000)]
+    corpus = []
+    planted = {}
+    for index in range(rows):
+        if corpus and rng.random() < duplicate_ratio:
+            original = corpus[rng.randrange(len(corpus))]
+            external_id = f"51cg_{900000 + index}"
+            repost = rng.random() < 0.5
+            corpus.append({
+                "external_id": external_id,
+                "title": mutate_title(original["title"], rng),
+                "cover_url": original["cover_url"] if repost else f"https://img.example/{external_id}.jpg",
+                "source_url": f"https://51cg1.com/archives/{900000 + index}/",
+            })
+            planted[external_id] = original["external_id"]
+            continue
+        code = f"{''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(4))}-{index:06d}"
+        corpus.append({
+            "external_id": code,
+            "title": f"{code.upper()} " + " ".join(rng.choice(vocabulary) for _ in range(rng.randint(6, 12))),
+            "cover_url": f"https://fourhoi.com/{code}/cover-n.jpg",
+            "source_url": f"https://missav.ws/{code}",
+        })
+    return corpus, planted
+
+
+def run_benchmark(rows: int = 50000, batch: int = 50, duplicate_ratio: float = 0.05, seed: int = 7) -> dict:
+    corpus, planted = build_corpus(rows, duplicate_ratio, seed)
+
+    started = time.perf_counter()
+    fingerprints = [scraper.video_fingerprint(video) for video in corpus]
+    fingerprint_seconds = time.perf_counter() - started
+
+    index = scraper.NearDuplicateIndex()
+    matches = {}
+    batch_seconds = []
+    for offset in range(0, len(fingerprints), batch):
+        batch_started = time.perf_counter()
+        for fingerprint in fingerprints[offset:offset + batch]:
+            if fingerprint is None:
+                continue
+            target = index.match(fingerprint)
+            if target:
+                fingerprint["duplicate_of"] = target
+                matches[fingerprint["external_id"]] = target
+            index.add(fingerprint)
+        batch_seconds.append(time.perf_counter() - batch_started)
+
+    # A planted duplicate may legitimately resolve to an earlier duplicate of the same original.
+    true_positive = sum(1 for external_id, target in matches.items() if external_id in planted and index.canonical(planted[external_id]) == target)
+    half = len(batch_seconds) // 2
+    return {
+        "rows": rows,
+        "batch": batch,
+        "planted_duplicates": len(planted),
+        "matched": len(matches),
+        "precision": round(true_positive / len(matches), 4) if matches else 1.0,
+        "recall": round(true_positive / len(planted), 4) if planted else 1.0,
+        "fingerprint_us_per_row": round(fingerprint_seconds / rows * 1e6, 2),
+        "match_us_per_row": round(sum(batch_seconds) / rows * 1e6, 2),
+        # Per-batch cost in the second half of the run vs the first: close to 1.0 means O(new rows).
+        "late_to_early_batch_ratio": round(sum(batch_seconds[half:]) / max(sum(batch_seconds[:half]), 1e-9), 2) if half else 1.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the near-duplicate index on a synthetic corpus")
+    parser.add_argument("--rows", type=int, default=200000)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--duplicate-ratio", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.batch, args.duplicate_ratio, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# Per-stage timings for the list-row record pipeline, checked against a stored baseline.
+#
+#   python -m scraper.benchmarks.record_pipeline --scale 100k
+#   python -m scraper.benchmarks.record_pipeline --scale 10k --update-baseline
+#
+# Timings are stored as multiples of a fixed pure-Python calibration loop timed on the same machine.
+# This lets one baseline work on laptops and CI runners. The command exits non-zero when a stage is
+# slower than its baseline by more than the tolerance. scraper/tests/test_perf_regression.py runs
+# the 10k scale together with the unit tests.
+import argparse
+import json
+import pathlib
+import random
+import sys
+import time
+
+from scraper import main as scraper
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+BASELINE_PATH = pathlib.Path(__file__).with_name("record_pipeline_baseline.json")
+DEFAULT_TOLERANCE = 2.5
+CALIBRATION_ITERATIONS = 20_000
+
+TITLE_WORDS = [
+    "新人", "デビュー", "人妻", "中文字幕", "独家", "巨乳", "制服", "女教师", "温泉", "旅行", "出差", "同事",
+    "Exclusive", "Uncensored", "Leak", "Subtitles", "Office", "Married Woman", "School", "First Shot",
+    "Beautiful", "Amateur", "Weekend", "Secret", "Hotel", "Night", "Reunion", "Neighbor",
+]
+TAG_POOL = [
+    "new", "weekly_hot", "monthly_hot", "Subtitles", "Chinese Subtitles", "巨乳", "Big Tits", "中出",
+    "Creampie", "素人", "Amateur", "OL", "人妻", "熟女", "Mature", "独家", "Exclusive", "制服", "Uniform",
+    "Uncensored", "無碼", "Leak", "VR", "4K", "Cosplay", "Solowork", "Variety", "Beautiful Girl",
+]
+PLACEHOLDER_COVERS = [
+    "data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP",
+    "https://missav.ws/img/no-image.png",
+    "",
+]
+DESCRIPTIONS = [
+    "发行日期: 2026-10-01 时长：118分钟 演员: {actor}",
+    "Release date: 2026-09-12 Duration: 01:58:00 Actress: {actor}",
+    "片長 95 分 出演者 {actor} シリーズ 作品",
+    "{actor} の新作。 詳細は後日公開。",
+]
+
+
+def build_rows(rows: int, seed: int = 3) -> list[tuple[dict, dict | None, str]]:
+    rng = random.Random(seed)
+    actors = [f"{rng.choice(['Yua', 'Rin', 'Mao', '美咲', '結衣', '七海'])} {index}" for index in range(2000)]
+    output = []
+    for index in range(rows):
+        external_id = f"{rng.choice(['abc', 'ssis', 'ipx', 'fc2-ppv'])}-{index:07d}"
+        title = f"{external_id.upper()} " + " ".join(rng.choice(TITLE_WORDS) for _ in range(rng.randint(4, 12)))
+        if rng.random() < 0.15:
+            cover_url = rng.choice(PLACEHOLDER_COVERS)
+        else:
+            cover_url = f"https://fourhoi.com/{external_id}/cover-{rng.choice('nt')}.jpg?class=normal"
+        video = {
+            "external_id": external_id,
+            "title": title,
+            "source_url": f"https://missav.ws/{rng.choice(['', 'en/', 'cn/'])}{external_id}",
+            "cover_url": cover_url,
+            "duration": rng.choice([None, "0", "7080", "01:58:00"]),
+            "actors": [],
+            "tags": rng.sample(TAG_POOL, rng.randint(0, 6)),
+        }
+        existing = None
+        if rng.random() < 0.6:
+            existing = {
+                "external_id": external_id,
+                "title": title,
+                "source_url": video["source_url"],
+                "source_site": "missav",
+                "cover_url": f"https://fourhoi.com/{external_id}/cover-n.jpg",
+                "duration": "01:58:00",
+                "release_date": "2026-10-01",
+                "actors": rng.sample(actors, rng.randint(1, 8)),
+                "tags": rng.sample(TAG_POOL, rng.randint(4, 16)),
+                "categories": ["new"],
+                "detail_fetched_at": "2026-10-01T00:00:00+00:00",
+            }
+        description = rng.choice(DESCRIPTIONS).format(actor=rng.choice(actors))
+        output.append((video, existing, description))
+    return output
+
+
+def build_queue_payload(data) -> str:
+    return json.dumps([
+        {"external_id": video["external_id"], "source_url": video["source_url"], "title": video["title"]}
+        for video, _, _ in data
+    ], ensure_ascii=False)
+
+
+def calibrate() -> float:
+    best = None
+    for _ in range(5):
+        started = time.perf_counter()
+        rows = []
+        for index in range(CALIBRATION_ITERATIONS):
+            text = f"Item {index} タイトル"
+            rows.append({"key": text.lower(), "parts": text.split(), "size": len(text)})
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def stage_normalize_taxonomy(data, queue_payload):
+    for video, existing, _ in data:
+        scraper.normalize_taxonomy_values(video["tags"] + (existing["tags"] if existing else []))
+
+
+def stage_map_categories(data, queue_payload):
+    for video, _, _ in data:
+        scraper.map_categories(video["title"], video["tags"])
+
+
+def stage_extract_duration(data, queue_payload):
+    for _, _, description in data:
+        scraper.extract_duration_from_text(description)
+
+
+def stage_parse_queue(data, queue_payload):
+    scraper.parse_null_cover_queue(queue_payload)
+
+
+def stage_merge(data, queue_payload):
+    for video, existing, _ in data:
+        scraper.merge_video_record(video, existing)
+
+
+def stage_pipeline(data, queue_payload):
+    for video, existing, _ in data:
+        scraper.video_payload(scraper.build_missav_list_row(dict(video), "new", existing))
+
+
+STAGES = {
+    "normalize_taxonomy_values": stage_normalize_taxonomy,
+    "map_categories": stage_map_categories,
+    "extract_duration_from_text": stage_extract_duration,
+    "parse_null_cover_queue": stage_parse_queue,
+    "merge_video_record": stage_merge,
+    "normalize_merge_payload": stage_pipeline,
+}
+
+
+def run_benchmark(scale: str = "10k", repeat: int = 3, seed: int = 3) -> dict:
+    rows = SCALES[scale]
+    data = build_rows(rows, seed)
+    queue_payload = build_queue_payload(data)
+    unit = calibrate()
+    stages = {}
+    for name, stage in STAGES.items():
+        best = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            stage(data, queue_payload)
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        stages[name] = {
+            "us_per_row": round(best * 1e6 / rows, 3),
+            "units": round(best / unit, 3),
+        }
+    return {"scale": scale, "rows": rows, "calibration_seconds": round(unit, 6), "stages": stages}
+
+
+def load_baseline(path: pathlib.Path = BASELINE_PATH) -> dict:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(result: dict, path: pathlib.Path = BASELINE_PATH):
+    baseline = load_baseline(path)
+    baseline[result["scale"]] = {name: stage["units"] for name, stage in result["stages"].items()}
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+def find_regressions(result: dict, baseline: dict, tolerance: float = DEFAULT_TOLERANCE) -> list[dict]:
+    expected = baseline.get(result["scale"]) or {}
+    regressions = []
+    for name, stage in result["stages"].items():
+        reference = expected.get(name)
+        if not reference:
+            continue
+        ratio = stage["units"] / reference
+        if ratio > tolerance:
+            regressions.append({"stage": name, "units": stage["units"], "baseline": reference, "ratio": round(ratio, 2)})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record pipeline benchmark and regression check")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="10k")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    result = run_benchmark(args.scale, max(1, args.repeat))
+    if args.update_baseline:
+        save_baseline(result)
+        result["regressions"] = []
+    else:
+        result["regressions"] = find_regressions(result, load_baseline(), args.tolerance)
+    print(json.dumps(result, indent=2))
+    if result["regressions"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
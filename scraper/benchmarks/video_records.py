@@ -0,0 +1,167 @@
+# CPU and memory per 100k rows: dict rows (the pre-VideoRecord pipeline, kept below as the
+# reference) vs VideoRecord.
+#
+#   python -m scraper.benchmarks.video_records --rows 100000
+#
+# Needs the scraper requirements installed, since it imports scraper.main.
+import argparse
+import gc
+import json
+import random
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from scraper import main as scraper
+
+
+def legacy_merge_video_record(video: dict, existing: dict | None) -> dict:
+    if not existing:
+        return video
+    merged = dict(video)
+    if (not merged.get("title") or len(str(merged.get("title")).strip()) < 2) and existing.get("title"):
+        merged["title"] = existing.get("title")
+    if not merged.get("source_url") and existing.get("source_url"):
+        merged["source_url"] = existing.get("source_url")
+    merged["source_site"] = merged.get("source_site") or existing.get("source_site") or scraper.infer_source_site(merged.get("source_url"))
+    merged["cover_url"] = scraper.normalize_cover_url(merged.get("cover_url")) or scraper.normalize_cover_url(existing.get("cover_url"))
+    merged["duration"] = scraper.normalize_duration_text(merged.get("duration")) or scraper.normalize_duration_text(existing.get("duration"))
+    merged["release_date"] = scraper.normalize_release_date_text(merged.get("release_date")) or scraper.normalize_release_date_text(existing.get("release_date"))
+    merged["actors"] = scraper.ordered_unique((existing.get("actors") or []) + (merged.get("actors") or []))
+    merged["tags"] = scraper.normalize_taxonomy_values((existing.get("tags") or []) + (merged.get("tags") or []))
+    merged["categories"] = scraper.normalize_taxonomy_values((existing.get("categories") or []) + (merged.get("categories") or []))
+    merged["cover_status"] = scraper.classify_cover_status(merged.get("cover_url"))
+    merged["inventory_status"] = scraper.classify_inventory_status(merged)
+    merged["detail_status"] = scraper.classify_detail_status(merged)
+    merged["detail_fetched_at"] = (
+        datetime.now(timezone.utc).isoformat()
+        if merged["detail_status"] in {"success", "partial"}
+        else existing.get("detail_fetched_at")
+    )
+    return merged
+
+
+def legacy_normalize_video_record(video: dict) -> dict:
+    record = dict(video)
+    record["is_active"] = True
+    record["source_site"] = record.get("source_site") or scraper.infer_source_site(record.get("source_url"))
+    record["tags"] = scraper.normalize_taxonomy_values(record.get("tags", []))
+    record["categories"] = scraper.normalize_taxonomy_values(record.get("categories", []))
+    record["actors"] = scraper.ordered_unique(record.get("actors", []))
+    record["duration"] = scraper.normalize_duration_text(record.get("duration"))
+    record["release_date"] = scraper.normalize_release_date_text(record.get("release_date"))
+    record["cover_url"] = scraper.normalize_cover_url(record.get("cover_url"))
+    record["cover_status"] = scraper.classify_cover_status(record.get("cover_url"))
+    record["inventory_status"] = scraper.classify_inventory_status(record)
+    record["detail_status"] = scraper.classify_detail_status(record)
+    if record["detail_status"] in {"success", "partial"}:
+        record["detail_fetched_at"] = record.get("detail_fetched_at") or datetime.now(timezone.utc).isoformat()
+    return record
+
+
+def build_inputs(rows: int, seed: int = 11) -> list[tuple[dict, dict | None]]:
+    rng = random.Random(seed)
+    tags = ["new", "weekly_hot", "Subtitles", "巨乳", "中出", "Amateur", "素人", "OL"]
+    inputs = []
+    for index in range(rows):
+        external_id = f"abcd-{index:06d}"
+        video = {
+            "external_id": external_id,
+            "title": f"ABCD-{index:06d} 新人 デビュー 作品 {index}",
+            "cover_url": f"https://fourhoi.com/{external_id}/cover-t.jpg",
+            "source_url": f"https://missav.ws/{external_id}",
+            "duration": rng.choice([None, "0", "01:58:00"]),
+            "actors": [],
+            "categories": [],
+            "tags": [],
+        }
+        existing = None
+        if rng.random() < 0.6:
+            existing = {
+                "external_id": external_id,
+                "title": video["title"],
+                "source_url": video["source_url"],
+                "source_site": "missav",
+                "cover_url": video["cover_url"].replace("cover-t", "cover-n"),
+                "duration": "01:58:00",
+                "release_date": "2026-10-01",
+                "actors": [f"Actor {index % 500}"],
+                "tags": rng.sample(tags, 3),
+                "categories": ["new"],
+                "detail_fetched_at": "2026-10-01T00:00:00+00:00",
+            }
+        inputs.append((video, existing))
+    return inputs
+
+
+def legacy_pipeline(inputs, source_tag: str, chunk_size: int) -> int:
+    rows = []
+    for video, existing in inputs:
+        rows.append(legacy_merge_video_record(
+            {
+                **video,
+                "categories": scraper.normalize_taxonomy_values([source_tag] + (video.get("categories") or [])),
+                "tags": scraper.normalize_taxonomy_values([source_tag] + (video.get("tags") or [])),
+            },
+            existing,
+        ))
+    placeholders = sum(1 for row in rows if scraper.looks_like_placeholder_cover(row.get("cover_url")))
+    normalized = [legacy_normalize_video_record(row) for row in rows]
+    written = 0
+    for chunk in scraper.chunked(normalized, chunk_size):
+        written += len(json.dumps(chunk, ensure_ascii=False))
+    return written + placeholders
+
+
+def record_pipeline(inputs, source_tag: str, chunk_size: int) -> int:
+    rows = []
+    for video, existing in inputs:
+        rows.append(scraper.VideoRecord.from_mapping(video).prepend_taxonomy([source_tag]).merge(existing))
+    placeholders = sum(1 for row in rows if row.placeholder_cover)
+    written = 0
+    for chunk in scraper.chunked(rows, chunk_size):
+        written += len(json.dumps([scraper.video_payload(row) for row in chunk], ensure_ascii=False))
+    return written + placeholders
+
+
+def measure(pipeline, inputs, chunk_size: int) -> dict:
+    gc.collect()
+    started = time.process_time()
+    pipeline(inputs, "new", chunk_size)
+    cpu_seconds = time.process_time() - started
+
+    gc.collect()
+    tracemalloc.start()
+    pipeline(inputs, "new", chunk_size)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"cpu_seconds": cpu_seconds, "peak_bytes": peak}
+
+
+def run_benchmark(rows: int = 100000, chunk_size: int = scraper.SUPABASE_UPSERT_CHUNK_SIZE, seed: int = 11) -> dict:
+    inputs = build_inputs(rows, seed)
+    legacy = measure(legacy_pipeline, inputs, chunk_size)
+    records = measure(record_pipeline, inputs, chunk_size)
+    per_100k = 100000 / rows
+    return {
+        "rows": rows,
+        "legacy_cpu_seconds_per_100k": round(legacy["cpu_seconds"] * per_100k, 3),
+        "record_cpu_seconds_per_100k": round(records["cpu_seconds"] * per_100k, 3),
+        "legacy_peak_mb_per_100k": round(legacy["peak_bytes"] * per_100k / 2**20, 1),
+        "record_peak_mb_per_100k": round(records["peak_bytes"] * per_100k / 2**20, 1),
+        "cpu_ratio": round(records["cpu_seconds"] / legacy["cpu_seconds"], 3),
+        "memory_ratio": round(records["peak_bytes"] / legacy["peak_bytes"], 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark VideoRecord against dict rows")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--chunk-size", type=int, default=scraper.SUPABASE_UPSERT_CHUNK_SIZE)
+    parser.add_argument("--seed", type=int, default=11)
+    args = parser.parse_args()
+    print(json.dumps(run_benchmark(args.rows, args.chunk_size, args.seed), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,11 +3,26 @@ from playwright_stealth import Stealth
 from supabase import create_client, Client
 from dotenv import load_dotenv
 import os
+import abc
 import asyncio
+import contextvars
+import functools
+import gzip
+import hashlib
+import html
 import json
 import random
 import re
-from datetime import datetime, timezone
+import socket
+import sqlite3
+import time
+import unicodedata
+import zlib
+import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager, contextmanager, nullcontext
+from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from html.parser import HTMLParser
 from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse, unquote
 
 # Load environment variables from .env file if present
@@ -183,15 +198,461 @@ SCRAPER_RUN_MODE = os.environ.get("SCRAPER_RUN_MODE", "full").strip().lower()
 SCRAPER_SOURCE_TAGS = env_csv("SCRAPER_SOURCE_TAGS")
 SKIP_51CG = env_bool("SKIP_51CG", False)
 DETAIL_FETCH_POLICY = os.environ.get("DETAIL_FETCH_POLICY", "").strip().lower()
+DETAIL_BACKOFF_BASE_HOURS = env_positive_int("DETAIL_BACKOFF_BASE_HOURS", 6)
+DETAIL_BACKOFF_MAX_HOURS = env_positive_int("DETAIL_BACKOFF_MAX_HOURS", 24 * 14)
 DISCOVER_MISSAV_SOURCES = env_bool("DISCOVER_MISSAV_SOURCES", False)
 DISCOVERED_SOURCE_LIMIT = env_positive_int("DISCOVERED_SOURCE_LIMIT", 60)
+DISCOVERY_CACHE_TTL_HOURS = env_non_negative_float("DISCOVERY_CACHE_TTL_HOURS", 24.0)
+SITEMAP_DISCOVERY = env_bool("SITEMAP_DISCOVERY", False)
+MISSAV_SITEMAP_URL = os.environ.get("MISSAV_SITEMAP_URL", "https://missav.ws/sitemap.xml").strip()
+SITEMAP_MAX_NEW_IDS = env_positive_int("SITEMAP_MAX_NEW_IDS", 500)
+SITEMAP_BATCH_SIZE = env_positive_int("SITEMAP_BATCH_SIZE", 50)
+SITEMAP_SOURCE_TAG = "sitemap"
+NEAR_DUP_DETECTION = env_bool("NEAR_DUP_DETECTION", False)
+NEAR_DUP_MAX_DISTANCE = env_positive_int("NEAR_DUP_MAX_DISTANCE", 3)
+NEAR_DUP_MIN_TITLE_CHARS = env_positive_int("NEAR_DUP_MIN_TITLE_CHARS", 12)
+NEAR_DUP_SEED_PAGE_SIZE = env_positive_int("NEAR_DUP_SEED_PAGE_SIZE", 1000)
+CG_INGEST_MODE = os.environ.get("CG_INGEST_MODE", "auto").strip().lower()
+CG_BASE_URL = os.environ.get("CG_BASE_URL", "https://51cg1.com").strip().rstrip("/")
+CG_API_PER_PAGE = min(env_positive_int("CG_API_PER_PAGE", 100), 100)
+CG_API_INITIAL_LOOKBACK_DAYS = env_non_negative_float("CG_API_INITIAL_LOOKBACK_DAYS", 7.0)
+CG_FEEDS = {
+    "51cg": {"url": f"{CG_BASE_URL}/", "category": None},
+    "51mrds": {"url": f"{CG_BASE_URL}/category/mrds/", "category": "mrds"},
+}
+OUTPUT_SINK = os.environ.get("OUTPUT_SINK", "supabase").strip().lower()
+OUTPUT_SINK_PATH = os.environ.get("OUTPUT_SINK_PATH", "").strip()
+SINK_BUFFER_ROWS = env_positive_int("SINK_BUFFER_ROWS", 1000)
+PROFILE_RUN = env_bool("PROFILE_RUN", False)
+PROFILE_SAMPLE_RATE = min(env_non_negative_float("PROFILE_SAMPLE_RATE", 0.0), 1.0)
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "").strip() or os.path.join(os.getcwd(), "profile")
+PROFILE_SAMPLE_INTERVAL_SECONDS = env_non_negative_float("PROFILE_SAMPLE_INTERVAL_SECONDS", 1.0)
+CATALOG_EXPORT_DIR = os.environ.get("CATALOG_EXPORT_DIR", "").strip()
+CATALOG_PAGE_SIZE = env_positive_int("CATALOG_PAGE_SIZE", 20)
+CATALOG_SECTION_LIMIT = env_positive_int("CATALOG_SECTION_LIMIT", 10)
+CATALOG_WEEKLY_LIMIT = env_positive_int("CATALOG_WEEKLY_LIMIT", 15)
+CATALOG_ACTOR_LIMIT = env_positive_int("CATALOG_ACTOR_LIMIT", 500)
+# Only list crawls change what the browse pages show; backfill, queue and seed modes would re-export
+# an unchanged catalog at the end of every run.
+CATALOG_EXPORT_RUN_MODES = frozenset({"full", "index", "sample"})
+CATALOG_HOME_SECTIONS = ("new", "monthly_hot", "weekly_hot", "uncensored", "subtitled", "vr", "51cg")
+CATALOG_COLUMNS = (
+    "id, external_id, title, cover_url, source_url, duration, source_release_date, created_at, "
+    "actors, tags, categories, inventory_status, detail_status, duplicate_of"
+)
 NULL_COVER_QUEUE_JSON = os.environ.get("NULL_COVER_QUEUE_JSON", "").strip()
 METADATA_QUEUE_JSON = os.environ.get("METADATA_QUEUE_JSON", "").strip()
+BACKFILL_QUEUE_KIND = os.environ.get("BACKFILL_QUEUE_KIND", "null_cover").strip().lower()
+QUEUE_CLAIM_BATCH_SIZE = env_positive_int("QUEUE_CLAIM_BATCH_SIZE", 100)
+QUEUE_LEASE_SECONDS = env_positive_int("QUEUE_LEASE_SECONDS", 900)
+QUEUE_MAX_ATTEMPTS = env_positive_int("QUEUE_MAX_ATTEMPTS", 5)
+QUEUE_MAX_CLAIMS = env_positive_int("QUEUE_MAX_CLAIMS", 500)
+QUEUE_WORKER_ID = os.environ.get("QUEUE_WORKER_ID", "").strip() or f"{socket.gethostname()}-{os.getpid()}"
+HTTP_TIMEOUT_SECONDS = env_non_negative_float("HTTP_TIMEOUT_SECONDS", 15.0)
+HOST_MAX_CONCURRENCY = env_positive_int("HOST_MAX_CONCURRENCY", 8)
+HOST_MIN_INTERVAL_SECONDS = env_non_negative_float("HOST_MIN_INTERVAL_SECONDS", 0.05)
+VERIFY_BATCH_SIZE = env_positive_int("VERIFY_BATCH_SIZE", 5000)
+VERIFY_CONCURRENCY = env_positive_int("VERIFY_CONCURRENCY", 32)
+VERIFY_WRITE_CHUNK_SIZE = env_positive_int("VERIFY_WRITE_CHUNK_SIZE", 500)
+COVER_CHECK_CONCURRENCY = env_positive_int("COVER_CHECK_CONCURRENCY", 64)
+COVER_CHECK_MIN_INTERVAL_SECONDS = env_non_negative_float("COVER_CHECK_MIN_INTERVAL_SECONDS", 0.01)
+COVER_CHECK_PAGE_SIZE = env_positive_int("COVER_CHECK_PAGE_SIZE", 1000)
+COVER_CHECK_MIN_AGE_HOURS = env_non_negative_float("COVER_CHECK_MIN_AGE_HOURS", 24.0)
+COVER_CHECK_MAX_DEAD_RATIO = env_non_negative_float("COVER_CHECK_MAX_DEAD_RATIO", 0.5)
+COVER_CHECK_CACHE_PATH = os.environ.get("COVER_CHECK_CACHE_PATH", "").strip()
+COVER_CHECK_CACHE_SAVE_PAGES = env_positive_int("COVER_CHECK_CACHE_SAVE_PAGES", 10)
+PREDICTIVE_COVER_ENABLED = env_bool("PREDICTIVE_COVER_ENABLED", True)
+PREDICTIVE_COVER_CONCURRENCY = env_positive_int("PREDICTIVE_COVER_CONCURRENCY", 32)
+MISSAV_COVER_BASE_URL = os.environ.get("MISSAV_COVER_BASE_URL", "https://fourhoi.com").strip().rstrip("/")
+MISSAV_VARIANT_SUFFIXES = ("-uncensored-leak", "-chinese-subtitle", "-english-subtitle")
+MISSAV_LOCALE_CODES = {"cn", "en", "ja", "ko", "ms", "th", "de", "fr", "vi", "id", "fil", "pt"}
+MISSAV_VIDEO_ID_RE = re.compile(
+    r"^[a-z0-9]+(?:-[a-z0-9]+)*-\d+[a-z]?(?:" + "|".join(re.escape(suffix) for suffix in MISSAV_VARIANT_SUFFIXES) + r")?$",
+    re.IGNORECASE,
+)
+ADAPTIVE_PAGE_BUDGETS = env_bool("ADAPTIVE_PAGE_BUDGETS", False)
+PLANNER_TIME_BUDGET_MINUTES = env_non_negative_float("PLANNER_TIME_BUDGET_MINUTES", 90.0)
+PLANNER_HISTORY_RUNS = env_positive_int("PLANNER_HISTORY_RUNS", 20)
+PLANNER_YIELD_DECAY = min(env_non_negative_float("PLANNER_YIELD_DECAY", 0.8), 0.99)
+PLANNER_PRIOR_FIRST_PAGE_YIELD = env_non_negative_float("PLANNER_PRIOR_FIRST_PAGE_YIELD", 6.0)
+PLANNER_DEFAULT_SECONDS_PER_PAGE = env_non_negative_float("PLANNER_DEFAULT_SECONDS_PER_PAGE", 20.0)
+RUN_DEADLINE_MINUTES = env_non_negative_float("RUN_DEADLINE_MINUTES", 0.0)
+JOB_TIMEOUT_MINUTES = env_non_negative_float("JOB_TIMEOUT_MINUTES", 0.0)
+RUN_DEADLINE_MARGIN_MINUTES = env_non_negative_float("RUN_DEADLINE_MARGIN_MINUTES", 8.0)
+RUN_DRAIN_RESERVE_SECONDS = env_non_negative_float("RUN_DRAIN_RESERVE_SECONDS", 180.0)
+BROWSER_STATE_DIR = os.environ.get("BROWSER_STATE_DIR", "").strip()
+BROWSER_STATE_MAX_AGE_HOURS = env_non_negative_float("BROWSER_STATE_MAX_AGE_HOURS", 72.0)
+CG_DETAIL_PAGES = env_positive_int("CG_DETAIL_PAGES", 2)
+GLOBAL_MAX_DETAIL_PAGES = env_positive_int("GLOBAL_MAX_DETAIL_PAGES", CONCURRENT_DETAIL_PAGES + CG_DETAIL_PAGES)
+DETAIL_RETRY_MAX_ATTEMPTS = env_positive_int("DETAIL_RETRY_MAX_ATTEMPTS", 3)
+DETAIL_RETRY_BASE_SECONDS = env_non_negative_float("DETAIL_RETRY_BASE_SECONDS", 20.0)
+DETAIL_RETRY_MAX_SECONDS = env_non_negative_float("DETAIL_RETRY_MAX_SECONDS", 300.0)
+CIRCUIT_FAILURE_THRESHOLD = env_positive_int("CIRCUIT_FAILURE_THRESHOLD", 3)
+CIRCUIT_COOLDOWN_SECONDS = env_non_negative_float("CIRCUIT_COOLDOWN_SECONDS", 60.0)
+CIRCUIT_MAX_COOLDOWN_SECONDS = env_non_negative_float("CIRCUIT_MAX_COOLDOWN_SECONDS", 600.0)
+SITE_PROFILES = {
+    "missav": {
+        "hosts": {"missav.ws", "fourhoi.com"},
+        "detail_pages": CONCURRENT_DETAIL_PAGES,
+        "blocked_resource_types": BLOCKED_RESOURCE_TYPES,
+    },
+    "51cg": {
+        "hosts": {"51cg1.com"},
+        "detail_pages": CG_DETAIL_PAGES,
+        "blocked_resource_types": BLOCKED_RESOURCE_TYPES,
+    },
+}
 CATEGORY_HUB_URLS = [
     "https://missav.ws/genres",
 ]
 
 
+def resolve_run_budget_seconds() -> float | None:
+    if RUN_DEADLINE_MINUTES > 0:
+        return RUN_DEADLINE_MINUTES * 60
+    if JOB_TIMEOUT_MINUTES > 0:
+        return max(JOB_TIMEOUT_MINUTES - RUN_DEADLINE_MARGIN_MINUTES, 1.0) * 60
+    return None
+
+
+class RunDeadline:
+    def __init__(self, budget_seconds: float | None = None, drain_reserve_seconds: float = RUN_DRAIN_RESERVE_SECONDS):
+        self.start(budget_seconds, drain_reserve_seconds)
+
+    def start(self, budget_seconds: float | None, drain_reserve_seconds: float = RUN_DRAIN_RESERVE_SECONDS):
+        self.budget_seconds = budget_seconds
+        self.drain_reserve_seconds = max(0.0, drain_reserve_seconds)
+        self.started_at = time.monotonic()
+        self.stopped_at = None
+        self.sources_skipped = []
+        self.deferred = {}
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float | None:
+        if self.budget_seconds is None:
+            return None
+        return self.budget_seconds - self.elapsed()
+
+    def stopping(self) -> bool:
+        remaining = self.remaining()
+        if remaining is None or remaining > self.drain_reserve_seconds:
+            return False
+        if self.stopped_at is None:
+            self.stopped_at = self.elapsed()
+            print(f"[Deadline] {max(remaining, 0):.0f}s left of {self.budget_seconds:.0f}s budget. Draining in-flight work.")
+        return True
+
+    def skip_sources(self, tags):
+        self.sources_skipped.extend(tags)
+
+    def defer(self, key: str, count: int = 1):
+        self.deferred[key] = self.deferred.get(key, 0) + count
+
+    def cut_short(self) -> bool:
+        return self.stopped_at is not None and bool(self.sources_skipped or self.deferred)
+
+    def report(self) -> dict:
+        return {
+            "budget_seconds": self.budget_seconds,
+            "elapsed_seconds": round(self.elapsed(), 1),
+            "stopped_at_seconds": None if self.stopped_at is None else round(self.stopped_at, 1),
+            "sources_skipped": list(self.sources_skipped),
+            **self.deferred,
+        }
+
+
+RUN_DEADLINE = RunDeadline()
+
+
+def read_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as fp:
+            return int(fp.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    except Exception:
+        return None
+
+
+class RunProfiler:
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.enabled = False
+        self.stack = contextvars.ContextVar("profile_stack", default=())
+        self.reset()
+
+    def reset(self):
+        self.collapsed = {}
+        self.spans = {}
+        self.samples = []
+        self.sampler = None
+        self.started_at = None
+
+    def start(self, enabled: bool):
+        self.reset()
+        self.enabled = enabled
+        self.started_at = self.clock()
+        if enabled:
+            print(f"[Profile] Profiling this run. Artifacts go to {PROFILE_DIR}.")
+
+    def span(self, name: str):
+        if not self.enabled:
+            return nullcontext()
+        return self._span(name)
+
+    @contextmanager
+    def _span(self, name: str):
+        parent = self.stack.get()
+        frame = [name, 0.0]
+        token = self.stack.set(parent + (frame,))
+        started = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - started
+            self.stack.reset(token)
+            if parent:
+                parent[-1][1] += elapsed
+            key = ";".join(item[0] for item in parent + (frame,))
+            self.collapsed[key] = self.collapsed.get(key, 0.0) + max(elapsed - frame[1], 0.0)
+            span = self.spans.setdefault(name, {"count": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            span["count"] += 1
+            span["total_seconds"] += elapsed
+            span["max_seconds"] = max(span["max_seconds"], elapsed)
+
+    async def sample_forever(self, interval: float):
+        loop = asyncio.get_running_loop()
+        last_cpu = time.process_time()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            now_cpu = time.process_time()
+            lag = max(loop.time() - expected, 0.0)
+            self.samples.append({
+                "t": round(self.clock() - self.started_at, 3),
+                "rss_mb": round((read_rss_bytes() or 0) / 1048576, 1),
+                "cpu_percent": round(100 * (now_cpu - last_cpu) / (interval + lag), 1),
+                "loop_lag_ms": round(lag * 1000, 2),
+                "tasks": len(asyncio.all_tasks()),
+            })
+            last_cpu = now_cpu
+
+    def start_sampler(self, interval: float = PROFILE_SAMPLE_INTERVAL_SECONDS):
+        if self.enabled and interval > 0 and self.sampler is None:
+            self.sampler = asyncio.create_task(self.sample_forever(interval))
+
+    async def stop_sampler(self):
+        if self.sampler is None:
+            return
+        self.sampler.cancel()
+        try:
+            await self.sampler
+        except asyncio.CancelledError:
+            pass
+        self.sampler = None
+
+    def summary(self) -> dict:
+        lags = [sample["loop_lag_ms"] for sample in self.samples]
+        spans = sorted(self.spans.items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        return {
+            "wall_seconds": round(self.clock() - self.started_at, 3),
+            "spans": {
+                name: {
+                    "count": span["count"],
+                    "total_seconds": round(span["total_seconds"], 3),
+                    "mean_ms": round(1000 * span["total_seconds"] / span["count"], 2),
+                    "max_ms": round(1000 * span["max_seconds"], 2),
+                }
+                for name, span in spans
+            },
+            "samples": len(self.samples),
+            "peak_rss_mb": max((sample["rss_mb"] for sample in self.samples), default=None),
+            "mean_cpu_percent": round(sum(sample["cpu_percent"] for sample in self.samples) / len(self.samples), 1) if self.samples else None,
+            "max_loop_lag_ms": max(lags, default=None),
+            "p95_loop_lag_ms": sorted(lags)[int(0.95 * (len(lags) - 1))] if lags else None,
+        }
+
+    def write(self, directory: str) -> dict:
+        os.makedirs(directory, exist_ok=True)
+        summary = self.summary()
+        with open(os.path.join(directory, "profile.collapsed"), "w", encoding="utf-8") as fp:
+            for stack, seconds in sorted(self.collapsed.items()):
+                fp.write(f"{stack} {max(int(seconds * 1_000_000), 1)}\n")
+        with open(os.path.join(directory, "profile-summary.json"), "w", encoding="utf-8") as fp:
+            json.dump({**summary, "timeline": self.samples}, fp, ensure_ascii=False, indent=2)
+        top = list(summary["spans"].items())[:5]
+        return {
+            "wall_seconds": summary["wall_seconds"],
+            "peak_rss_mb": summary["peak_rss_mb"],
+            "max_loop_lag_ms": summary["max_loop_lag_ms"],
+            "top_spans": ", ".join(f"{name}={span['total_seconds']}s/{span['count']}" for name, span in top),
+        }
+
+
+PROFILER = RunProfiler()
+
+
+def profiled(name: str):
+    def decorate(fn):
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            with PROFILER.span(name):
+                return await fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+async def playwright_call(kind: str, awaitable):
+    with PROFILER.span(f"playwright.{kind}"):
+        return await awaitable
+
+
+def url_host(url: str | None) -> str:
+    return urlparse(url or "").netloc.lower()
+
+
+class HostCircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        cooldown_seconds: float = CIRCUIT_COOLDOWN_SECONDS,
+        max_cooldown_seconds: float = CIRCUIT_MAX_COOLDOWN_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = max(0.0, cooldown_seconds)
+        self.max_cooldown_seconds = max(self.cooldown_seconds, max_cooldown_seconds)
+        self.clock = clock
+        self.reset()
+
+    def reset(self):
+        self.hosts = {}
+
+    def _host_state(self, host: str) -> dict:
+        return self.hosts.setdefault(host, {
+            "state": "closed",
+            "failures": 0,
+            "trips": 0,
+            "opened_at": None,
+            "probe_in_flight": False,
+        })
+
+    def cooldown_for(self, trips: int) -> float:
+        return min(self.cooldown_seconds * (2 ** max(0, trips - 1)), self.max_cooldown_seconds)
+
+    def cooldown_remaining(self, url: str) -> float:
+        state = self.hosts.get(url_host(url))
+        if not state or state["state"] != "open":
+            return 0.0
+        return max(0.0, state["opened_at"] + self.cooldown_for(state["trips"]) - self.clock())
+
+    def allow(self, url: str) -> bool:
+        host = url_host(url)
+        state = self._host_state(host)
+        if state["state"] == "closed":
+            return True
+        if state["state"] == "open":
+            if self.cooldown_remaining(url) > 0:
+                return False
+            state["state"] = "half_open"
+            state["probe_in_flight"] = False
+            print(f"[Circuit] {host} half-open. Sending a probe.")
+        if state["probe_in_flight"]:
+            return False
+        state["probe_in_flight"] = True
+        return True
+
+    def record_success(self, url: str):
+        host = url_host(url)
+        state = self._host_state(host)
+        if state["state"] == "open":
+            return
+        if state["state"] == "half_open":
+            print(f"[Circuit] {host} closed after a successful probe.")
+        state.update(state="closed", failures=0, opened_at=None, probe_in_flight=False)
+
+    def record_failure(self, url: str):
+        host = url_host(url)
+        state = self._host_state(host)
+        state["failures"] += 1
+        state["probe_in_flight"] = False
+        if state["state"] == "half_open" or (state["state"] == "closed" and state["failures"] >= self.failure_threshold):
+            state["trips"] += 1
+            state["state"] = "open"
+            state["opened_at"] = self.clock()
+            print(f"[Circuit] {host} open for {self.cooldown_for(state['trips']):.0f}s after {state['failures']} failures.")
+
+    async def wait_until_allowed(self, url: str) -> bool:
+        while not self.allow(url):
+            if RUN_DEADLINE.stopping():
+                return False
+            await asyncio.sleep(max(self.cooldown_remaining(url), 1.0))
+        return True
+
+    def report(self) -> dict:
+        return {
+            host: f"{state['state']} (trips={state['trips']}, failures={state['failures']})"
+            for host, state in self.hosts.items()
+            if state["trips"]
+        }
+
+
+HOST_BREAKER = HostCircuitBreaker()
+
+
+class DetailRetryQueue:
+    def __init__(
+        self,
+        max_attempts: int = DETAIL_RETRY_MAX_ATTEMPTS,
+        base_seconds: float = DETAIL_RETRY_BASE_SECONDS,
+        max_seconds: float = DETAIL_RETRY_MAX_SECONDS,
+        clock=time.monotonic,
+    ):
+        self.max_attempts = max(1, max_attempts)
+        self.base_seconds = max(0.0, base_seconds)
+        self.max_seconds = max(self.base_seconds, max_seconds)
+        self.clock = clock
+        self.entries = {}
+        self.attempts = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def schedule(self, url: str, payload: dict) -> bool:
+        attempts = self.attempts.get(url, 0) + 1
+        self.attempts[url] = attempts
+        if attempts > self.max_attempts:
+            self.entries.pop(url, None)
+            return False
+        delay = min(self.base_seconds * (2 ** (attempts - 1)), self.max_seconds)
+        self.entries[url] = {"payload": payload, "attempts": attempts, "next_at": self.clock() + delay}
+        return True
+
+    def pop_due(self) -> list[tuple[str, dict]]:
+        now = self.clock()
+        due = [(url, entry) for url, entry in self.entries.items() if entry["next_at"] <= now]
+        due.sort(key=lambda item: item[1]["next_at"])
+        for url, _ in due:
+            del self.entries[url]
+        return [(url, entry["payload"]) for url, entry in due]
+
+    def next_due_in(self) -> float | None:
+        if not self.entries:
+            return None
+        return max(0.0, min(entry["next_at"] for entry in self.entries.values()) - self.clock())
+
+    def drain(self) -> list[tuple[str, dict]]:
+        pending = [(url, entry["payload"]) for url, entry in self.entries.items()]
+        self.entries.clear()
+        return pending
+
+
 def ordered_unique(items):
     seen = set()
     output = []
@@ -316,6 +777,15 @@ def classify_inventory_status(record: dict | None) -> str:
     return "indexed"
 
 
+def has_detail_metadata(record: dict | None) -> bool:
+    record = record or {}
+    return (
+        has_release_date(record.get("release_date"))
+        or has_non_empty_list(record.get("actors"))
+        or has_non_empty_list(record.get("tags"))
+    )
+
+
 def classify_detail_status(record: dict | None) -> str:
     if not record:
         return "pending"
@@ -346,6 +816,11 @@ def make_run_stats():
         "blocked_count": 0,
         "upserted_count": 0,
         "placeholder_cover_count": 0,
+        "retry_recovered_count": 0,
+        "retry_lost_count": 0,
+        "detail_shared_count": 0,
+        "near_duplicate_count": 0,
+        "detail_backoff_count": 0,
     }
 
 
@@ -370,6 +845,11 @@ def resolve_run_configuration():
         early_stop_streak = max(EARLY_STOP_STREAK, 6)
         early_stop_min_page = max(EARLY_STOP_MIN_PAGE, 8)
         detail_fetch_policy = "none"
+    elif SCRAPER_RUN_MODE == "sitemap":
+        missav_pages = 0
+        cg_pages = 0
+        early_stop_streak = EARLY_STOP_STREAK
+        early_stop_min_page = EARLY_STOP_MIN_PAGE
     elif SCRAPER_RUN_MODE == "sample":
         if not selected_tags:
             selected_tags = {"new", "weekly_hot", "monthly_hot"}
@@ -386,6 +866,9 @@ def resolve_run_configuration():
     missav_sources = [source for source in SOURCES if not selected_tags or source["tag"] in selected_tags]
     run_51cg_main = not SKIP_51CG and (not selected_tags or "51cg" in selected_tags)
     run_51cg_mrds = not SKIP_51CG and (not selected_tags or "51mrds" in selected_tags)
+    if SCRAPER_RUN_MODE == "sitemap":
+        missav_sources = []
+        run_51cg_main = run_51cg_mrds = False
 
     return {
         "mode": SCRAPER_RUN_MODE,
@@ -398,40 +881,155 @@ def resolve_run_configuration():
         "run_51cg_main": run_51cg_main,
         "run_51cg_mrds": run_51cg_mrds,
         "detail_fetch_policy": detail_fetch_policy,
-        "discover_missav_sources": DISCOVER_MISSAV_SOURCES or SCRAPER_RUN_MODE == "index",
+        "discover_missav_sources": (DISCOVER_MISSAV_SOURCES or SCRAPER_RUN_MODE == "index") and SCRAPER_RUN_MODE != "sitemap",
+        "sitemap_discovery": SITEMAP_DISCOVERY or SCRAPER_RUN_MODE == "sitemap",
         "manual_source_tags": manual_source_tags,
+        "adaptive_page_budgets": ADAPTIVE_PAGE_BUDGETS,
     }
 
 
-def merge_video_record(video: dict, existing: dict | None) -> dict:
-    if not existing:
-        return video
-
-    merged = dict(video)
-
-    if (not merged.get("title") or len(str(merged.get("title")).strip()) < 2) and existing.get("title"):
-        merged["title"] = existing.get("title")
-
-    if not merged.get("source_url") and existing.get("source_url"):
-        merged["source_url"] = existing.get("source_url")
-
-    merged["source_site"] = merged.get("source_site") or existing.get("source_site") or infer_source_site(merged.get("source_url"))
-    merged["cover_url"] = normalize_cover_url(merged.get("cover_url")) or normalize_cover_url(existing.get("cover_url"))
-    merged["duration"] = normalize_duration_text(merged.get("duration")) or normalize_duration_text(existing.get("duration"))
-    merged["release_date"] = normalize_release_date_text(merged.get("release_date")) or normalize_release_date_text(existing.get("release_date"))
-    merged["actors"] = ordered_unique((existing.get("actors") or []) + (merged.get("actors") or []))
-    merged["tags"] = normalize_taxonomy_values((existing.get("tags") or []) + (merged.get("tags") or []))
-    merged["categories"] = normalize_taxonomy_values((existing.get("categories") or []) + (merged.get("categories") or []))
-    merged["cover_status"] = classify_cover_status(merged.get("cover_url"))
-    merged["inventory_status"] = classify_inventory_status(merged)
-    merged["detail_status"] = classify_detail_status(merged)
-    merged["detail_fetched_at"] = (
-        datetime.now(timezone.utc).isoformat()
-        if merged["detail_status"] in {"success", "partial"}
-        else existing.get("detail_fetched_at")
-    )
+VIDEO_RECORD_FIELDS = (
+    "external_id", "title", "source_url", "source_site", "cover_url", "duration", "release_date",
+    "actors", "tags", "categories", "detail_fetched_at", "cover_status", "inventory_status", "detail_status",
+    "detail_attempts", "detail_last_outcome", "next_detail_attempt_at",
+)
+VIDEO_RECORD_FIELD_SET = frozenset(VIDEO_RECORD_FIELDS) | {"is_active"}
+
+
+class VideoRecord:
+    # One row on its way to the sink. Fields are normalized and classified once, when the record is
+    # built or merged, and only turned back into a payload dict by the sink.
+    __slots__ = VIDEO_RECORD_FIELDS + ("placeholder_cover", "extra")
+
+    @classmethod
+    def from_mapping(cls, video) -> "VideoRecord":
+        if isinstance(video, VideoRecord):
+            return video
+        record = cls.__new__(cls)
+        record.extra = {key: value for key, value in video.items() if key not in VIDEO_RECORD_FIELD_SET}
+        record.external_id = video.get("external_id")
+        record.title = video.get("title")
+        record.source_url = video.get("source_url")
+        record.source_site = video.get("source_site")
+        raw_cover = video.get("cover_url")
+        record.placeholder_cover = looks_like_placeholder_cover(raw_cover)
+        record.cover_url = normalize_cover_url(raw_cover)
+        record.duration = normalize_duration_text(video.get("duration"))
+        record.release_date = normalize_release_date_text(video.get("release_date"))
+        record.actors = ordered_unique(video.get("actors") or [])
+        record.tags = normalize_taxonomy_values(video.get("tags"))
+        record.categories = normalize_taxonomy_values(video.get("categories"))
+        record.classify()
+        record.detail_fetched_at = video.get("detail_fetched_at") or (
+            datetime.now(timezone.utc).isoformat() if record.detail_status != "pending" else None
+        )
+        record.detail_attempts = int(video.get("detail_attempts") or 0)
+        record.detail_last_outcome = video.get("detail_last_outcome")
+        record.next_detail_attempt_at = video.get("next_detail_attempt_at")
+        return record
+
+    def copy(self) -> "VideoRecord":
+        record = VideoRecord.__new__(VideoRecord)
+        for name in self.__slots__:
+            setattr(record, name, getattr(self, name))
+        record.extra = dict(self.extra)
+        return record
+
+    def classify(self):
+        has_cover = self.cover_url is not None
+        has_detail = bool(self.release_date or self.actors or self.tags)
+        self.cover_status = "valid" if has_cover else "missing"
+        if not (str(self.external_id or "").strip() and str(self.title or "").strip() and str(self.source_url or "").strip()):
+            self.inventory_status = "pending"
+        else:
+            self.inventory_status = "detail_ready" if has_cover and has_detail else "cover_ready" if has_cover else "indexed"
+        self.detail_status = "success" if has_cover and has_detail else "partial" if has_cover or has_detail else "pending"
+
+    def prepend_taxonomy(self, values: list[str]):
+        if values:
+            self.tags = normalize_taxonomy_values(values + self.tags)
+            self.categories = normalize_taxonomy_values(values + self.categories)
+            self.classify()
+        return self
+
+    def merge(self, existing) -> "VideoRecord":
+        if not existing:
+            return self
+        if (not self.title or len(str(self.title).strip()) < 2) and existing.get("title"):
+            self.title = existing.get("title")
+        if not self.source_url and existing.get("source_url"):
+            self.source_url = existing.get("source_url")
+        self.source_site = self.source_site or existing.get("source_site") or infer_source_site(self.source_url)
+        self.cover_url = self.cover_url or normalize_cover_url(existing.get("cover_url"))
+        self.duration = self.duration or normalize_duration_text(existing.get("duration"))
+        self.release_date = self.release_date or normalize_release_date_text(existing.get("release_date"))
+        if existing.get("actors"):
+            self.actors = ordered_unique(existing.get("actors") + self.actors)
+        if existing.get("tags"):
+            self.tags = normalize_taxonomy_values(existing.get("tags") + self.tags)
+        if existing.get("categories"):
+            self.categories = normalize_taxonomy_values(existing.get("categories") + self.categories)
+        self.classify()
+        self.detail_fetched_at = (
+            datetime.now(timezone.utc).isoformat()
+            if self.detail_status != "pending"
+            else existing.get("detail_fetched_at")
+        )
+        if not self.detail_attempts and not self.detail_last_outcome:
+            self.detail_attempts = int(existing.get("detail_attempts") or 0)
+            self.detail_last_outcome = existing.get("detail_last_outcome")
+            self.next_detail_attempt_at = existing.get("next_detail_attempt_at")
+        return self
+
+    def note_detail_attempt(self, outcome: str, now: datetime | None = None) -> "VideoRecord":
+        if self.detail_status == "success":
+            self.detail_attempts, self.detail_last_outcome, self.next_detail_attempt_at = 0, "success", None
+            return self
+        self.detail_attempts += 1
+        self.detail_last_outcome = "partial" if outcome == "success" else outcome
+        self.next_detail_attempt_at = detail_retry_at(self.detail_attempts, now)
+        return self
+
+    def to_payload(self) -> dict:
+        payload = dict(self.extra)
+        for name in VIDEO_RECORD_FIELDS:
+            payload[name] = getattr(self, name)
+        payload["source_site"] = self.source_site or infer_source_site(self.source_url)
+        payload["is_active"] = True
+        return payload
+
+    # Read-only mapping access so callers and tests can treat a record like the row dict it replaces.
+    def __getitem__(self, key):
+        if key in VIDEO_RECORD_FIELD_SET:
+            return True if key == "is_active" else getattr(self, key)
+        return self.extra[key]
+
+    def __contains__(self, key):
+        return key in VIDEO_RECORD_FIELD_SET or key in self.extra
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+
+def detail_retry_at(attempts: int, now: datetime | None = None) -> str:
+    hours = min(DETAIL_BACKOFF_BASE_HOURS * 2 ** max(attempts - 1, 0), DETAIL_BACKOFF_MAX_HOURS)
+    return ((now or datetime.now(timezone.utc)) + timedelta(hours=hours)).isoformat()
+
+
+def video_payload(row) -> dict:
+    return row.to_payload() if isinstance(row, VideoRecord) else row
+
 
-    return merged
+def merge_video_record(video, existing) -> VideoRecord:
+    record = video.copy() if isinstance(video, VideoRecord) else VideoRecord.from_mapping(video)
+    return record.merge(existing)
+
+
+def failed_detail_attempt(existing: dict, outcome: str) -> VideoRecord:
+    return VideoRecord.from_mapping(existing).note_detail_attempt(outcome)
 
 
 def apply_cover_patch(existing: dict, cover_url: str | None) -> dict:
@@ -455,14 +1053,21 @@ def apply_metadata_patch(existing: dict, details: dict | None) -> dict:
     return patched
 
 
-def parse_null_cover_queue(raw: str | None):
-    if not raw:
-        return []
-    try:
-        payload = json.loads(raw)
-    except Exception as e:
-        print(f"[Config] Invalid NULL_COVER_QUEUE_JSON: {e}")
-        return []
+def apply_detail_patch(existing: dict, details: dict | None) -> dict:
+    details = details or {}
+    patched = dict(existing or {})
+    patched["cover_url"] = normalize_cover_url(details.get("cover_url")) or normalize_cover_url(existing.get("cover_url"))
+    patched["duration"] = normalize_duration_text(details.get("duration")) or normalize_duration_text(existing.get("duration"))
+    patched["release_date"] = normalize_release_date_text(details.get("release_date")) or normalize_release_date_text(existing.get("release_date"))
+    patched["actors"] = ordered_unique(details.get("actors") or existing.get("actors") or [])
+    patched["tags"] = ordered_unique(details.get("tags") or existing.get("tags") or [])
+    patched["cover_status"] = classify_cover_status(patched.get("cover_url"))
+    patched["inventory_status"] = classify_inventory_status(patched)
+    patched["detail_status"] = classify_detail_status(patched)
+    return patched
+
+
+def normalize_queue_rows(payload):
     if isinstance(payload, dict):
         payload = payload.get("rows", [])
     if not isinstance(payload, list):
@@ -485,6 +1090,17 @@ def parse_null_cover_queue(raw: str | None):
     return output
 
 
+def parse_null_cover_queue(raw: str | None):
+    if not raw:
+        return []
+    try:
+        payload = json.loads(raw)
+    except Exception as e:
+        print(f"[Config] Invalid NULL_COVER_QUEUE_JSON: {e}")
+        return []
+    return normalize_queue_rows(payload)
+
+
 def parse_metadata_queue(raw: str | None):
     if not raw:
         return []
@@ -493,37 +1109,38 @@ def parse_metadata_queue(raw: str | None):
     except Exception as e:
         print(f"[Config] Invalid METADATA_QUEUE_JSON: {e}")
         return []
-    if isinstance(payload, dict):
-        payload = payload.get("rows", [])
-    if not isinstance(payload, list):
-        return []
+    return normalize_queue_rows(payload)
 
-    output = []
-    for row in payload:
-        if not isinstance(row, dict):
-            continue
-        external_id = str(row.get("external_id") or "").strip()
-        source_url = str(row.get("source_url") or "").strip()
-        if not external_id or not source_url:
-            continue
-        output.append({
-            "external_id": external_id,
-            "source_url": source_url,
-            "source_site": row.get("source_site") or infer_source_site(source_url),
-            "title": row.get("title") or external_id,
-        })
-    return output
 
+def merge_backfill_targets(*target_lists):
+    merged = {}
+    for targets in target_lists:
+        for target in targets or []:
+            merged.setdefault(target["external_id"], target)
+    return list(merged.values())
 
-def should_fetch_details(existing: dict | None, detail_fetch_policy: str = "smart") -> bool:
+
+def detail_backoff_active(existing: dict | None, now: float | None = None) -> bool:
+    retry_at = parse_timestamp((existing or {}).get("next_detail_attempt_at"))
+    return retry_at is not None and retry_at > (time.time() if now is None else now)
+
+
+def detail_skip_reason(existing: dict | None, detail_fetch_policy: str = "smart", now: float | None = None) -> str | None:
     policy = (detail_fetch_policy or "smart").strip().lower()
     if policy == "none":
-        return False
-    if policy == "force":
-        return True
-    if not existing:
-        return True
-    return classify_detail_status(existing) != "success"
+        return "policy"
+    if policy == "force" or not existing:
+        return None
+    if classify_detail_status(existing) == "success":
+        return "complete"
+    # Rows that keep failing wait out next_detail_attempt_at instead of taking a detail slot every run.
+    if detail_backoff_active(existing, now):
+        return "backoff"
+    return None
+
+
+def should_fetch_details(existing: dict | None, detail_fetch_policy: str = "smart") -> bool:
+    return detail_skip_reason(existing, detail_fetch_policy) is None
 
 
 def infer_source_site(source_url: str | None, fallback: str = "missav") -> str:
@@ -587,8 +1204,7 @@ def normalize_discovered_source_url(source_url: str) -> str | None:
     if "genres" not in parts:
         return None
 
-    locale_codes = {"cn", "en", "ja", "ko", "ms", "th", "de", "fr", "vi", "id", "fil", "pt"}
-    if len(parts) >= 3 and parts[1] in locale_codes and parts[2] == "genres":
+    if len(parts) >= 3 and parts[1] in MISSAV_LOCALE_CODES and parts[2] == "genres":
         parts = [parts[0]] + parts[2:]
 
     genre_index = parts.index("genres")
@@ -670,22 +1286,451 @@ async def discover_missav_sources(page, seed_sources: list[dict], selected_tags:
     return dedupe_sources(seed_sources + discovered)
 
 
-def normalize_video_record(video: dict) -> dict:
-    record = dict(video)
-    record["is_active"] = True
-    record["source_site"] = record.get("source_site") or infer_source_site(record.get("source_url"))
-    record["tags"] = normalize_taxonomy_values(record.get("tags", []))
-    record["categories"] = normalize_taxonomy_values(record.get("categories", []))
-    record["actors"] = ordered_unique(record.get("actors", []))
-    record["duration"] = normalize_duration_text(record.get("duration"))
-    record["release_date"] = normalize_release_date_text(record.get("release_date"))
-    record["cover_url"] = normalize_cover_url(record.get("cover_url"))
-    record["cover_status"] = classify_cover_status(record.get("cover_url"))
-    record["inventory_status"] = classify_inventory_status(record)
-    record["detail_status"] = classify_detail_status(record)
-    if record["detail_status"] in {"success", "partial"}:
-        record["detail_fetched_at"] = record.get("detail_fetched_at") or datetime.now(timezone.utc).isoformat()
-    return record
+def parse_timestamp(value) -> float | None:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+def select_cached_discovery(rows: list[dict], now: float, ttl_seconds: float, limit: int) -> list[dict] | None:
+    if ttl_seconds <= 0 or not rows:
+        return None
+    seen_at = [parse_timestamp(row.get("last_seen_at")) for row in rows]
+    newest = max((value for value in seen_at if value is not None), default=None)
+    if newest is None or now - newest > ttl_seconds:
+        return None
+    ranked = sorted(rows, key=lambda row: -1 if row.get("last_yield") is None else int(row["last_yield"]), reverse=True)
+    return dedupe_sources([{"url": row.get("url"), "tag": row.get("tag")} for row in ranked])[:limit]
+
+
+async def load_discovered_sources(supabase) -> list[dict]:
+    res = await execute_with_retry(
+        label="discovered-sources-load",
+        fn=lambda: supabase.table("discovered_sources")
+        .select("url, tag, last_seen_at, last_yield")
+        .eq("source_site", "missav")
+        .execute()
+    )
+    return res.data or []
+
+
+async def save_discovered_sources(supabase, sources: list[dict]):
+    seen_at = datetime.now(timezone.utc).isoformat()
+    payload = [{"url": source["url"], "tag": source["tag"], "source_site": "missav", "last_seen_at": seen_at} for source in sources]
+    for idx, chunk in enumerate(chunked(payload, SUPABASE_UPSERT_CHUNK_SIZE), start=1):
+        await execute_with_retry(
+            label=f"discovered-sources-save-{idx}",
+            fn=lambda chunk=chunk: supabase.table("discovered_sources").upsert(chunk, on_conflict="url").execute()
+        )
+
+
+async def record_discovered_source_yields(supabase, sources: list[dict], source_yields: dict, discovered_urls: set):
+    crawled_at = datetime.now(timezone.utc).isoformat()
+    payload = [
+        {"url": source["url"], "tag": source["tag"], "last_yield": source_yields[source["tag"]]["new"], "last_crawled_at": crawled_at}
+        for source in sources
+        if source["url"] in discovered_urls and source["tag"] in source_yields
+    ]
+    if not payload:
+        return
+    try:
+        await execute_with_retry(
+            label="discovered-sources-yields",
+            fn=lambda: supabase.table("discovered_sources").upsert(payload, on_conflict="url").execute()
+        )
+    except Exception as e:
+        print(f"[Discovery] Failed to record source yields: {e}")
+
+
+async def resolve_discovered_sources(page, supabase, seed_sources: list[dict], selected_tags: set[str], limit: int) -> list[dict]:
+    if supabase:
+        try:
+            cached = select_cached_discovery(
+                await load_discovered_sources(supabase),
+                time.time(),
+                DISCOVERY_CACHE_TTL_HOURS * 3600,
+                limit,
+            )
+            if cached is not None:
+                print(f"[Discovery] Loaded {len(cached)} cached sources (TTL {DISCOVERY_CACHE_TTL_HOURS:g}h). Skipping hub crawl.")
+                return dedupe_sources(seed_sources + cached)
+        except Exception as e:
+            print(f"[Discovery] Source cache unavailable, crawling hubs: {e}")
+
+    sources = await discover_missav_sources(page, seed_sources, selected_tags, limit)
+    seed_urls = {source["url"] for source in seed_sources}
+    discovered = [source for source in sources if source["url"] not in seed_urls]
+    if supabase and discovered:
+        try:
+            await save_discovered_sources(supabase, discovered)
+        except Exception as e:
+            print(f"[Discovery] Failed to cache discovered sources: {e}")
+    return sources
+
+
+def missav_video_id_from_url(url: str | None) -> str | None:
+    parsed = urlparse(str(url or "").strip())
+    if parsed.scheme not in {"http", "https"}:
+        return None
+    parts = [unquote(part) for part in parsed.path.split("/") if part]
+    if not parts:
+        return None
+    for prefix in parts[:-1]:
+        if prefix not in MISSAV_LOCALE_CODES and not re.fullmatch(r"dm\d+", prefix):
+            return None
+    return parts[-1] if MISSAV_VIDEO_ID_RE.match(parts[-1]) else None
+
+
+def missav_content_key(external_id: str | None) -> str | None:
+    if not external_id or not MISSAV_VIDEO_ID_RE.match(external_id):
+        return None
+    content_key = external_id.lower()
+    for suffix in MISSAV_VARIANT_SUFFIXES:
+        if content_key.endswith(suffix):
+            return content_key[: -len(suffix)]
+    return content_key
+
+
+def missav_variant(external_id: str | None) -> str | None:
+    content_key = missav_content_key(external_id)
+    if content_key is None:
+        return None
+    return external_id.lower()[len(content_key):].lstrip("-") or "original"
+
+
+def variant_share_key(video: dict) -> tuple | None:
+    # Variants only share a detail fetch when their list covers are the same image path.
+    content_key = missav_content_key(video.get("external_id"))
+    cover_url = normalize_cover_url(video.get("cover_url"))
+    if content_key is None or not cover_url:
+        return None
+    return content_key, cover_url.lower().replace(video["external_id"].lower(), content_key)
+
+
+def xml_local_name(tag) -> str:
+    return str(tag).rsplit("}", 1)[-1]
+
+
+class SitemapStream:
+    def __init__(self):
+        self.parser = ET.XMLPullParser(events=("start", "end"))
+        self.inflater = None
+        self.sniffed = False
+        self.root = None
+
+    def feed(self, chunk: bytes) -> list[dict]:
+        if not self.sniffed and chunk:
+            self.sniffed = True
+            if chunk[:2] == b"\x1f\x8b":
+                self.inflater = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self.inflater is not None:
+            chunk = self.inflater.decompress(chunk)
+        self.parser.feed(chunk)
+        return self._drain()
+
+    def close(self) -> list[dict]:
+        if self.inflater is not None:
+            self.parser.feed(self.inflater.flush())
+        self.parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[dict]:
+        entries = []
+        for event, element in self.parser.read_events():
+            if event == "start":
+                if self.root is None:
+                    self.root = element
+                continue
+            kind = xml_local_name(element.tag)
+            if element is self.root or kind not in {"url", "sitemap"}:
+                continue
+            entry = {"kind": kind, "loc": None, "lastmod": None}
+            for child in element:
+                name = xml_local_name(child.tag)
+                if name in {"loc", "lastmod"}:
+                    entry[name] = (child.text or "").strip() or None
+                elif name == "video":
+                    for field in child:
+                        field_name = xml_local_name(field.tag)
+                        if field_name in {"title", "thumbnail_loc"}:
+                            entry[field_name] = (field.text or "").strip() or None
+            if entry["loc"]:
+                entries.append(entry)
+            # Drop finished entries so memory stays flat however long the sitemap is.
+            self.root.clear()
+        return entries
+
+
+async def stream_sitemap(client, url: str):
+    stream = SitemapStream()
+    async with client.stream("GET", url) as response:
+        if response.status_code != 200:
+            raise RuntimeError(f"HTTP {response.status_code} for {url}")
+        async for chunk in response.aiter_bytes():
+            for entry in stream.feed(chunk):
+                yield entry
+    for entry in stream.close():
+        yield entry
+
+
+def build_sitemap_video(entry: dict, external_id: str) -> dict:
+    return {
+        "external_id": external_id,
+        "title": entry.get("title") or external_id,
+        "cover_url": normalize_cover_url(entry.get("thumbnail_loc")),
+        "source_url": entry["loc"].split("?")[0],
+    }
+
+
+def sitemap_segment_unchanged(lastmod: str | None, watermark: str | None) -> bool:
+    current = parse_timestamp(lastmod)
+    previous = parse_timestamp(watermark)
+    return current is not None and previous is not None and current <= previous
+
+
+async def fetch_known_external_ids(supabase, external_ids) -> set:
+    known = set()
+    for idx, chunk in enumerate(chunked(list(external_ids), EXISTING_LOOKUP_CHUNK_SIZE), start=1):
+        res = await execute_with_retry(
+            label=f"sitemap-known-{idx}",
+            fn=lambda chunk=chunk: supabase.table("videos").select("external_id").in_("external_id", chunk).execute()
+        )
+        known.update(row["external_id"] for row in res.data or [])
+    return known
+
+
+async def load_sitemap_watermarks(supabase) -> dict:
+    res = await execute_with_retry(
+        label="sitemap-watermarks-load",
+        fn=lambda: supabase.table("sitemap_watermarks").select("url, lastmod").eq("source_site", "missav").execute()
+    )
+    return {row["url"]: row.get("lastmod") for row in res.data or []}
+
+
+async def save_sitemap_watermarks(supabase, watermarks: list[dict]):
+    scanned_at = datetime.now(timezone.utc).isoformat()
+    payload = [{**watermark, "source_site": "missav", "scanned_at": scanned_at} for watermark in watermarks]
+    for idx, chunk in enumerate(chunked(payload, SUPABASE_UPSERT_CHUNK_SIZE), start=1):
+        await execute_with_retry(
+            label=f"sitemap-watermarks-save-{idx}",
+            fn=lambda chunk=chunk: supabase.table("sitemap_watermarks").upsert(chunk, on_conflict="url").execute()
+        )
+
+
+async def discover_sitemap_videos(supabase, client, index_url: str, max_new: int) -> tuple[list[dict], dict]:
+    watermarks = {}
+    if supabase:
+        try:
+            watermarks = await load_sitemap_watermarks(supabase)
+        except Exception as e:
+            print(f"[Sitemap] Watermarks unavailable, scanning every segment: {e}")
+
+    report = {
+        "segments": 0,
+        "segments_scanned": 0,
+        "segments_skipped": 0,
+        "segments_failed": 0,
+        "entries": 0,
+        "known": 0,
+        "new": 0,
+        "truncated": False,
+        "watermarks": [],
+    }
+    new_videos = []
+    seen = set()
+    pending = []
+    segment_new = [0]
+
+    async def flush() -> bool:
+        if not pending:
+            return not report["truncated"]
+        known = await fetch_known_external_ids(supabase, [video["external_id"] for video in pending]) if supabase else set()
+        report["known"] += len(known)
+        for video in pending:
+            if video["external_id"] in known:
+                continue
+            if len(new_videos) >= max_new:
+                report["truncated"] = True
+                break
+            new_videos.append(video)
+            segment_new[0] += 1
+        pending.clear()
+        return not report["truncated"]
+
+    async def consider(entry: dict) -> bool:
+        report["entries"] += 1
+        external_id = missav_video_id_from_url(entry["loc"])
+        if not external_id or external_id in seen:
+            return True
+        seen.add(external_id)
+        pending.append(build_sitemap_video(entry, external_id))
+        if len(pending) >= EXISTING_LOOKUP_CHUNK_SIZE:
+            return await flush()
+        return True
+
+    segments = []
+    async for entry in stream_sitemap(client, index_url):
+        if entry["kind"] == "sitemap":
+            segments.append(entry)
+        elif not await consider(entry):
+            break
+    if not report["truncated"]:
+        await flush()
+
+    report["segments"] = len(segments)
+    segments.sort(key=lambda entry: parse_timestamp(entry.get("lastmod")) or 0.0, reverse=True)
+    for segment in segments:
+        if report["truncated"]:
+            break
+        url = segment["loc"]
+        if sitemap_segment_unchanged(segment.get("lastmod"), watermarks.get(url)):
+            report["segments_skipped"] += 1
+            continue
+        entries_before = report["entries"]
+        segment_new[0] = 0
+        try:
+            async for entry in stream_sitemap(client, url):
+                if entry["kind"] == "url" and not await consider(entry):
+                    break
+            if not report["truncated"]:
+                await flush()
+        except Exception as e:
+            report["segments_failed"] += 1
+            pending.clear()
+            print(f"[Sitemap] Segment failed {url}: {e}")
+            continue
+        report["segments_scanned"] += 1
+        if segment.get("lastmod") and not report["truncated"]:
+            report["watermarks"].append({
+                "url": url,
+                "lastmod": segment["lastmod"],
+                "entry_count": report["entries"] - entries_before,
+                "new_count": segment_new[0],
+            })
+
+    report["new"] = len(new_videos)
+    return new_videos, report
+
+
+def estimate_marginal_yields(samples: list[dict], max_pages: int, decay: float = PLANNER_YIELD_DECAY, prior_first_page: float = PLANNER_PRIOR_FIRST_PAGE_YIELD) -> list[float]:
+    totals = [0.0] * max_pages
+    counts = [0] * max_pages
+    for sample in samples:
+        page_yields = sample.get("page_yields") or []
+        pages = int(sample.get("pages") or 0)
+        if page_yields:
+            observed = [float(value or 0) for value in page_yields[:max_pages]]
+        elif pages > 0:
+            # Older runs only recorded totals: spread them over a geometric decay.
+            new_total = float(sample.get("new") or 0)
+            first_page = new_total * (1 - decay) / (1 - decay ** pages) if decay > 0 else new_total
+            observed = [first_page * decay ** k for k in range(min(pages, max_pages))]
+        else:
+            continue
+        for k, value in enumerate(observed):
+            totals[k] += value
+            counts[k] += 1
+
+    curve = []
+    for k in range(max_pages):
+        if counts[k]:
+            value = totals[k] / counts[k]
+        else:
+            value = curve[-1] * decay if curve else prior_first_page
+        if curve:
+            value = min(value, curve[-1])
+        curve.append(round(value, 4))
+    return curve
+
+
+def estimate_seconds_per_page(samples: list[dict], fallback: float) -> float:
+    elapsed = sum(float(sample.get("elapsed_seconds") or 0) for sample in samples if sample.get("elapsed_seconds"))
+    pages = sum(int(sample.get("pages") or 0) for sample in samples if sample.get("elapsed_seconds"))
+    if elapsed > 0 and pages > 0:
+        return elapsed / pages
+    return fallback
+
+
+def plan_page_budgets(
+    sources: list[dict],
+    history: dict,
+    max_pages: int,
+    time_budget_seconds: float,
+    default_seconds_per_page: float = PLANNER_DEFAULT_SECONDS_PER_PAGE,
+    min_pages: int = 1,
+) -> dict:
+    curves = {}
+    costs = {}
+    for source in sources:
+        samples = history.get(source["tag"], [])
+        curves[source["tag"]] = estimate_marginal_yields(samples, max_pages)
+        costs[source["tag"]] = max(estimate_seconds_per_page(samples, default_seconds_per_page), 0.1)
+
+    def value_rate(tag: str, page_index: int) -> float:
+        return curves[tag][page_index] / costs[tag]
+
+    ranked = sorted(sources, key=lambda source: value_rate(source["tag"], 0), reverse=True)
+    budgets = {source["tag"]: 0 for source in sources}
+    spent = 0.0
+
+    for source in ranked:
+        tag = source["tag"]
+        pages = min(min_pages, max_pages)
+        if spent + pages * costs[tag] > time_budget_seconds:
+            continue
+        budgets[tag] = pages
+        spent += pages * costs[tag]
+
+    # Curves are non-increasing, so taking the best yield-per-second page each step is optimal.
+    while True:
+        best_tag = None
+        best_rate = 0.0
+        for source in ranked:
+            tag = source["tag"]
+            page_index = budgets[tag]
+            if page_index >= max_pages or (page_index == 0 and min_pages > 0):
+                continue
+            if spent + costs[tag] > time_budget_seconds:
+                continue
+            rate = value_rate(tag, page_index)
+            if rate > best_rate:
+                best_tag, best_rate = tag, rate
+        if best_tag is None:
+            break
+        budgets[best_tag] += 1
+        spent += costs[best_tag]
+
+    planned_sources = [
+        {
+            "tag": source["tag"],
+            "pages": budgets[source["tag"]],
+            "expected_new": round(sum(curves[source["tag"]][:budgets[source["tag"]]]), 2),
+            "first_page_yield": curves[source["tag"]][0] if max_pages else 0,
+            "seconds_per_page": round(costs[source["tag"]], 2),
+            "history_runs": len(history.get(source["tag"], [])),
+        }
+        for source in ranked
+    ]
+    return {
+        "max_pages": max_pages,
+        "time_budget_seconds": round(time_budget_seconds, 1),
+        "planned_seconds": round(spent, 1),
+        "expected_new_total": round(sum(item["expected_new"] for item in planned_sources), 2),
+        "sources": planned_sources,
+    }
+
+
+def apply_page_plan(sources: list[dict], plan: dict) -> tuple[list[dict], dict]:
+    by_tag = {source["tag"]: source for source in sources}
+    ordered = [by_tag[item["tag"]] for item in plan["sources"] if item["pages"] > 0 and item["tag"] in by_tag]
+    return ordered, {item["tag"]: item["pages"] for item in plan["sources"]}
+
+
+def normalize_video_record(video) -> dict:
+    return VideoRecord.from_mapping(video).to_payload()
 
 
 def chunked(items, size):
@@ -717,108 +1762,827 @@ async def execute_with_retry(label: str, fn):
             await asyncio.sleep(wait)
 
 
-async def create_scrape_run(supabase, source: str):
-    if not supabase:
-        return None
-    try:
-        response = await execute_with_retry(
-            label=f"scrape-run-start-{source}",
-            fn=lambda: supabase.table("scrape_runs").insert({
-                "source": source,
-                "status": "running",
-            }).execute()
+VIDEO_RECORD_COLUMNS = (
+    "external_id, title, cover_url, cover_status, source_url, source_site, duration, actors, release_date, "
+    "tags, categories, detail_status, detail_fetched_at, inventory_status, detail_attempts, detail_last_outcome, "
+    "next_detail_attempt_at"
+)
+EXISTING_LOOKUP_CHUNK_SIZE = 200
+
+
+@profiled("fetch_existing_records")
+async def fetch_existing_records(supabase, external_ids, label: str) -> dict:
+    metadata_map = {}
+    for idx, chunk in enumerate(chunked(list(external_ids), EXISTING_LOOKUP_CHUNK_SIZE), start=1):
+        res = await execute_with_retry(
+            label=f"{label}-{idx}",
+            fn=lambda chunk=chunk: supabase.table("videos").select(VIDEO_RECORD_COLUMNS).in_("external_id", chunk).execute()
         )
-        if response.data:
-            return response.data[0]["id"]
-    except Exception as e:
-        print(f"[RunStats] Failed to create scrape_runs row: {e}")
-    return None
+        for record in res.data or []:
+            metadata_map[record["external_id"]] = record
+    return metadata_map
 
 
-async def finalize_scrape_run(supabase, run_id: str | None, stats: dict, source_breakdown: dict, status: str, error_message: str | None = None):
-    if not supabase or not run_id:
-        return
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 4
+SIMHASH_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+SIMHASH_SHINGLE_CHARS = 3
 
-    payload = {
-        "status": status,
-        "pages_scanned": stats["pages_scanned"],
-        "discovered_count": stats["discovered_count"],
-        "upserted_count": stats["upserted_count"],
-        "detail_success_count": stats["detail_success_count"],
-        "detail_fail_count": stats["detail_fail_count"],
-        "placeholder_cover_count": stats["placeholder_cover_count"],
-        "blocked_count": stats["blocked_count"],
-        "finished_at": datetime.now(timezone.utc).isoformat(),
-        "error_summary": json.dumps({
-            "new_external_count": stats["new_external_count"],
-            "existing_complete_count": stats["existing_complete_count"],
-            "sources": source_breakdown,
-            "error": error_message,
-        }, ensure_ascii=False)[:6000],
-    }
-    try:
-        await execute_with_retry(
-            label=f"scrape-run-finish-{run_id}",
-            fn=lambda: supabase.table("scrape_runs").update(payload).eq("id", run_id).execute()
-        )
-    except Exception as e:
-        print(f"[RunStats] Failed to finalize scrape_runs row {run_id}: {e}")
 
+def fingerprint_group_key(external_id: str) -> str:
+    # Variants of one MissAV title and the _2/_3 players of one 51cg post are never duplicates of each other.
+    return missav_content_key(external_id) or re.sub(r"^(51cg_\d+)_\d+$", r"\1", external_id)
 
-def write_step_summary(stats: dict, source_breakdown: dict):
-    summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
-    if not summary_path:
-        return
 
-    lines = [
-        "## MissNet scraper summary",
-        "",
-        f"- Pages scanned: {stats['pages_scanned']}",
+def normalize_fingerprint_title(title: str | None) -> str:
+    # Reposts decorate titles with bracketed labels such as 【高清】 or [中字].
+    text = unicodedata.normalize("NFKC", title or "").lower()
+    text = re.sub(r"【[^】]*】|\[[^\]]*\]", " ", text)
+    return re.sub(r"[\W_]+", "", text)
+
+
+def title_simhash(title: str | None, min_chars: int = NEAR_DUP_MIN_TITLE_CHARS) -> int | None:
+    text = normalize_fingerprint_title(title)
+    if len(text) < max(min_chars, SIMHASH_SHINGLE_CHARS):
+        return None
+    shingles = {text[i:i + SIMHASH_SHINGLE_CHARS] for i in range(len(text) - SIMHASH_SHINGLE_CHARS + 1)}
+    bits = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big"), "064b")
+        for shingle in shingles
+    ]
+    # Column-wise counting keeps the per-bit vote in C instead of a 64-step Python loop per shingle.
+    half = len(bits) / 2
+    return int("".join("1" if column.count("1") > half else "0" for column in zip(*bits)), 2)
+
+
+def simhash_bands(simhash: int) -> list[int]:
+    mask = (1 << SIMHASH_BAND_BITS) - 1
+    return [(simhash >> (band * SIMHASH_BAND_BITS)) & mask for band in range(SIMHASH_BANDS)]
+
+
+def cover_fingerprint(cover_url: str | None) -> str | None:
+    url = normalize_cover_url(cover_url)
+    if not url:
+        return None
+    # WordPress thumbnails of one upload differ only by the -WxH size suffix.
+    path = re.sub(r"-\d+x\d+(?=\.\w+$)", "", unquote(urlparse(url).path).lower())
+    if path.strip("/") == "":
+        return None
+    return hashlib.sha1(path.encode()).hexdigest()[:16]
+
+
+def video_fingerprint(video: dict) -> dict | None:
+    external_id = video.get("external_id")
+    simhash = title_simhash(video.get("title"))
+    cover = cover_fingerprint(video.get("cover_url"))
+    if not external_id or (simhash is None and cover is None):
+        return None
+    return {
+        "external_id": external_id,
+        "source_site": video.get("source_site") or infer_source_site(video.get("source_url")),
+        "group_key": fingerprint_group_key(external_id),
+        "title_simhash": simhash,
+        "cover_fingerprint": cover,
+        "duplicate_of": None,
+    }
+
+
+def signed_simhash(value: int | None) -> int | None:
+    # Postgres bigint is signed.
+    if value is None:
+        return None
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def fingerprint_row(fingerprint: dict) -> dict:
+    simhash = fingerprint["title_simhash"]
+    bands = simhash_bands(simhash) if simhash is not None else [None] * SIMHASH_BANDS
+    return {
+        "external_id": fingerprint["external_id"],
+        "source_site": fingerprint["source_site"],
+        "title_simhash": signed_simhash(simhash),
+        **{f"simhash_band_{band}": value for band, value in enumerate(bands)},
+        "cover_fingerprint": fingerprint["cover_fingerprint"],
+        "duplicate_of": fingerprint.get("duplicate_of"),
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def fingerprint_from_row(row: dict) -> dict:
+    simhash = row.get("title_simhash")
+    return {
+        "external_id": row["external_id"],
+        "source_site": row.get("source_site"),
+        "group_key": fingerprint_group_key(row["external_id"]),
+        "title_simhash": simhash % (1 << SIMHASH_BITS) if simhash is not None else None,
+        "cover_fingerprint": row.get("cover_fingerprint"),
+        "duplicate_of": row.get("duplicate_of"),
+    }
+
+
+class NearDuplicateIndex:
+    def __init__(self, max_distance: int = NEAR_DUP_MAX_DISTANCE):
+        # With SIMHASH_BANDS bands, any pair within BANDS - 1 bits agrees exactly on at least one band.
+        self.max_distance = min(max_distance, SIMHASH_BANDS - 1)
+        self.entries = {}
+        self.bands = {}
+        self.covers = {}
+        self.loaded_bands = set()
+        self.loaded_covers = set()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def add(self, fingerprint: dict):
+        external_id = fingerprint["external_id"]
+        if external_id in self.entries:
+            return
+        self.entries[external_id] = fingerprint
+        if fingerprint["title_simhash"] is not None:
+            for band, value in enumerate(simhash_bands(fingerprint["title_simhash"])):
+                self.bands.setdefault((band, value), []).append(external_id)
+        if fingerprint["cover_fingerprint"]:
+            self.covers.setdefault(fingerprint["cover_fingerprint"], []).append(external_id)
+
+    def canonical(self, external_id: str) -> str:
+        seen = set()
+        while external_id not in seen:
+            seen.add(external_id)
+            target = (self.entries.get(external_id) or {}).get("duplicate_of")
+            if not target:
+                break
+            external_id = target
+        return external_id
+
+    def title_close(self, entry: dict, simhash: int | None) -> bool:
+        # A title too short to hash can't confirm or rule out a match, so the cover decides.
+        if simhash is None or entry["title_simhash"] is None:
+            return True
+        return (entry["title_simhash"] ^ simhash).bit_count() <= self.max_distance
+
+    def match(self, fingerprint: dict) -> str | None:
+        group_key = fingerprint["group_key"]
+        simhash = fingerprint["title_simhash"]
+        cover_candidates = self.covers.get(fingerprint["cover_fingerprint"], []) if fingerprint["cover_fingerprint"] else []
+        # Fallback images and site logos pass normalize_cover_url too; a cover that several
+        # unrelated groups already use identifies nothing.
+        cover_groups = {self.entries[candidate]["group_key"] for candidate in cover_candidates if not self.entries[candidate].get("duplicate_of")}
+        if len(cover_groups) <= 1:
+            for candidate in cover_candidates:
+                entry = self.entries[candidate]
+                if entry["group_key"] != group_key and self.title_close(entry, simhash):
+                    return self.canonical(candidate)
+
+        if simhash is None:
+            return None
+        best = None
+        for band, value in enumerate(simhash_bands(simhash)):
+            for candidate in self.bands.get((band, value), []):
+                entry = self.entries[candidate]
+                if entry["group_key"] == group_key:
+                    continue
+                distance = (entry["title_simhash"] ^ simhash).bit_count()
+                if distance <= self.max_distance and (best is None or distance < best[0]):
+                    best = (distance, candidate)
+        return self.canonical(best[1]) if best else None
+
+
+NEAR_DUP_INDEX = NearDuplicateIndex()
+
+
+async def load_fingerprint_candidates(supabase, index: NearDuplicateIndex, fingerprints: list[dict]):
+    # Only pull stored fingerprints that share a band or cover with this batch, so a run stays O(new rows).
+    lookups = []
+    for fingerprint in fingerprints:
+        if fingerprint["title_simhash"] is not None:
+            lookups.extend((f"simhash_band_{band}", value) for band, value in enumerate(simhash_bands(fingerprint["title_simhash"])))
+        if fingerprint["cover_fingerprint"]:
+            lookups.append(("cover_fingerprint", fingerprint["cover_fingerprint"]))
+
+    by_column = {}
+    for column, value in lookups:
+        loaded = index.loaded_covers if column == "cover_fingerprint" else index.loaded_bands
+        if (column, value) not in loaded:
+            loaded.add((column, value))
+            by_column.setdefault(column, set()).add(value)
+
+    for column, values in by_column.items():
+        for idx, chunk in enumerate(chunked(sorted(values), EXISTING_LOOKUP_CHUNK_SIZE), start=1):
+            res = await execute_with_retry(
+                label=f"fingerprint-candidates-{column}-{idx}",
+                fn=lambda column=column, chunk=chunk: supabase.table("video_fingerprints")
+                .select("external_id, source_site, title_simhash, cover_fingerprint, duplicate_of")
+                .in_(column, chunk)
+                .execute()
+            )
+            for row in res.data or []:
+                index.add(fingerprint_from_row(row))
+
+
+async def save_video_fingerprints(supabase, fingerprints: list[dict]):
+    for idx, chunk in enumerate(chunked([fingerprint_row(fingerprint) for fingerprint in fingerprints], SUPABASE_UPSERT_CHUNK_SIZE), start=1):
+        await execute_with_retry(
+            label=f"fingerprint-save-{idx}",
+            fn=lambda chunk=chunk: supabase.table("video_fingerprints").upsert(chunk, on_conflict="external_id").execute()
+        )
+
+
+async def detect_near_duplicates(supabase, videos: list[dict], metadata_map: dict) -> tuple[dict, list[dict]]:
+    if not NEAR_DUP_DETECTION:
+        return {}, []
+    fingerprints = []
+    for video in videos:
+        if metadata_map.get(video["external_id"]):
+            continue
+        fingerprint = video_fingerprint(video)
+        if fingerprint:
+            fingerprints.append(fingerprint)
+    if not fingerprints:
+        return {}, []
+
+    if supabase:
+        try:
+            await load_fingerprint_candidates(supabase, NEAR_DUP_INDEX, fingerprints)
+        except Exception as e:
+            print(f"  [NearDup] Candidate lookup failed: {e}")
+
+    matches = {}
+    for fingerprint in fingerprints:
+        target = NEAR_DUP_INDEX.match(fingerprint)
+        if target:
+            fingerprint["duplicate_of"] = target
+            matches[fingerprint["external_id"]] = target
+        NEAR_DUP_INDEX.add(fingerprint)
+    return matches, fingerprints
+
+
+async def record_near_duplicates(supabase, fingerprints: list[dict]):
+    if not supabase or not fingerprints:
+        return
+    try:
+        await save_video_fingerprints(supabase, fingerprints)
+    except Exception as e:
+        print(f"  [NearDup] Failed to save {len(fingerprints)} fingerprints: {e}")
+
+
+async def seed_video_fingerprints(supabase):
+    stats = {**make_run_stats(), "fingerprinted_count": 0}
+    after_id = None
+    while supabase and not RUN_DEADLINE.stopping():
+        def query(after_id=after_id):
+            builder = supabase.table("videos").select("id, external_id, title, cover_url, source_url, source_site, duplicate_of")
+            if after_id:
+                builder = builder.gt("id", after_id)
+            return builder.order("id").limit(NEAR_DUP_SEED_PAGE_SIZE).execute()
+
+        response = await execute_with_retry(label=f"fingerprint-seed-{after_id or 'start'}", fn=query)
+        rows = response.data or []
+        if not rows:
+            break
+        after_id = rows[-1]["id"]
+        fingerprints = []
+        for row in rows:
+            fingerprint = video_fingerprint(row)
+            if fingerprint:
+                fingerprint["duplicate_of"] = row.get("duplicate_of")
+                fingerprints.append(fingerprint)
+        await save_video_fingerprints(supabase, fingerprints)
+        stats["pages_scanned"] += 1
+        stats["discovered_count"] += len(rows)
+        stats["fingerprinted_count"] += len(fingerprints)
+        print(f"[NearDup] Seeded {stats['fingerprinted_count']} fingerprints from {stats['discovered_count']} videos")
+    return stats, {"fingerprints": dict(stats)}
+
+
+def create_http_client(max_connections: int):
+    # httpx ships with supabase-py; imported lazily so list/detail code paths don't depend on it.
+    import httpx
+
+    return httpx.AsyncClient(
+        headers={"User-Agent": USER_AGENT},
+        timeout=httpx.Timeout(max(HTTP_TIMEOUT_SECONDS, 1.0)),
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+        follow_redirects=True,
+    )
+
+
+class HostPoliteness:
+    def __init__(self, max_concurrency: int = HOST_MAX_CONCURRENCY, min_interval: float = HOST_MIN_INTERVAL_SECONDS):
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_interval = max(0.0, min_interval)
+        self._semaphores = {}
+        self._next_start = {}
+
+    @asynccontextmanager
+    async def slot(self, url: str):
+        host = urlparse(url).netloc.lower()
+        semaphore = self._semaphores.setdefault(host, asyncio.Semaphore(self.max_concurrency))
+        async with semaphore:
+            loop = asyncio.get_running_loop()
+            now = loop.time()
+            start = max(now, self._next_start.get(host, now))
+            self._next_start[host] = start + self.min_interval
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
+
+
+def build_cover_candidates(external_id: str | None, source_site: str | None) -> list[str]:
+    if (source_site or "missav") != "missav":
+        return []
+    video_id = str(external_id or "").strip().lower()
+    if not video_id or "/" in video_id:
+        return []
+
+    ids = [video_id]
+    for suffix in MISSAV_VARIANT_SUFFIXES:
+        if video_id.endswith(suffix):
+            ids.append(video_id[: -len(suffix)])
+    return ordered_unique(f"{MISSAV_COVER_BASE_URL}/{candidate}/cover-n.jpg" for candidate in ids)
+
+
+async def probe_cover_candidate(client, politeness: HostPoliteness, url: str) -> bool:
+    try:
+        async with politeness.slot(url):
+            response = await client.head(url)
+            if response.status_code in {405, 501}:
+                async with client.stream("GET", url) as streamed:
+                    response = streamed
+    except Exception as e:
+        print(f"  [PredictCover] {url}: {e}")
+        return False
+    content_type = str(response.headers.get("content-type") or "").lower()
+    return response.status_code == 200 and (not content_type or content_type.startswith("image/"))
+
+
+async def resolve_predicted_covers(targets: list[dict]) -> dict:
+    politeness = HostPoliteness(max_concurrency=PREDICTIVE_COVER_CONCURRENCY)
+
+    async with create_http_client(PREDICTIVE_COVER_CONCURRENCY) as client:
+        async def resolve(target):
+            for url in build_cover_candidates(target["external_id"], target.get("source_site")):
+                if await probe_cover_candidate(client, politeness, url):
+                    return target["external_id"], url
+            return target["external_id"], None
+
+        results = await asyncio.gather(*(resolve(target) for target in targets))
+    return {external_id: url for external_id, url in results if url}
+
+
+def parse_source_yield_history(rows: list[dict]) -> dict:
+    history = {}
+    for row in rows:
+        yields = row.get("source_yields")
+        if not yields:
+            try:
+                summary = json.loads(row.get("error_summary") or "{}")
+            except (TypeError, ValueError):
+                continue
+            yields = {
+                tag: {"pages": stats.get("pages_scanned", 0), "new": stats.get("new_external_count", 0)}
+                for tag, stats in (summary.get("sources") or {}).items()
+                if isinstance(stats, dict)
+            }
+        for tag, sample in (yields or {}).items():
+            history.setdefault(tag, []).append(sample)
+    return history
+
+
+async def load_source_yield_history(supabase, run_source: str, limit: int = PLANNER_HISTORY_RUNS) -> dict:
+    response = await execute_with_retry(
+        label="planner-history",
+        fn=lambda: supabase.table("scrape_runs").select(
+            "source_yields, error_summary"
+        ).eq("source", run_source).in_("status", ["success", "partial"]).order("started_at", desc=True).limit(limit).execute()
+    )
+    return parse_source_yield_history(response.data or [])
+
+
+async def update_scrape_run(supabase, run_id: str | None, fields: dict, label: str):
+    if not supabase or not run_id:
+        return
+    try:
+        await execute_with_retry(
+            label=f"scrape-run-{label}-{run_id}",
+            fn=lambda: supabase.table("scrape_runs").update(fields).eq("id", run_id).execute()
+        )
+    except Exception as e:
+        print(f"[RunStats] Failed to record {label} on scrape_runs row {run_id}: {e}")
+
+
+def storage_state_host(value: str) -> str:
+    if "://" in value:
+        return urlparse(value).netloc.lower()
+    return value.lstrip(".").lower()
+
+
+def cookie_is_live(cookie: dict, now: float) -> bool:
+    expires = cookie.get("expires")
+    return expires is None or expires < 0 or expires > now
+
+
+def split_storage_state(state: dict, now: float) -> dict:
+    hosts = {}
+    for cookie in state.get("cookies") or []:
+        if not cookie_is_live(cookie, now):
+            continue
+        host = storage_state_host(str(cookie.get("domain") or ""))
+        hosts.setdefault(host, {"cookies": [], "origins": []})["cookies"].append(cookie)
+    for origin in state.get("origins") or []:
+        host = storage_state_host(str(origin.get("origin") or ""))
+        if origin.get("localStorage"):
+            hosts.setdefault(host, {"cookies": [], "origins": []})["origins"].append(origin)
+    return {host: entry for host, entry in hosts.items() if host}
+
+
+def save_browser_state(state: dict, directory: str, now: float | None = None) -> int:
+    now = time.time() if now is None else now
+    os.makedirs(directory, exist_ok=True)
+    hosts = split_storage_state(state, now)
+    for host, entry in hosts.items():
+        path = os.path.join(directory, f"{re.sub(r'[^a-z0-9.-]', '_', host)}.json")
+        with open(path, "w", encoding="utf-8") as fp:
+            json.dump({"host": host, "saved_at": now, **entry}, fp, ensure_ascii=False)
+    return len(hosts)
+
+
+def load_browser_state(directory: str, now: float | None = None, max_age_seconds: float | None = None, hosts: set | None = None) -> dict:
+    now = time.time() if now is None else now
+    max_age_seconds = BROWSER_STATE_MAX_AGE_HOURS * 3600 if max_age_seconds is None else max_age_seconds
+    loaded = {"cookies": [], "origins": [], "hosts": []}
+    if not directory or not os.path.isdir(directory):
+        return loaded
+    for name in sorted(os.listdir(directory)):
+        if not name.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(directory, name), encoding="utf-8") as fp:
+                entry = json.load(fp)
+        except (OSError, ValueError):
+            continue
+        host = entry.get("host") or ""
+        if hosts is not None and not any(host == item or host.endswith(f".{item}") for item in hosts):
+            continue
+        if now - float(entry.get("saved_at") or 0) > max_age_seconds:
+            continue
+        cookies = [cookie for cookie in entry.get("cookies") or [] if cookie_is_live(cookie, now)]
+        if not cookies and not entry.get("origins"):
+            continue
+        loaded["cookies"].extend(cookies)
+        loaded["origins"].extend(entry.get("origins") or [])
+        loaded["hosts"].append(host)
+    return loaded
+
+
+def build_local_storage_script(origin: dict) -> str:
+    items = {item["name"]: item["value"] for item in origin.get("localStorage") or []}
+    return (
+        f"if (window.location.origin === {json.dumps(origin['origin'])}) {{"
+        f"const items = {json.dumps(items, ensure_ascii=False)};"
+        "for (const [key, value] of Object.entries(items)) {"
+        "if (window.localStorage.getItem(key) === null) window.localStorage.setItem(key, value);"
+        "}}"
+    )
+
+
+async def restore_browser_state(context, hosts: set | None = None) -> dict:
+    report = {"warm_start": False, "hosts_restored": 0, "cookies_restored": 0}
+    if not BROWSER_STATE_DIR:
+        return report
+    loaded = load_browser_state(BROWSER_STATE_DIR, hosts=hosts)
+    try:
+        if loaded["cookies"]:
+            await context.add_cookies(loaded["cookies"])
+        for origin in loaded["origins"]:
+            await context.add_init_script(script=build_local_storage_script(origin))
+    except Exception as e:
+        print(f"[BrowserState] Failed to restore state from {BROWSER_STATE_DIR}: {e}")
+        return report
+    report.update({
+        "warm_start": bool(loaded["hosts"]),
+        "hosts_restored": len(loaded["hosts"]),
+        "cookies_restored": len(loaded["cookies"]),
+    })
+    print(f"[BrowserState] Restored {report['cookies_restored']} cookies for {report['hosts_restored']} hosts.")
+    return report
+
+
+async def persist_browser_state(context):
+    if not BROWSER_STATE_DIR:
+        return 0
+    try:
+        saved = save_browser_state(await context.storage_state(), BROWSER_STATE_DIR)
+        print(f"[BrowserState] Saved state for {saved} hosts to {BROWSER_STATE_DIR}.")
+        return saved
+    except Exception as e:
+        print(f"[BrowserState] Failed to save state to {BROWSER_STATE_DIR}: {e}")
+        return 0
+
+
+def record_first_page(report: dict, launch_started: float, blocked: bool):
+    report["first_page_attempts"] = report.get("first_page_attempts", 0) + 1
+    report["first_page_blocked"] = report.get("first_page_blocked", 0) + int(blocked)
+    report["first_page_block_rate"] = round(report["first_page_blocked"] / report["first_page_attempts"], 3)
+    if not blocked and "time_to_first_page_seconds" not in report:
+        report["time_to_first_page_seconds"] = round(time.monotonic() - launch_started, 2)
+
+
+async def close_context(context):
+    await persist_browser_state(context)
+    await context.close()
+
+
+async def create_scrape_run(supabase, source: str):
+    if not supabase:
+        return None
+    try:
+        response = await execute_with_retry(
+            label=f"scrape-run-start-{source}",
+            fn=lambda: supabase.table("scrape_runs").insert({
+                "source": source,
+                "status": "running",
+            }).execute()
+        )
+        if response.data:
+            return response.data[0]["id"]
+    except Exception as e:
+        print(f"[RunStats] Failed to create scrape_runs row: {e}")
+    return None
+
+
+ERROR_SUMMARY_MAX_CHARS = 6000
+SUMMARY_COUNTER_KEYS = (
+    "new_external_count", "existing_complete_count", "retry_recovered_count", "retry_lost_count",
+    "detail_shared_count", "near_duplicate_count", "detail_backoff_count",
+)
+
+
+def build_error_summary(stats: dict, source_breakdown: dict, error_message: str | None = None, run_report: dict | None = None, limit: int = ERROR_SUMMARY_MAX_CHARS) -> str:
+    # Counters and the run report come first; per-source detail is what gets dropped when the summary
+    # is too long, so the stored text always stays valid JSON.
+    summary = {key: stats[key] for key in SUMMARY_COUNTER_KEYS}
+    summary["error"] = (error_message or "")[:1000] or None
+    summary.update(run_report or {})
+    compact_sources = {
+        tag: {"pages_scanned": source_stats.get("pages_scanned", 0), "new_external_count": source_stats.get("new_external_count", 0)}
+        for tag, source_stats in source_breakdown.items()
+        if isinstance(source_stats, dict)
+    }
+    for sources in (source_breakdown, compact_sources):
+        text = json.dumps({**summary, "sources": sources}, ensure_ascii=False)
+        if len(text) <= limit:
+            return text
+    text = json.dumps({**summary, "sources_omitted": len(source_breakdown)}, ensure_ascii=False)
+    if len(text) <= limit:
+        return text
+    # The full report is still stored in scrape_runs.run_report.
+    return json.dumps({key: summary[key] for key in (*SUMMARY_COUNTER_KEYS, "error")} | {"sources_omitted": len(source_breakdown), "run_report_omitted": True}, ensure_ascii=False)
+
+
+async def finalize_scrape_run(supabase, run_id: str | None, stats: dict, source_breakdown: dict, status: str, error_message: str | None = None, run_report: dict | None = None):
+    if not supabase or not run_id:
+        return
+
+    payload = {
+        "status": status,
+        "pages_scanned": stats["pages_scanned"],
+        "discovered_count": stats["discovered_count"],
+        "upserted_count": stats["upserted_count"],
+        "detail_success_count": stats["detail_success_count"],
+        "detail_fail_count": stats["detail_fail_count"],
+        "placeholder_cover_count": stats["placeholder_cover_count"],
+        "blocked_count": stats["blocked_count"],
+        "finished_at": datetime.now(timezone.utc).isoformat(),
+        "error_summary": build_error_summary(stats, source_breakdown, error_message, run_report),
+        "run_report": run_report or None,
+    }
+    try:
+        await execute_with_retry(
+            label=f"scrape-run-finish-{run_id}",
+            fn=lambda: supabase.table("scrape_runs").update(payload).eq("id", run_id).execute()
+        )
+    except Exception as e:
+        print(f"[RunStats] Failed to finalize scrape_runs row {run_id}: {e}")
+
+
+def write_step_summary(stats: dict, source_breakdown: dict, run_report: dict | None = None):
+    summary_path = os.environ.get("GITHUB_STEP_SUMMARY")
+    if not summary_path:
+        return
+
+    lines = [
+        "## MissNet scraper summary",
+        "",
+        f"- Pages scanned: {stats['pages_scanned']}",
         f"- Discovered: {stats['discovered_count']}",
         f"- New external IDs: {stats['new_external_count']}",
         f"- Detail attempts: {stats['detail_attempted_count']}",
         f"- Detail successes: {stats['detail_success_count']}",
         f"- Detail failures: {stats['detail_fail_count']}",
+        f"- Detail fetches shared by variants: {stats['detail_shared_count']}",
+        f"- Near-duplicates linked: {stats['near_duplicate_count']}",
+        f"- Detail fetches deferred by backoff: {stats['detail_backoff_count']}",
         f"- Blocked: {stats['blocked_count']}",
+        f"- Retries recovered: {stats['retry_recovered_count']}",
+        f"- Retries lost: {stats['retry_lost_count']}",
         f"- Placeholder covers filtered: {stats['placeholder_cover_count']}",
         f"- Upserted: {stats['upserted_count']}",
         "",
         "### Sources",
         "",
     ]
+    base_keys = set(make_run_stats())
     for source, source_stats in source_breakdown.items():
+        extras = "".join(f", {key}={value}" for key, value in source_stats.items() if key not in base_keys)
         lines.append(
             f"- `{source}`: pages={source_stats['pages_scanned']}, discovered={source_stats['discovered_count']}, "
             f"new={source_stats['new_external_count']}, detail_ok={source_stats['detail_success_count']}, "
-            f"detail_fail={source_stats['detail_fail_count']}, upserted={source_stats['upserted_count']}"
+            f"detail_fail={source_stats['detail_fail_count']}, upserted={source_stats['upserted_count']}{extras}"
         )
 
+    for section, report in (run_report or {}).items():
+        if not report:
+            continue
+        lines.extend(["", f"### {section.replace('_', ' ').capitalize()}", ""])
+        lines.extend(f"- {key}: {value}" for key, value in report.items())
+
     with open(summary_path, "a", encoding="utf-8") as fp:
         fp.write("\n".join(lines) + "\n")
 
 
+class BufferedSink(abc.ABC):
+    def __init__(self, buffer_rows: int = SINK_BUFFER_ROWS):
+        self.buffer_rows = max(1, buffer_rows)
+        self.buffer = []
+        self.written = 0
+        self.lock = asyncio.Lock()
+
+    async def write(self, records: list[dict], label: str = "sink") -> int:
+        self.buffer.extend(records)
+        if len(self.buffer) >= self.buffer_rows:
+            await self.flush(label)
+        return len(records)
+
+    async def flush(self, label: str = "sink"):
+        async with self.lock:
+            rows, self.buffer = self.buffer, []
+            if rows:
+                await self.write_rows(rows, label)
+                self.written += len(rows)
+
+    @abc.abstractmethod
+    async def write_rows(self, rows: list[dict], label: str):
+        ...
+
+    async def close(self):
+        await self.flush("close")
+
+
+class SupabaseSink(BufferedSink):
+    def __init__(self, supabase, chunk_size: int = SUPABASE_UPSERT_CHUNK_SIZE):
+        super().__init__(buffer_rows=1)
+        self.supabase = supabase
+        self.chunk_size = chunk_size
+
+    async def write_rows(self, rows: list[dict], label: str):
+        for idx, chunk in enumerate(chunked(rows, self.chunk_size), start=1):
+            payload = [video_payload(row) for row in chunk]
+            await execute_with_retry(
+                label=f"{label}-chunk-{idx}",
+                fn=lambda payload=payload: self.supabase.table("videos").upsert(payload, on_conflict="external_id").execute()
+            )
+
+
+class SQLiteSink(BufferedSink):
+    def __init__(self, path: str, buffer_rows: int = SINK_BUFFER_ROWS):
+        super().__init__(buffer_rows)
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute(
+            "create table if not exists videos ("
+            "external_id text primary key, source_site text, detail_status text, cover_status text, "
+            "record text not null, updated_at text not null)"
+        )
+        self.connection.commit()
+
+    def load(self, external_ids) -> dict:
+        found = {}
+        for chunk in chunked(list(external_ids), 500):
+            placeholders = ",".join("?" for _ in chunk)
+            for external_id, record in self.connection.execute(
+                f"select external_id, record from videos where external_id in ({placeholders})", chunk
+            ):
+                found[external_id] = json.loads(record)
+        return found
+
+    def merge_rows(self, rows: list[dict]):
+        latest = {}
+        for row in rows:
+            latest[row["external_id"]] = merge_video_record(row, latest.get(row["external_id"]))
+        existing = self.load(latest)
+        updated_at = datetime.now(timezone.utc).isoformat()
+        payload = []
+        for external_id, row in latest.items():
+            merged = merge_video_record(row, existing.get(external_id)).to_payload()
+            payload.append((
+                external_id,
+                merged.get("source_site"),
+                merged.get("detail_status"),
+                merged.get("cover_status"),
+                json.dumps(merged, ensure_ascii=False),
+                updated_at,
+            ))
+        with self.connection:
+            self.connection.executemany(
+                "insert into videos (external_id, source_site, detail_status, cover_status, record, updated_at) "
+                "values (?, ?, ?, ?, ?, ?) on conflict(external_id) do update set "
+                "source_site = excluded.source_site, detail_status = excluded.detail_status, "
+                "cover_status = excluded.cover_status, record = excluded.record, updated_at = excluded.updated_at",
+                payload,
+            )
+
+    async def write_rows(self, rows: list[dict], label: str):
+        await asyncio.to_thread(self.merge_rows, rows)
+
+    async def close(self):
+        await super().close()
+        self.connection.close()
+
+
+def open_compressed_text(path: str, mode: str):
+    writing = mode.startswith("a") or mode.startswith("w")
+    if path.endswith(".zst"):
+        # zstandard is optional; gzip and plain JSONL work without it.
+        import io
+        import zstandard
+
+        if writing:
+            raw = zstandard.ZstdCompressor().stream_writer(open(path, mode[0] + "b"))
+        else:
+            raw = zstandard.ZstdDecompressor().stream_reader(open(path, "rb"), read_across_frames=True)
+        return io.TextIOWrapper(raw, encoding="utf-8")
+    if path.endswith(".gz"):
+        return gzip.open(path, mode[0] + "t", encoding="utf-8")
+    return open(path, mode[0], encoding="utf-8")
+
+
+class JsonlSink(BufferedSink):
+    def __init__(self, path: str, buffer_rows: int = SINK_BUFFER_ROWS):
+        super().__init__(buffer_rows)
+        self.path = path
+        self.fp = open_compressed_text(path, "at")
+
+    def append_rows(self, rows: list[dict]):
+        self.fp.write("".join(json.dumps(video_payload(row), ensure_ascii=False) + "\n" for row in rows))
+
+    async def write_rows(self, rows: list[dict], label: str):
+        await asyncio.to_thread(self.append_rows, rows)
+
+    async def close(self):
+        await super().close()
+        self.fp.close()
+
+
+def read_jsonl_records(path: str):
+    with open_compressed_text(path, "rt") as fp:
+        for line in fp:
+            if line.strip():
+                yield json.loads(line)
+
+
+def open_video_sink(kind: str = OUTPUT_SINK, path: str = OUTPUT_SINK_PATH):
+    if kind in {"", "supabase"}:
+        return None
+    if not path:
+        raise ValueError(f"OUTPUT_SINK={kind} needs OUTPUT_SINK_PATH")
+    if kind == "sqlite":
+        return SQLiteSink(path)
+    if kind == "jsonl":
+        return JsonlSink(path)
+    raise ValueError(f"Unknown OUTPUT_SINK: {kind}")
+
+
+VIDEO_SINK = None
+
+
+@profiled("batch_upsert_videos")
 async def batch_upsert_videos(records, supabase, mode_label):
     if not records:
         return {"upserted_count": 0, "placeholder_cover_count": 0}
 
-    placeholder_cover_count = sum(1 for record in records if looks_like_placeholder_cover(record.get("cover_url")))
-    normalized = [normalize_video_record(v) for v in records]
+    normalized = [VideoRecord.from_mapping(record) for record in records]
+    placeholder_cover_count = sum(1 for record in normalized if record.placeholder_cover)
 
+    sink = VIDEO_SINK or (SupabaseSink(supabase) if supabase else None)
     # No DB client: keep visible logs for local dry run
-    if not supabase:
+    if not sink:
         for v in normalized[:5]:
             print(f"  [{mode_label}] Prepared: {v.get('title', '')[:30]}... | Dur: {v.get('duration')} | Actors: {v.get('actors')}")
         if len(normalized) > 5:
             print(f"  [{mode_label}] Prepared {len(normalized)} records (dry-run without Supabase)")
         return {"upserted_count": len(normalized), "placeholder_cover_count": placeholder_cover_count}
 
-    synced = 0
-    for idx, payload in enumerate(chunked(normalized, SUPABASE_UPSERT_CHUNK_SIZE), start=1):
-        await execute_with_retry(
-            label=f"{mode_label}-chunk-{idx}",
-            fn=lambda payload=payload: supabase.table("videos").upsert(payload, on_conflict="external_id").execute()
-        )
-        synced += len(payload)
+    synced = await sink.write(normalized, label=mode_label)
     print(f"  [{mode_label}] Batch upserted {synced} records")
     return {"upserted_count": synced, "placeholder_cover_count": placeholder_cover_count}
 
@@ -831,10 +2595,11 @@ def map_categories(title, tags):
             refined.append(category)
     return refined
 
+@profiled("get_video_details")
 async def get_video_details(page, url):
     try:
         await jitter_sleep(DETAIL_PRE_NAV_DELAY_MIN, DETAIL_PRE_NAV_DELAY_MAX)
-        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        await playwright_call("goto", page.goto(url, timeout=60000, wait_until="domcontentloaded"))
         
         # Optimize: Wait for metadata selector instead of hard sleep
         try:
@@ -849,7 +2614,7 @@ async def get_video_details(page, url):
             return {"_status": "blocked", "duration": None, "release_date": None, "actors": [], "tags": []}
 
         # Robust DOM-based parsing without complex regex in JS
-        details = await page.evaluate('''() => {
+        details = await playwright_call("evaluate", page.evaluate('''() => {
             const data = { duration: null, release_date: null, actors: [], tags: [], cover_url: null };
             const rows = document.querySelectorAll('div.text-secondary');
             
@@ -898,7 +2663,7 @@ async def get_video_details(page, url):
                 return !lower.startsWith('data:image') && !lower.startsWith('blob:') && !lower.startsWith('about:blank');
             }) || null;
             return data;
-        }''')
+        }'''))
         
         if not details:
             details = {"duration": None, "release_date": None, "actors": [], "tags": []}
@@ -925,10 +2690,29 @@ async def get_video_details(page, url):
         print(f"  Detail Fetch Error: {e}")
         return {"_status": "error", "duration": None, "release_date": None, "actors": [], "tags": []}
 
+
+DETAIL_RETRY_STATUSES = {"blocked", "error", "circuit_open"}
+
+
+async def fetch_video_details(page, url):
+    if not await HOST_BREAKER.wait_until_allowed(url):
+        return {"_status": "circuit_open", "duration": None, "release_date": None, "actors": [], "tags": []}
+    try:
+        details = await get_video_details(page, url)
+    except BaseException:
+        HOST_BREAKER.record_failure(url)
+        raise
+    if (details or {}).get("_status", "success") in {"blocked", "error"}:
+        HOST_BREAKER.record_failure(url)
+    else:
+        HOST_BREAKER.record_success(url)
+    return details
+
+@profiled("get_51cg_details")
 async def get_51cg_details(page, url):
     try:
         await jitter_sleep(DETAIL_PRE_NAV_DELAY_MIN, DETAIL_PRE_NAV_DELAY_MAX)
-        await page.goto(url, timeout=60000, wait_until="domcontentloaded")
+        await playwright_call("goto", page.goto(url, timeout=60000, wait_until="domcontentloaded"))
         
         try:
             await page.wait_for_selector('h1.post-title', timeout=5000)
@@ -936,7 +2720,7 @@ async def get_51cg_details(page, url):
             pass
         await jitter_sleep(DETAIL_POST_LOAD_DELAY_MIN, DETAIL_POST_LOAD_DELAY_MAX)
 
-        details = await page.evaluate(r'''() => {
+        details = await playwright_call("evaluate", page.evaluate(r'''() => {
             const data = { tags: [], actors: [], title: null, release_date: null, videos: [] };
             
             const titleEl = document.querySelector('h1.post-title');
@@ -986,7 +2770,7 @@ async def get_51cg_details(page, url):
             });
 
             return data;
-        }''')
+        }'''))
         
         # Fallback for single m3u8 in content if no DPlayer found
         if not details['videos']:
@@ -1004,7 +2788,62 @@ async def get_51cg_details(page, url):
         print(f"  51CG Detail Fetch Error: {e}")
         return {"_status": "error", "tags": [], "actors": [], "title": None, "release_date": None, "videos": []}
 
-async def process_page_batch(videos, source_tag, detail_pages, supabase, semaphore, detail_fetch_policy="smart"):
+def source_tag_values(source_tag: str) -> list[str]:
+    # Sitemap rows have no listing of origin, so they must not be tagged with the stage name.
+    return [] if source_tag == SITEMAP_SOURCE_TAG else [source_tag]
+
+
+def build_missav_list_row(vid: dict, source_tag: str, existing: dict | None) -> dict:
+    vid['categories'] = normalize_taxonomy_values(source_tag_values(source_tag) + map_categories(vid['title'], []))
+    vid['tags'] = normalize_taxonomy_values(source_tag_values(source_tag) + vid.get('tags', []))
+    return merge_video_record(vid, existing)
+
+
+SHARED_VARIANT_DETAIL_FIELDS = ("duration", "actors", "release_date", "tags")
+
+
+def build_missav_detail_row(vid: dict, details: dict, source_tag: str, existing: dict | None) -> dict:
+    vid.update(details)
+    vid['categories'] = normalize_taxonomy_values(source_tag_values(source_tag) + map_categories(vid['title'], vid.get('tags', [])))
+    vid['tags'] = normalize_taxonomy_values(source_tag_values(source_tag) + vid.get('tags', []))
+    return merge_video_record(vid, existing)
+
+
+async def prepare_video_detail(vid, source_tag, existing_record, detail_pages, semaphore, page_stats, rows_to_upsert) -> str:
+    async with semaphore:
+        if RUN_DEADLINE.stopping():
+            RUN_DEADLINE.defer("details_deferred")
+            rows_to_upsert.append(build_missav_list_row(vid, source_tag, existing_record))
+            return "deferred"
+        page = detail_pages.pop()
+        try:
+            details = await fetch_video_details(page, vid['source_url'])
+            status = (details or {}).pop("_status", "success") if details else "success"
+            if status == "blocked":
+                page_stats["blocked_count"] += 1
+            elif status == "error":
+                page_stats["detail_fail_count"] += 1
+
+            if details and (details.get('duration') or details.get('actors') or details.get('release_date') or details.get('tags')):
+                page_stats["detail_success_count"] += 1
+                rows_to_upsert.append(build_missav_detail_row(vid, details, source_tag, existing_record).note_detail_attempt("success"))
+                return "success"
+            if status not in DETAIL_RETRY_STATUSES:
+                page_stats["detail_fail_count"] += 1
+            outcome = status if status in DETAIL_RETRY_STATUSES else "empty"
+            row = build_missav_list_row(vid, source_tag, existing_record)
+            rows_to_upsert.append(row if outcome == "circuit_open" else row.note_detail_attempt(outcome))
+            return outcome
+        except Exception as e:
+            page_stats["detail_fail_count"] += 1
+            print(f"  [Detail Error] {vid.get('source_url')}: {e}")
+            return "error"
+        finally:
+            detail_pages.append(page)
+
+
+@profiled("process_page_batch")
+async def process_page_batch(videos, source_tag, detail_pages, supabase, semaphore, detail_fetch_policy="smart", retry_queue=None):
     if not videos:
         return {"stale_page": True, **make_run_stats()}
 
@@ -1015,21 +2854,16 @@ async def process_page_batch(videos, source_tag, detail_pages, supabase, semapho
     metadata_map = {}
     if supabase:
         try:
-            res = await execute_with_retry(
-                label=f"{source_tag}-metadata-check",
-                fn=lambda: supabase.table("videos").select(
-                    "external_id, title, cover_url, cover_status, source_url, source_site, duration, actors, release_date, tags, categories, detail_status, detail_fetched_at, inventory_status"
-                ).in_("external_id", external_ids).execute()
-            )
-            for record in res.data:
-                metadata_map[record['external_id']] = record
+            metadata_map = await fetch_existing_records(supabase, external_ids, label=f"{source_tag}-metadata-check")
         except Exception as e:
             print(f"  Batch Check Error: {e}")
+    duplicates, fingerprints = await detect_near_duplicates(supabase, videos, metadata_map)
 
     rows_to_upsert = []
     tasks = []
     details_needed_count = 0
     cover_needed_count = 0
+    variant_leaders = {}
     for v in videos:
         ext_id = v['external_id']
         existing = metadata_map.get(ext_id)
@@ -1037,51 +2871,50 @@ async def process_page_batch(videos, source_tag, detail_pages, supabase, semapho
             page_stats["new_external_count"] += 1
         elif classify_cover_status(existing.get("cover_url")) == "missing":
             cover_needed_count += 1
-        if not should_fetch_details(existing, detail_fetch_policy=detail_fetch_policy):
-            print(f"  [Skip] {v['title'][:30]}... (Metadata exists)")
-            page_stats["existing_complete_count"] += 1
-            rows_to_upsert.append(
-                merge_video_record(
-                    {
-                        **v,
-                        "categories": normalize_taxonomy_values([source_tag] + (v.get("categories") or [])),
-                        "tags": normalize_taxonomy_values([source_tag] + (v.get("tags") or [])),
-                    },
-                    existing,
-                )
-            )
+        if ext_id in duplicates:
+            print(f"  [NearDup] {ext_id} duplicates {duplicates[ext_id]}")
+            page_stats["near_duplicate_count"] += 1
+            v["duplicate_of"] = duplicates[ext_id]
+            rows_to_upsert.append(build_missav_list_row(v, source_tag, existing))
+        elif skip_reason := detail_skip_reason(existing, detail_fetch_policy=detail_fetch_policy):
+            if skip_reason == "backoff":
+                print(f"  [Backoff] {v['title'][:30]}... (next detail attempt {existing.get('next_detail_attempt_at')})")
+                page_stats["detail_backoff_count"] += 1
+            else:
+                print(f"  [Skip] {v['title'][:30]}... (Metadata exists)")
+                page_stats["existing_complete_count"] += 1
+            rows_to_upsert.append(VideoRecord.from_mapping(v).prepend_taxonomy(source_tag_values(source_tag)).merge(existing))
         else:
             details_needed_count += 1
-            page_stats["detail_attempted_count"] += 1
-            async def scrape_and_prepare(vid=v):
-                async with semaphore:
-                    page = detail_pages.pop()
-                    try:
-                        details = await get_video_details(page, vid['source_url'])
-                        existing_record = metadata_map.get(vid['external_id'])
-                        status = (details or {}).pop("_status", "success") if details else "success"
-                        if status == "blocked":
-                            page_stats["blocked_count"] += 1
-                        elif status == "error":
-                            page_stats["detail_fail_count"] += 1
-
-                        if details and (details.get('duration') or details.get('actors') or details.get('release_date') or details.get('tags')):
-                            vid.update(details)
-                            vid['categories'] = normalize_taxonomy_values([source_tag] + map_categories(vid['title'], vid.get('tags', [])))
-                            vid['tags'] = normalize_taxonomy_values([source_tag] + vid.get('tags', []))
-                            page_stats["detail_success_count"] += 1
-                            rows_to_upsert.append(merge_video_record(vid, existing_record))
-                        else:
-                            vid['categories'] = normalize_taxonomy_values([source_tag] + map_categories(vid['title'], []))
-                            vid['tags'] = normalize_taxonomy_values([source_tag] + vid.get('tags', []))
-                            if status not in {"blocked", "error"}:
-                                page_stats["detail_fail_count"] += 1
-                            rows_to_upsert.append(merge_video_record(vid, existing_record))
-                    except Exception as e:
-                        page_stats["detail_fail_count"] += 1
-                        print(f"  [Detail Error] {vid.get('source_url')}: {e}")
-                    finally:
-                        detail_pages.append(page)
+            share_key = variant_share_key(v)
+            leader = variant_leaders.get(share_key) if share_key else None
+            shared = None
+            if share_key and leader is None:
+                shared = variant_leaders[share_key] = asyncio.get_running_loop().create_future()
+            async def scrape_and_prepare(vid=v, leader=leader, shared=shared):
+                original = dict(vid)
+                existing = metadata_map.get(vid['external_id'])
+                if leader is not None:
+                    shared_details = await leader
+                    if shared_details is not None:
+                        page_stats["detail_shared_count"] += 1
+                        rows_to_upsert.append(build_missav_detail_row(vid, dict(shared_details), source_tag, existing).note_detail_attempt("success"))
+                        return
+                page_stats["detail_attempted_count"] += 1
+                status = None
+                try:
+                    status = await prepare_video_detail(
+                        vid, source_tag, existing, detail_pages, semaphore, page_stats, rows_to_upsert
+                    )
+                finally:
+                    if shared is not None:
+                        # Siblings fall back to their own fetch when the leader did not succeed.
+                        shared.set_result({field: vid.get(field) for field in SHARED_VARIANT_DETAIL_FIELDS} if status == "success" else None)
+                if retry_queue is not None and status in DETAIL_RETRY_STATUSES:
+                    retry_queue.schedule(
+                        original["source_url"],
+                        {"kind": "detail", "tag": source_tag, "video": original, "existing": metadata_map.get(vid['external_id'])},
+                    )
             tasks.append(scrape_and_prepare())
             
     if tasks:
@@ -1089,9 +2922,48 @@ async def process_page_batch(videos, source_tag, detail_pages, supabase, semapho
 
     upsert_result = await batch_upsert_videos(rows_to_upsert, supabase, f"{source_tag.upper()} BATCH")
     merge_stats(page_stats, upsert_result)
+    await record_near_duplicates(supabase, fingerprints)
     page_stats["stale_page"] = page_stats["new_external_count"] == 0 and details_needed_count == 0 and cover_needed_count == 0
     return page_stats
 
+def build_51cg_rows(vid: dict, details: dict, source_tag: str) -> list[dict]:
+    # If list page title is empty/placeholder, use detail page title
+    if (not vid.get('title') or len(vid['title']) < 2) and details.get('title'):
+        vid['title'] = details['title']
+
+    # Merge tags
+    vid_tags = ordered_unique(vid.get('tags', []) + details.get('tags', []))
+
+    # Refine Categories based on title and tags
+    refined_cats = map_categories(vid['title'], vid_tags)
+
+    # Merge with list-page categories
+    final_cats = normalize_taxonomy_values([source_tag] + vid.get('categories', []) + refined_cats + ["51吃瓜"])
+
+    vid.update({k: v for k, v in details.items() if k not in ['title', 'tags', 'videos']})
+    vid['categories'] = final_cats
+    vid['tags'] = normalize_taxonomy_values(vid_tags + [source_tag])
+
+    # Handle multiple videos
+    videos_to_sync = []
+    if details.get('videos'):
+        for i, video_info in enumerate(details['videos']):
+            new_vid = vid.copy()
+            new_vid['source_url'] = video_info['url']
+            if video_info['title_suffix']:
+                new_vid['title'] = f"{vid['title']} {video_info['title_suffix']}"
+
+            # First video keeps original ID, others get suffix
+            if i > 0:
+                new_vid['external_id'] = f"{vid['external_id']}_{i+1}"
+
+            videos_to_sync.append(new_vid)
+    else:
+        videos_to_sync.append(vid)
+    return videos_to_sync
+
+
+@profiled("process_51cg_batch")
 async def process_51cg_batch(videos, detail_pages, supabase, semaphore, source_tag="51cg", detail_fetch_policy="smart"):
     if not videos:
         return {"stale_page": True, **make_run_stats()}
@@ -1103,31 +2975,40 @@ async def process_51cg_batch(videos, detail_pages, supabase, semaphore, source_t
     metadata_map = {}
     if supabase:
         try:
-            res = await execute_with_retry(
-                label=f"{source_tag}-metadata-check",
-                fn=lambda: supabase.table("videos").select(
-                    "external_id, title, cover_url, cover_status, source_url, source_site, duration, actors, release_date, tags, categories, detail_status, detail_fetched_at, inventory_status"
-                ).in_("external_id", external_ids).execute()
-            )
-            for record in res.data:
-                metadata_map[record['external_id']] = record
+            metadata_map = await fetch_existing_records(supabase, external_ids, label=f"{source_tag}-metadata-check")
         except Exception as e:
             print(f"  [51CG Batch Check Error] {e}")
+    duplicates, fingerprints = await detect_near_duplicates(supabase, videos, metadata_map)
 
     rows_to_upsert = []
     tasks = []
     for v in videos:
         if not metadata_map.get(v["external_id"]):
             page_stats["new_external_count"] += 1
-        if not should_fetch_details(metadata_map.get(v["external_id"]), detail_fetch_policy=detail_fetch_policy):
+        duplicate_of = duplicates.get(v["external_id"])
+        skip_reason = detail_skip_reason(metadata_map.get(v["external_id"]), detail_fetch_policy=detail_fetch_policy)
+        if duplicate_of or skip_reason:
             v['categories'] = normalize_taxonomy_values([source_tag] + (v.get('categories') or []) + ["51吃瓜"])
             v['tags'] = normalize_taxonomy_values([source_tag] + (v.get('tags') or []))
+            if duplicate_of:
+                print(f"  [NearDup] {v['external_id']} duplicates {duplicate_of}")
+                v["duplicate_of"] = duplicate_of
+                page_stats["near_duplicate_count"] += 1
+            elif skip_reason == "backoff":
+                page_stats["detail_backoff_count"] += 1
+            else:
+                page_stats["existing_complete_count"] += 1
             rows_to_upsert.append(merge_video_record(v, metadata_map.get(v['external_id'])))
-            page_stats["existing_complete_count"] += 1
             continue
         page_stats["detail_attempted_count"] += 1
         async def scrape_and_prepare(vid=v):
             async with semaphore:
+                if RUN_DEADLINE.stopping():
+                    RUN_DEADLINE.defer("details_deferred")
+                    vid['categories'] = normalize_taxonomy_values([source_tag] + (vid.get('categories') or []) + ["51吃瓜"])
+                    vid['tags'] = normalize_taxonomy_values([source_tag] + (vid.get('tags') or []))
+                    rows_to_upsert.append(merge_video_record(vid, metadata_map.get(vid['external_id'])))
+                    return
                 page = detail_pages.pop()
                 try:
                     details = await get_51cg_details(page, vid['source_url'])
@@ -1135,47 +3016,15 @@ async def process_51cg_batch(videos, detail_pages, supabase, semaphore, source_t
                     if status == "error":
                         page_stats["detail_fail_count"] += 1
                     if details:
-                        # If list page title is empty/placeholder, use detail page title
-                        if (not vid.get('title') or len(vid['title']) < 2) and details.get('title'):
-                            vid['title'] = details['title']
-                        
-                        # Merge tags
-                        vid_tags = ordered_unique(vid.get('tags', []) + details.get('tags', []))
-                        
-                        # Refine Categories based on title and tags
-                        refined_cats = map_categories(vid['title'], vid_tags)
-                        
-                        # Merge with list-page categories
-                        final_cats = normalize_taxonomy_values([source_tag] + vid.get('categories', []) + refined_cats + ["51吃瓜"])
-                        
-                        vid.update({k: v for k, v in details.items() if k not in ['title', 'tags', 'videos']})
-                        vid['categories'] = final_cats
-                        vid['tags'] = normalize_taxonomy_values(vid_tags + [source_tag])
-
-                        # Handle multiple videos
-                        videos_to_sync = []
-                        if details.get('videos'):
-                            for i, video_info in enumerate(details['videos']):
-                                new_vid = vid.copy()
-                                new_vid['source_url'] = video_info['url']
-                                if video_info['title_suffix']:
-                                    new_vid['title'] = f"{vid['title']} {video_info['title_suffix']}"
-                                
-                                # First video keeps original ID, others get suffix
-                                if i > 0:
-                                    new_vid['external_id'] = f"{vid['external_id']}_{i+1}"
-                                
-                                videos_to_sync.append(new_vid)
-                        else:
-                            videos_to_sync.append(vid)
-
-                        for v_sync in videos_to_sync:
-                            rows_to_upsert.append(merge_video_record(v_sync, metadata_map.get(v_sync['external_id'])))
+                        for v_sync in build_51cg_rows(vid, details, source_tag):
+                            rows_to_upsert.append(merge_video_record(v_sync, metadata_map.get(v_sync['external_id'])).note_detail_attempt("success"))
                         page_stats["detail_success_count"] += 1
                     else:
                         vid['categories'] = normalize_taxonomy_values([source_tag] + (vid.get('categories') or []) + ["51吃瓜"])
                         vid['tags'] = normalize_taxonomy_values([source_tag] + (vid.get('tags') or []))
-                        rows_to_upsert.append(merge_video_record(vid, metadata_map.get(vid['external_id'])))
+                        rows_to_upsert.append(merge_video_record(vid, metadata_map.get(vid['external_id'])).note_detail_attempt(
+                            "error" if status == "error" else "empty"
+                        ))
                         if status != "error":
                             page_stats["detail_fail_count"] += 1
                 except Exception as e:
@@ -1191,6 +3040,7 @@ async def process_51cg_batch(videos, detail_pages, supabase, semaphore, source_t
 
     upsert_result = await batch_upsert_videos(rows_to_upsert, supabase, f"51CG ({source_tag})")
     merge_stats(page_stats, upsert_result)
+    await record_near_duplicates(supabase, fingerprints)
     page_stats["stale_page"] = False
     return page_stats
 
@@ -1203,10 +3053,13 @@ async def scrape_51cg_feed(context, supabase, semaphore, detail_pages, base_url,
     
     try:
         for page_num in range(1, total_pages + 1):
+            if RUN_DEADLINE.stopping():
+                RUN_DEADLINE.defer("pages_skipped", total_pages - page_num + 1)
+                break
             url = base_url if page_num == 1 else f"{base_url}page/{page_num}/"
             print(f"[{source_tag.upper()}] Page {page_num}...")
             
-            await list_page.goto(url, timeout=60000, wait_until="domcontentloaded")
+            await playwright_call("goto", list_page.goto(url, timeout=60000, wait_until="domcontentloaded"))
             
             try:
                 await list_page.wait_for_selector('#index article', timeout=10000)
@@ -1214,7 +3067,7 @@ async def scrape_51cg_feed(context, supabase, semaphore, detail_pages, base_url,
                 pass
             await jitter_sleep(LIST_POST_LOAD_DELAY_MIN, LIST_POST_LOAD_DELAY_MAX)
 
-            videos = await list_page.evaluate(r'''() => {
+            videos = await playwright_call("evaluate", list_page.evaluate(r'''() => {
                 const items = document.querySelectorAll('#index article');
                 const results = [];
                 items.forEach(item => {
@@ -1283,7 +3136,7 @@ async def scrape_51cg_feed(context, supabase, semaphore, detail_pages, base_url,
                     }
                 });
                 return results;
-            }''')
+            }'''))
 
             if not videos:
                 print(f"[{source_tag.upper()}] No videos found on this page.")
@@ -1300,54 +3153,444 @@ async def scrape_51cg_feed(context, supabase, semaphore, detail_pages, base_url,
     return source_stats
 
 
-async def process_null_cover_queue(targets, detail_pages, supabase, semaphore):
-    queue_stats = make_run_stats()
-    queue_stats["pages_scanned"] = len(targets)
-    queue_stats["discovered_count"] = len(targets)
+class ContentNode:
+    __slots__ = ("tag", "attrs", "children", "parent")
 
-    external_ids = [item["external_id"] for item in targets]
-    metadata_map = {}
-    if supabase and external_ids:
-        try:
-            res = await execute_with_retry(
-                label="null-cover-metadata-check",
-                fn=lambda: supabase.table("videos").select(
-                    "external_id, title, cover_url, cover_status, source_url, source_site, duration, actors, release_date, tags, categories, detail_status, detail_fetched_at, inventory_status"
-                ).in_("external_id", external_ids).execute()
-            )
-            for record in res.data:
-                metadata_map[record["external_id"]] = record
-        except Exception as e:
-            print(f"[NullCover] Batch Check Error: {e}")
+    def __init__(self, tag: str, attrs: dict, parent=None):
+        self.tag = tag
+        self.attrs = attrs
+        self.children = []
+        self.parent = parent
 
-    rows_to_upsert = []
-    tasks = []
+    def text(self) -> str:
+        parts = []
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if isinstance(node, str):
+                parts.append(node)
+            else:
+                stack.extend(reversed(node.children))
+        return " ".join("".join(parts).split())
+
+    def previous_element(self):
+        siblings = [child for child in self.parent.children if isinstance(child, ContentNode)] if self.parent else []
+        index = siblings.index(self) if self in siblings else 0
+        return siblings[index - 1] if index > 0 else None
+
+
+class PostContentParser(HTMLParser):
+    VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = ContentNode("#root", {})
+        self.current = self.root
+        self.players = []
+
+    def handle_starttag(self, tag, attrs):
+        node = ContentNode(tag, dict(attrs), self.current)
+        self.current.children.append(node)
+        if "dplayer" in (node.attrs.get("class") or "").split():
+            self.players.append(node)
+        if tag not in self.VOID_TAGS:
+            self.current = node
+
+    def handle_endtag(self, tag):
+        node = self.current
+        while node is not self.root and node.tag != tag:
+            node = node.parent
+        if node is not self.root:
+            self.current = node.parent
+
+    def handle_data(self, data):
+        self.current.children.append(data)
+
+
+def parse_51cg_players(content_html: str | None) -> list[dict]:
+    # Mirrors the DPlayer extraction in get_51cg_details so API and browser rows get identical suffixes.
+    parser = PostContentParser()
+    parser.feed(content_html or "")
+    parser.close()
+    videos = []
+    for player in parser.players:
+        try:
+            config = json.loads(player.attrs.get("data-config") or "")
+        except ValueError:
+            continue
+        url = (config.get("video") or {}).get("url") if isinstance(config, dict) else None
+        if not url:
+            continue
+        prev = player.previous_element()
+        if player.parent.tag == "p":
+            prev = player.parent.previous_element()
+        videos.append({"url": url, "title_suffix": prev.text() if prev and prev.tag in ("p", "div") else ""})
+
+    if not videos:
+        m3u8_match = re.search(r'["\']([^"\']+\.m3u8[^"\']*)["\']', content_html or "")
+        if m3u8_match:
+            videos.append({"url": html.unescape(m3u8_match.group(1)), "title_suffix": ""})
+    return videos
+
+
+def strip_html(value: str | None) -> str:
+    return " ".join(html.unescape(re.sub(r"<[^>]+>", " ", value or "")).split())
+
+
+def extract_51cg_post_id(*urls) -> str | None:
+    for url in urls:
+        match = re.search(r"archives/(\d+)", url or "") or re.search(r"[?&]p=(\d+)", url or "")
+        if match:
+            return match.group(1)
+    return None
+
+
+def extract_51cg_cover(content_html: str | None) -> str:
+    for pattern in (r"loadBannerDirect\('([^']+)'", r'data-xkrkllgl="([^"]+)"'):
+        match = re.search(pattern, content_html or "")
+        if match:
+            return html.unescape(match.group(1))
+    return ""
+
+
+def parse_51cg_rest_post(post: dict) -> dict:
+    embedded = post.get("_embedded") or {}
+    tags = []
+    categories = []
+    for group in embedded.get("wp:term") or []:
+        for term in group or []:
+            name = html.unescape(str(term.get("name") or "")).strip()
+            if term.get("taxonomy") == "post_tag":
+                tags.append(name)
+            elif term.get("taxonomy") == "category":
+                categories.append(name)
+    content = (post.get("content") or {}).get("rendered") or ""
+    media = (embedded.get("wp:featuredmedia") or [{}])[0] or {}
+    return {
+        # The browser path keys rows on the permalink's archives/NNN number, so prefer it over the WP id.
+        "id": extract_51cg_post_id(post.get("link")) or str(post.get("id") or ""),
+        "link": post.get("link"),
+        "title": strip_html((post.get("title") or {}).get("rendered")),
+        "date": post.get("date_gmt") or post.get("date"),
+        "modified": post.get("modified_gmt") or post.get("modified"),
+        "content": content,
+        "tags": tags,
+        "categories": categories,
+        "cover_url": media.get("source_url") or extract_51cg_cover(content),
+    }
+
+
+def parse_51cg_rss(body: bytes) -> list[dict]:
+    posts = []
+    for item in ET.fromstring(body).iter("item"):
+        fields = {"category": []}
+        for child in item:
+            name = xml_local_name(child.tag)
+            if name == "category":
+                fields["category"].append(html.unescape((child.text or "").strip()))
+            elif name in ("title", "link", "guid", "pubDate", "encoded", "description"):
+                fields[name] = (child.text or "").strip()
+        try:
+            published = parsedate_to_datetime(fields.get("pubDate")).astimezone(timezone.utc).isoformat()
+        except (TypeError, ValueError):
+            published = None
+        content = fields.get("encoded") or fields.get("description") or ""
+        posts.append({
+            "id": extract_51cg_post_id(fields.get("link"), fields.get("guid")) or "",
+            "link": fields.get("link"),
+            "title": strip_html(fields.get("title")),
+            "date": published,
+            "modified": published,
+            "content": content,
+            # RSS folds tags into <category>, so keep them as tags and let map_categories refine.
+            "tags": fields["category"],
+            "categories": [],
+            "cover_url": extract_51cg_cover(content),
+        })
+    return posts
+
+
+def build_51cg_post_video(post: dict) -> tuple[dict, dict]:
+    vid = {
+        "external_id": f"51cg_{post['id']}",
+        "title": post.get("title") or "",
+        "cover_url": post.get("cover_url") or "",
+        "source_url": post.get("link"),
+        "duration": None,
+        "actors": [],
+        "categories": list(post.get("categories") or []),
+        "tags": [],
+    }
+    details = {
+        "title": post.get("title"),
+        "tags": list(post.get("tags") or []),
+        "actors": [],
+        "release_date": (post.get("date") or "")[:10] or None,
+        "videos": parse_51cg_players(post.get("content")),
+    }
+    return vid, details
+
+
+async def load_feed_watermark(supabase, feed: str) -> str | None:
+    res = await execute_with_retry(
+        label=f"feed-watermark-{feed}",
+        fn=lambda: supabase.table("feed_watermarks").select("modified_after").eq("feed", feed).limit(1).execute()
+    )
+    rows = res.data or []
+    return rows[0].get("modified_after") if rows else None
+
+
+async def save_feed_watermark(supabase, feed: str, modified_after: str, post_count: int):
+    payload = {
+        "feed": feed,
+        "source_site": "51cg",
+        "modified_after": modified_after,
+        "post_count": post_count,
+        "updated_at": datetime.now(timezone.utc).isoformat(),
+    }
+    await execute_with_retry(
+        label=f"feed-watermark-save-{feed}",
+        fn=lambda: supabase.table("feed_watermarks").upsert(payload, on_conflict="feed").execute()
+    )
+
+
+async def fetch_51cg_rest_posts(client, feed: dict, modified_after: str, max_pages: int) -> tuple[list[dict], bool]:
+    params = {}
+    if feed.get("category"):
+        response = await client.get(f"{CG_BASE_URL}/wp-json/wp/v2/categories", params={"slug": feed["category"], "_fields": "id"})
+        response.raise_for_status()
+        matches = response.json()
+        if not matches:
+            raise RuntimeError(f"unknown category {feed['category']}")
+        params["categories"] = matches[0]["id"]
+
+    posts = []
+    for page_num in range(1, max_pages + 1):
+        if RUN_DEADLINE.stopping():
+            RUN_DEADLINE.defer("pages_skipped", max_pages - page_num + 1)
+            break
+        response = await client.get(
+            f"{CG_BASE_URL}/wp-json/wp/v2/posts",
+            params={
+                **params,
+                "per_page": CG_API_PER_PAGE,
+                "page": page_num,
+                "orderby": "modified",
+                "order": "asc",
+                "modified_after": modified_after,
+                "_embed": "wp:term,wp:featuredmedia",
+            },
+        )
+        response.raise_for_status()
+        batch = response.json()
+        if not isinstance(batch, list):
+            raise RuntimeError("unexpected posts payload")
+        posts.extend(parse_51cg_rest_post(post) for post in batch)
+        if not batch or page_num >= int(response.headers.get("x-wp-totalpages") or page_num):
+            break
+    # Pages are in ascending modified order, so a capped run still leaves a safe watermark.
+    return posts, True
+
+
+async def fetch_51cg_rss_posts(client, feed: dict, modified_after: str, max_pages: int) -> tuple[list[dict], bool]:
+    watermark = parse_timestamp(modified_after) or 0.0
+    posts = []
+    for page_num in range(1, max_pages + 1):
+        if RUN_DEADLINE.stopping():
+            RUN_DEADLINE.defer("pages_skipped", max_pages - page_num + 1)
+            return posts, False
+        response = await client.get(f"{feed['url']}feed/", params={"paged": page_num} if page_num > 1 else None)
+        if response.status_code == 404 and page_num > 1:
+            return posts, True
+        response.raise_for_status()
+        page_posts = parse_51cg_rss(response.content)
+        fresh = [post for post in page_posts if (parse_timestamp(post["modified"]) or 0.0) > watermark]
+        posts.extend(fresh)
+        if not page_posts or len(fresh) < len(page_posts):
+            return posts, True
+    # The feed is newest-first: stopping at the page cap leaves older unseen posts behind.
+    return posts, False
+
+
+async def ingest_51cg_feed(supabase, source_tag: str, max_pages: int) -> dict | None:
+    feed = CG_FEEDS[source_tag]
+    modified_after = None
+    if supabase:
+        try:
+            modified_after = await load_feed_watermark(supabase, source_tag)
+        except Exception as e:
+            print(f"[{source_tag.upper()} API] Watermark unavailable: {e}")
+    if not modified_after:
+        modified_after = datetime.fromtimestamp(time.time() - CG_API_INITIAL_LOOKBACK_DAYS * 86400, timezone.utc).isoformat()
+
+    async with create_http_client(2) as client:
+        for kind, fetch_posts in (("rest", fetch_51cg_rest_posts), ("rss", fetch_51cg_rss_posts)):
+            try:
+                posts, complete = await fetch_posts(client, feed, modified_after, max(max_pages, 1))
+            except Exception as e:
+                print(f"[{source_tag.upper()} API] {kind} endpoint unavailable: {e}")
+                continue
+            print(f"[{source_tag.upper()} API] {len(posts)} posts modified after {modified_after} via {kind}")
+            return {"kind": kind, "posts": [post for post in posts if post["id"] and post["link"]], "complete": complete}
+    return None
+
+
+@profiled("process_51cg_posts")
+async def process_51cg_posts(posts: list[dict], supabase, source_tag: str) -> tuple[dict, list[dict]]:
+    stats = make_run_stats()
+    stats["pages_scanned"] = 1
+    stats["discovered_count"] = len(posts)
+    rows = []
+    browser_videos = []
+    for post in posts:
+        vid, details = build_51cg_post_video(post)
+        # Posts whose body the API hides or truncates still need the detail page.
+        if not details["videos"] and not post.get("content"):
+            browser_videos.append(vid)
+            continue
+        rows.extend(build_51cg_rows(vid, details, source_tag))
+        stats["detail_success_count"] += 1
+
+    metadata_map = {}
+    if supabase and rows:
+        try:
+            metadata_map = await fetch_existing_records(supabase, [row["external_id"] for row in rows], label=f"{source_tag}-api-check")
+        except Exception as e:
+            print(f"  [51CG API Batch Check Error] {e}")
+    duplicates, fingerprints = await detect_near_duplicates(supabase, rows, metadata_map)
+    for row in rows:
+        if not metadata_map.get(row["external_id"]):
+            stats["new_external_count"] += 1
+        if row["external_id"] in duplicates:
+            print(f"  [NearDup] {row['external_id']} duplicates {duplicates[row['external_id']]}")
+            row["duplicate_of"] = duplicates[row["external_id"]]
+            stats["near_duplicate_count"] += 1
+    rows = [merge_video_record(row, metadata_map.get(row["external_id"])) for row in rows]
+    merge_stats(stats, await batch_upsert_videos(rows, supabase, f"51CG API ({source_tag})"))
+    await record_near_duplicates(supabase, fingerprints)
+    return stats, browser_videos
+
+
+async def scrape_51cg_api(supabase, semaphore, detail_pages, source_tag: str, max_pages: int, detail_fetch_policy: str = "smart") -> dict | None:
+    print(f"\n>>> Starting Source: {source_tag.upper()} API ({CG_BASE_URL}) <<<")
+    result = await ingest_51cg_feed(supabase, source_tag, max_pages)
+    if result is None:
+        return None
+
+    posts = result["posts"]
+    source_stats, browser_videos = await process_51cg_posts(posts, supabase, source_tag)
+    if browser_videos and detail_pages:
+        print(f"[{source_tag.upper()} API] {len(browser_videos)} posts without content, using detail pages")
+        page_stats = await process_51cg_batch(browser_videos, detail_pages, supabase, semaphore, source_tag, detail_fetch_policy=detail_fetch_policy)
+        page_stats["pages_scanned"] = 0
+        page_stats["discovered_count"] = 0
+        merge_stats(source_stats, page_stats)
+
+    newest = max((post["modified"] for post in posts if post.get("modified")), key=lambda value: parse_timestamp(value) or 0.0, default=None)
+    if supabase and newest and result["complete"]:
+        try:
+            await save_feed_watermark(supabase, source_tag, newest, len(posts))
+        except Exception as e:
+            print(f"[{source_tag.upper()} API] Failed to save watermark: {e}")
+    return source_stats
+
+
+async def process_null_cover_queue(targets, detail_pages, supabase, semaphore, outcomes: dict | None = None):
+    queue_stats = {**make_run_stats(), "predicted_cover_hits": 0, "predicted_cover_misses": 0}
+    queue_stats["pages_scanned"] = len(targets)
+    queue_stats["discovered_count"] = len(targets)
+
+    external_ids = [item["external_id"] for item in targets]
+    metadata_map = {}
+    lookup_ok = not supabase
+    if supabase and external_ids:
+        try:
+            metadata_map = await fetch_existing_records(supabase, external_ids, label="null-cover-metadata-check")
+            lookup_ok = True
+        except Exception as e:
+            print(f"[NullCover] Batch Check Error: {e}")
+
+    # Queue workers ack per target: anything not explicitly finished is retried later.
+    if outcomes is not None:
+        for target in targets:
+            outcomes[target["external_id"]] = "retry"
+
+    rows_to_upsert = []
+    pending = []
     for target in targets:
         existing = metadata_map.get(target["external_id"])
         if not existing:
+            if outcomes is not None and lookup_ok:
+                outcomes[target["external_id"]] = "done"
             continue
         if classify_cover_status(existing.get("cover_url")) == "valid":
             queue_stats["existing_complete_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
+            continue
+        if detail_backoff_active(existing):
+            queue_stats["detail_backoff_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
+            continue
+        pending.append((target, existing))
+
+    predicted = {}
+    predictable = [
+        {**target, "source_site": existing.get("source_site") or target.get("source_site")}
+        for target, existing in pending
+    ]
+    predictable = [target for target in predictable if build_cover_candidates(target["external_id"], target["source_site"])]
+    if PREDICTIVE_COVER_ENABLED and predictable:
+        started = time.monotonic()
+        try:
+            predicted = await resolve_predicted_covers(predictable)
+        except Exception as e:
+            print(f"[NullCover] Predictive cover resolver failed, falling back to detail pages: {e}")
+        queue_stats["predicted_cover_hits"] = len(predicted)
+        queue_stats["predicted_cover_misses"] = len(predictable) - len(predicted)
+        print(
+            f"[NullCover] Predicted covers: {len(predicted)}/{len(predictable)} hits "
+            f"in {time.monotonic() - started:.1f}s; {len(pending) - len(predicted)} rows go to detail pages."
+        )
+
+    tasks = []
+    for target, existing in pending:
+        cover_url = predicted.get(target["external_id"])
+        if cover_url:
+            rows_to_upsert.append(apply_cover_patch(existing, cover_url))
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
             continue
 
         queue_stats["detail_attempted_count"] += 1
 
         async def fetch_cover(target=target, existing=existing):
             async with semaphore:
+                if RUN_DEADLINE.stopping():
+                    RUN_DEADLINE.defer("backfill_targets_deferred")
+                    return
                 page = detail_pages.pop()
                 try:
-                    details = await get_video_details(page, target["source_url"])
+                    details = await fetch_video_details(page, target["source_url"])
                     status = (details or {}).get("_status", "success")
+                    if status == "circuit_open":
+                        RUN_DEADLINE.defer("backfill_targets_deferred")
+                        return
                     if status == "blocked":
                         queue_stats["blocked_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "blocked"))
                         return
 
                     cover_url = normalize_cover_url((details or {}).get("cover_url"))
                     if cover_url:
                         rows_to_upsert.append(apply_cover_patch(existing, cover_url))
                         queue_stats["detail_success_count"] += 1
+                        if outcomes is not None:
+                            outcomes[target["external_id"]] = "done"
                     else:
                         queue_stats["detail_fail_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "empty"))
                 except Exception as e:
                     queue_stats["detail_fail_count"] += 1
                     print(f"[NullCover] Detail Fetch Error: {target['source_url']}: {e}")
@@ -1364,54 +3607,73 @@ async def process_null_cover_queue(targets, detail_pages, supabase, semaphore):
     return queue_stats
 
 
-async def process_metadata_queue(targets, detail_pages, supabase, semaphore):
+async def process_metadata_queue(targets, detail_pages, supabase, semaphore, outcomes: dict | None = None):
     queue_stats = make_run_stats()
     queue_stats["pages_scanned"] = len(targets)
     queue_stats["discovered_count"] = len(targets)
 
     external_ids = [item["external_id"] for item in targets]
     metadata_map = {}
+    lookup_ok = not supabase
     if supabase and external_ids:
         try:
-            res = await execute_with_retry(
-                label="metadata-queue-check",
-                fn=lambda: supabase.table("videos").select(
-                    "external_id, title, cover_url, cover_status, source_url, source_site, duration, actors, release_date, tags, categories, detail_status, detail_fetched_at, inventory_status"
-                ).in_("external_id", external_ids).execute()
-            )
-            for record in res.data:
-                metadata_map[record["external_id"]] = record
+            metadata_map = await fetch_existing_records(supabase, external_ids, label="metadata-queue-check")
+            lookup_ok = True
         except Exception as e:
             print(f"[MetadataQueue] Batch Check Error: {e}")
 
+    # Queue workers ack per target: anything not explicitly finished is retried later.
+    if outcomes is not None:
+        for target in targets:
+            outcomes[target["external_id"]] = "retry"
+
     rows_to_upsert = []
     tasks = []
     for target in targets:
         existing = metadata_map.get(target["external_id"])
         if not existing:
+            if outcomes is not None and lookup_ok:
+                outcomes[target["external_id"]] = "done"
             continue
         if classify_detail_status(existing) == "success":
             queue_stats["existing_complete_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
+            continue
+        if detail_backoff_active(existing):
+            queue_stats["detail_backoff_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
             continue
 
         queue_stats["detail_attempted_count"] += 1
 
         async def fetch_metadata(target=target, existing=existing):
             async with semaphore:
+                if RUN_DEADLINE.stopping():
+                    RUN_DEADLINE.defer("backfill_targets_deferred")
+                    return
                 page = detail_pages.pop()
                 try:
-                    details = await get_video_details(page, target["source_url"])
+                    details = await fetch_video_details(page, target["source_url"])
                     status = (details or {}).get("_status", "success")
+                    if status == "circuit_open":
+                        RUN_DEADLINE.defer("backfill_targets_deferred")
+                        return
                     if status == "blocked":
                         queue_stats["blocked_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "blocked"))
                         return
 
                     patched = apply_metadata_patch(existing, details)
                     if classify_detail_status(patched) == "success":
                         rows_to_upsert.append(patched)
                         queue_stats["detail_success_count"] += 1
+                        if outcomes is not None:
+                            outcomes[target["external_id"]] = "done"
                     else:
                         queue_stats["detail_fail_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "empty"))
                 except Exception as e:
                     queue_stats["detail_fail_count"] += 1
                     print(f"[MetadataQueue] Detail Fetch Error: {target['source_url']}: {e}")
@@ -1428,6 +3690,108 @@ async def process_metadata_queue(targets, detail_pages, supabase, semaphore):
     return queue_stats
 
 
+async def process_combined_backfill_queue(targets, detail_pages, supabase, semaphore, outcomes: dict | None = None):
+    queue_stats = {
+        **make_run_stats(),
+        "cover_patched_count": 0,
+        "metadata_patched_count": 0,
+        "detail_navigations_saved": 0,
+    }
+    queue_stats["pages_scanned"] = len(targets)
+    queue_stats["discovered_count"] = len(targets)
+
+    external_ids = [item["external_id"] for item in targets]
+    metadata_map = {}
+    lookup_ok = not supabase
+    if supabase and external_ids:
+        try:
+            metadata_map = await fetch_existing_records(supabase, external_ids, label="combined-backfill-check")
+            lookup_ok = True
+        except Exception as e:
+            print(f"[CombinedBackfill] Batch Check Error: {e}")
+
+    if outcomes is not None:
+        for target in targets:
+            outcomes[target["external_id"]] = "retry"
+
+    rows_to_upsert = []
+    tasks = []
+    for target in targets:
+        existing = metadata_map.get(target["external_id"])
+        if not existing:
+            if outcomes is not None and lookup_ok:
+                outcomes[target["external_id"]] = "done"
+            continue
+
+        needs_cover = classify_cover_status(existing.get("cover_url")) == "missing"
+        needs_metadata = not has_detail_metadata(existing)
+        if not needs_cover and not needs_metadata:
+            queue_stats["existing_complete_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
+            continue
+        if detail_backoff_active(existing):
+            queue_stats["detail_backoff_count"] += 1
+            if outcomes is not None:
+                outcomes[target["external_id"]] = "done"
+            continue
+
+        queue_stats["detail_attempted_count"] += 1
+        # The split null-cover and metadata passes would each open this page once.
+        if needs_cover and needs_metadata:
+            queue_stats["detail_navigations_saved"] += 1
+
+        async def fetch_details(target=target, existing=existing, needs_cover=needs_cover, needs_metadata=needs_metadata):
+            async with semaphore:
+                if RUN_DEADLINE.stopping():
+                    RUN_DEADLINE.defer("backfill_targets_deferred")
+                    return
+                page = detail_pages.pop()
+                try:
+                    details = await fetch_video_details(page, target["source_url"])
+                    status = (details or {}).get("_status", "success")
+                    if status == "circuit_open":
+                        RUN_DEADLINE.defer("backfill_targets_deferred")
+                        return
+                    if status == "blocked":
+                        queue_stats["blocked_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "blocked"))
+                        return
+
+                    patched = apply_detail_patch(existing, details)
+                    cover_patched = needs_cover and patched["cover_status"] == "valid"
+                    metadata_patched = needs_metadata and has_detail_metadata(patched)
+                    if cover_patched or metadata_patched:
+                        rows_to_upsert.append(patched)
+                        queue_stats["detail_success_count"] += 1
+                        queue_stats["cover_patched_count"] += int(cover_patched)
+                        queue_stats["metadata_patched_count"] += int(metadata_patched)
+                        if outcomes is not None:
+                            outcomes[target["external_id"]] = "done"
+                    else:
+                        queue_stats["detail_fail_count"] += 1
+                        rows_to_upsert.append(failed_detail_attempt(existing, "empty"))
+                except Exception as e:
+                    queue_stats["detail_fail_count"] += 1
+                    print(f"[CombinedBackfill] Detail Fetch Error: {target['source_url']}: {e}")
+                finally:
+                    detail_pages.append(page)
+
+        tasks.append(fetch_details())
+
+    if tasks:
+        await asyncio.gather(*tasks)
+
+    upsert_result = await batch_upsert_videos(rows_to_upsert, supabase, "COMBINED DETAIL PATCH")
+    merge_stats(queue_stats, upsert_result)
+    print(
+        f"[CombinedBackfill] navigations={queue_stats['detail_attempted_count']} "
+        f"saved_vs_split_passes={queue_stats['detail_navigations_saved']} "
+        f"cover_patched={queue_stats['cover_patched_count']} metadata_patched={queue_stats['metadata_patched_count']}"
+    )
+    return queue_stats
+
+
 async def scrape_null_cover_backfill(supabase, context, semaphore):
     targets = parse_null_cover_queue(NULL_COVER_QUEUE_JSON)
     if not targets:
@@ -1446,7 +3810,7 @@ async def scrape_null_cover_backfill(supabase, context, semaphore):
     for page in detail_pages:
         await page.close()
 
-    return stats, {"null_cover": dict(stats)}
+    return {key: stats[key] for key in make_run_stats()}, {"null_cover": dict(stats)}
 
 
 async def scrape_metadata_backfill(supabase, context, semaphore):
@@ -1470,13 +3834,991 @@ async def scrape_metadata_backfill(supabase, context, semaphore):
     return stats, {"metadata_queue": dict(stats)}
 
 
+def classify_liveness_status(status_code: int | None) -> str:
+    if status_code in {404, 410}:
+        return "dead"
+    if status_code is not None and 200 <= status_code < 400:
+        return "alive"
+    return "error"
+
+
+async def check_source_liveness(client, politeness: HostPoliteness, video: dict):
+    url = video["source_url"]
+    try:
+        async with politeness.slot(url):
+            response = await client.head(url)
+            if response.status_code in {405, 501}:
+                async with client.stream("GET", url) as streamed:
+                    response = streamed
+        return video["id"], classify_liveness_status(response.status_code)
+    except Exception as e:
+        print(f"  [Verify] {url}: {e}")
+        return video["id"], "error"
+
+
+async def select_verify_targets(supabase, limit: int):
+    targets = []
+    page_size = 1000
+    while len(targets) < limit:
+        start = len(targets)
+        end = min(limit, start + page_size) - 1
+        response = await execute_with_retry(
+            label=f"verify-select-{start}",
+            fn=lambda start=start, end=end: supabase.table("videos").select(
+                "id, external_id, source_url"
+            ).eq("is_active", True).order("last_verified_at", desc=False, nullsfirst=True).range(start, end).execute()
+        )
+        rows = [row for row in (response.data or []) if str(row.get("source_url") or "").strip()]
+        targets.extend(rows)
+        if len(response.data or []) < end - start + 1:
+            break
+    return targets[:limit]
+
+
+async def record_verification_results(supabase, results: list[tuple]):
+    grouped = {"alive": [], "dead": [], "error": []}
+    for video_id, outcome in results:
+        grouped[outcome].append(video_id)
+
+    updated = 0
+    for outcome, ids in grouped.items():
+        for idx, chunk in enumerate(chunked(ids, VERIFY_WRITE_CHUNK_SIZE), start=1):
+            params = {"alive_ids": [], "dead_ids": [], "error_ids": []}
+            params[f"{outcome}_ids"] = chunk
+            response = await execute_with_retry(
+                label=f"verify-record-{outcome}-{idx}",
+                fn=lambda params=params: supabase.rpc("record_video_verification", params).execute()
+            )
+            updated += int(response.data or 0)
+    return updated
+
+
+async def verify_video_liveness(supabase):
+    stats = make_run_stats()
+    verify_stats = {
+        **make_run_stats(),
+        "alive_count": 0,
+        "dead_count": 0,
+        "error_count": 0,
+        "checks_per_second": 0.0,
+    }
+    if not supabase:
+        print("[Verify] A Supabase client is required to select verification targets. Exiting.")
+        return stats, {"verify": verify_stats}
+
+    targets = await select_verify_targets(supabase, VERIFY_BATCH_SIZE)
+    print(f"[Verify] Checking {len(targets)} rows with the oldest last_verified_at.")
+    started = time.monotonic()
+    politeness = HostPoliteness()
+    async with create_http_client(VERIFY_CONCURRENCY) as client:
+        results = await asyncio.gather(*(check_source_liveness(client, politeness, video) for video in targets))
+    elapsed = max(time.monotonic() - started, 1e-6)
+
+    for _, outcome in results:
+        verify_stats[f"{outcome}_count"] += 1
+    verify_stats["checks_per_second"] = round(len(results) / elapsed, 2)
+    updated = await record_verification_results(supabase, results)
+
+    stats["discovered_count"] = len(targets)
+    stats["detail_attempted_count"] = len(results)
+    stats["detail_success_count"] = verify_stats["alive_count"]
+    stats["detail_fail_count"] = verify_stats["error_count"]
+    stats["upserted_count"] = updated
+    merge_stats(verify_stats, stats)
+    print(
+        f"[Verify] checked={len(results)} alive={verify_stats['alive_count']} dead={verify_stats['dead_count']} "
+        f"error={verify_stats['error_count']} in {elapsed:.1f}s ({verify_stats['checks_per_second']} checks/sec)"
+    )
+    return stats, {"verify": verify_stats}
+
+
+def classify_cover_response(status_code: int | None, content_type: str | None = None, content_length: int | None = None) -> str:
+    if status_code == 304:
+        return "alive"
+    if status_code in {403, 404, 410}:
+        return "dead"
+    if status_code is not None and 200 <= status_code < 300:
+        content_type = str(content_type or "").lower()
+        if (content_type and not content_type.startswith("image/")) or content_length == 0:
+            return "dead"
+        return "alive"
+    return "error"
+
+
+def parse_content_length(value) -> int | None:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class CoverCheckCache:
+    def __init__(self, path: str = COVER_CHECK_CACHE_PATH):
+        self.path = path
+        self.entries = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path, encoding="utf-8") as fp:
+                    self.entries = json.load(fp)
+            except (OSError, ValueError) as e:
+                print(f"[CoverCheck] Ignoring unreadable cache {path}: {e}")
+
+    def conditional_headers(self, url: str) -> dict:
+        entry = self.entries.get(url) or {}
+        headers = {}
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+        return headers
+
+    def cached_length(self, url: str) -> int | None:
+        return (self.entries.get(url) or {}).get("content_length")
+
+    def update(self, url: str, headers, outcome: str):
+        if outcome != "alive":
+            self.entries.pop(url, None)
+            return
+        entry = self.entries.setdefault(url, {})
+        for key, header in (("etag", "etag"), ("last_modified", "last-modified")):
+            if headers.get(header):
+                entry[key] = headers.get(header)
+        length = parse_content_length(headers.get("content-length"))
+        if length is not None:
+            entry["content_length"] = length
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as fp:
+            json.dump(self.entries, fp)
+        os.replace(tmp_path, self.path)
+
+
+async def check_cover(client, politeness: HostPoliteness, cache: CoverCheckCache, video: dict) -> dict:
+    url = video["cover_url"]
+    result = {"id": video["id"], "outcome": "error", "http_status": None, "content_length": None}
+    try:
+        async with politeness.slot(url):
+            headers = cache.conditional_headers(url)
+            if headers:
+                async with client.stream("GET", url, headers=headers) as response:
+                    pass
+            else:
+                response = await client.head(url)
+                if response.status_code in {405, 501}:
+                    async with client.stream("GET", url) as response:
+                        pass
+    except Exception as e:
+        print(f"  [CoverCheck] {url}: {e}")
+        return result
+
+    content_length = parse_content_length(response.headers.get("content-length"))
+    if response.status_code == 304:
+        content_length = cache.cached_length(url)
+    outcome = classify_cover_response(response.status_code, response.headers.get("content-type"), content_length)
+    cache.update(url, response.headers, outcome)
+    result.update(outcome=outcome, http_status=response.status_code, content_length=content_length)
+    return result
+
+
+async def select_cover_check_targets(supabase, after_id: str | None, checked_before: str, limit: int) -> list[dict]:
+    def query():
+        builder = supabase.table("videos").select("id, cover_url").eq("is_active", True).not_.is_("cover_url", "null")
+        builder = builder.or_(f"cover_checked_at.is.null,cover_checked_at.lt.{checked_before}")
+        if after_id:
+            builder = builder.gt("id", after_id)
+        return builder.order("id").limit(limit).execute()
+
+    response = await execute_with_retry(label=f"cover-check-select-{after_id or 'start'}", fn=query)
+    return response.data or []
+
+
+async def record_cover_checks(supabase, results: list[dict]) -> int:
+    updated = 0
+    for idx, chunk in enumerate(chunked(results, VERIFY_WRITE_CHUNK_SIZE), start=1):
+        response = await execute_with_retry(
+            label=f"cover-check-record-{idx}",
+            fn=lambda chunk=chunk: supabase.rpc("record_cover_checks", {"results": chunk}).execute()
+        )
+        updated += int(response.data or 0)
+    return updated
+
+
+def guard_mass_demotion(results: list[dict], max_dead_ratio: float = COVER_CHECK_MAX_DEAD_RATIO) -> bool:
+    dead = sum(1 for result in results if result["outcome"] == "dead")
+    if len(results) < 20 or dead <= len(results) * max_dead_ratio:
+        return False
+    for result in results:
+        if result["outcome"] == "dead":
+            result["outcome"] = "error"
+    return True
+
+
+async def check_cover_health(supabase):
+    stats = make_run_stats()
+    cover_stats = {
+        **make_run_stats(),
+        "alive_count": 0,
+        "dead_count": 0,
+        "error_count": 0,
+        "not_modified_count": 0,
+        "guarded_pages": 0,
+        "checks_per_second": 0.0,
+    }
+    if not supabase:
+        print("[CoverCheck] A Supabase client is required to select covers. Exiting.")
+        return stats, {"cover_check": cover_stats}
+
+    checked_before = datetime.fromtimestamp(time.time() - COVER_CHECK_MIN_AGE_HOURS * 3600, timezone.utc).isoformat()
+    cache = CoverCheckCache(COVER_CHECK_CACHE_PATH)
+    politeness = HostPoliteness(max_concurrency=COVER_CHECK_CONCURRENCY, min_interval=COVER_CHECK_MIN_INTERVAL_SECONDS)
+    started = time.monotonic()
+    after_id = None
+    checked = 0
+    pages = 0
+    # The cache file covers the whole catalog, so it is rewritten every few pages rather than after
+    # each one, and once more on the way out so a run stopped early keeps what it learned.
+    try:
+        async with create_http_client(COVER_CHECK_CONCURRENCY) as client:
+            while True:
+                if RUN_DEADLINE.stopping():
+                    RUN_DEADLINE.defer("cover_check_pages_deferred")
+                    break
+                targets = await select_cover_check_targets(supabase, after_id, checked_before, COVER_CHECK_PAGE_SIZE)
+                if not targets:
+                    break
+                after_id = targets[-1]["id"]
+                results = await asyncio.gather(*(check_cover(client, politeness, cache, video) for video in targets))
+                if guard_mass_demotion(results):
+                    cover_stats["guarded_pages"] += 1
+                    print(f"[CoverCheck] More than {COVER_CHECK_MAX_DEAD_RATIO:.0%} of a page looked dead. Not demoting it.")
+                for result in results:
+                    cover_stats[f"{result['outcome']}_count"] += 1
+                    cover_stats["not_modified_count"] += int(result["http_status"] == 304)
+                stats["upserted_count"] += await record_cover_checks(supabase, results)
+                checked += len(results)
+                pages += 1
+                if pages % COVER_CHECK_CACHE_SAVE_PAGES == 0:
+                    cache.save()
+                print(f"[CoverCheck] {checked} covers checked ({cover_stats['dead_count']} dead so far).")
+    finally:
+        cache.save()
+    elapsed = max(time.monotonic() - started, 1e-6)
+
+    stats["discovered_count"] = checked
+    stats["detail_attempted_count"] = checked
+    stats["detail_success_count"] = cover_stats["alive_count"]
+    stats["detail_fail_count"] = cover_stats["error_count"]
+    cover_stats["checks_per_second"] = round(checked / elapsed, 2)
+    merge_stats(cover_stats, stats)
+    print(
+        f"[CoverCheck] checked={checked} alive={cover_stats['alive_count']} dead={cover_stats['dead_count']} "
+        f"error={cover_stats['error_count']} not_modified={cover_stats['not_modified_count']} in {elapsed:.1f}s"
+    )
+    return stats, {"cover_check": cover_stats}
+
+
+async def select_catalog_videos(supabase) -> list[dict]:
+    # Keyset pages on id: release date and created_at are not unique, so offset pages could skip or
+    # repeat rows. build_catalog_shards does the display ordering itself.
+    videos = []
+    page_size = 1000
+    after_id = None
+    while True:
+        def query(after_id=after_id):
+            builder = supabase.table("videos").select(CATALOG_COLUMNS).eq("is_active", True)
+            if after_id is not None:
+                builder = builder.gt("id", after_id)
+            return builder.order("id").limit(page_size).execute()
+
+        response = await execute_with_retry(label=f"catalog-select-{after_id or 'start'}", fn=query)
+        rows = response.data or []
+        videos.extend(rows)
+        if len(rows) < page_size:
+            return videos
+        after_id = rows[-1]["id"]
+
+
+def catalog_sort_key(video: dict):
+    release_date = video.get("source_release_date")
+    return (release_date is not None, str(release_date or ""), str(video.get("created_at") or ""), str(video.get("id") or ""))
+
+
+def catalog_item(video: dict) -> dict:
+    return {
+        "id": str(video.get("id") or ""),
+        "external_id": video.get("external_id"),
+        "title": video.get("title"),
+        "cover_url": video.get("cover_url"),
+        "source_url": video.get("source_url"),
+        "duration": video.get("duration"),
+        "source_release_date": None if video.get("source_release_date") is None else str(video["source_release_date"]),
+        "created_at": None if video.get("created_at") is None else str(video["created_at"]),
+        "actors": video.get("actors") or [],
+        "tags": video.get("tags") or [],
+        "inventory_status": video.get("inventory_status"),
+        "detail_status": video.get("detail_status"),
+    }
+
+
+def catalog_key(value: str) -> str:
+    if re.fullmatch(r"[a-z0-9_]+", value):
+        return value
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:16]
+
+
+def build_catalog_shards(
+    videos: list[dict],
+    page_size: int = CATALOG_PAGE_SIZE,
+    section_limit: int = CATALOG_SECTION_LIMIT,
+    weekly_limit: int = CATALOG_WEEKLY_LIMIT,
+    actor_limit: int = CATALOG_ACTOR_LIMIT,
+) -> tuple[dict, dict]:
+    everything = []
+    by_category = {}
+    by_actor = {}
+    for video in sorted(videos, key=catalog_sort_key, reverse=True):
+        item = catalog_item(video)
+        everything.append(item)
+        for category in normalize_taxonomy_values((video.get("tags") or []) + (video.get("categories") or [])):
+            by_category.setdefault(category, []).append(item)
+        for actor in ordered_unique(video.get("actors") or []):
+            by_actor.setdefault(actor, []).append(item)
+
+    # get_home_payload hides near-duplicates linked to a canonical row; category and actor pages keep them.
+    linked = {video.get("external_id") for video in videos if video.get("duplicate_of")}
+    home = {
+        section: [
+            item for item in (everything if section == "new" else by_category.get(section, []))
+            if item["external_id"] not in linked
+        ][: weekly_limit if section == "weekly_hot" else section_limit]
+        for section in CATALOG_HOME_SECTIONS
+    }
+    shards = {"home.json.gz": {"sections": home}}
+    index = {"categories": {}, "actors": {}}
+
+    def add_paged(prefix: str, items: list[dict]) -> int:
+        pages = list(chunked(items, page_size))
+        for page_num, page_items in enumerate(pages, start=1):
+            shards[f"{prefix}/page-{page_num}.json.gz"] = {"page": page_num, "pages": len(pages), "items": page_items}
+        return len(pages)
+
+    for category, items in sorted(by_category.items()):
+        key = catalog_key(category)
+        index["categories"][category] = {"key": key, "count": len(items), "pages": add_paged(f"categories/{key}", items)}
+
+    top_actors = sorted(by_actor.items(), key=lambda entry: (-len(entry[1]), entry[0]))[:actor_limit]
+    for actor, items in top_actors:
+        key = catalog_key(actor)
+        index["actors"][actor] = {"key": key, "count": len(items), "pages": add_paged(f"actors/{key}", items)}
+    return shards, index
+
+
+def encode_catalog_shard(payload: dict) -> tuple[bytes, str]:
+    raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return gzip.compress(raw, mtime=0), hashlib.sha256(raw).hexdigest()
+
+
+def write_catalog_shards(output_dir: str, shards: dict, index: dict) -> dict:
+    manifest_path = os.path.join(output_dir, "manifest.json")
+    previous = {}
+    if os.path.exists(manifest_path):
+        try:
+            with open(manifest_path, encoding="utf-8") as fp:
+                previous = json.load(fp).get("shards", {})
+        except (OSError, ValueError):
+            previous = {}
+
+    report = {"shards_written": 0, "shards_unchanged": 0, "shards_removed": 0, "bytes_written": 0}
+    entries = {}
+    for relative_path, payload in shards.items():
+        data, digest = encode_catalog_shard(payload)
+        entries[relative_path] = {"sha256": digest, "bytes": len(data)}
+        target = os.path.join(output_dir, relative_path)
+        if previous.get(relative_path, {}).get("sha256") == digest and os.path.exists(target):
+            report["shards_unchanged"] += 1
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.tmp"
+        with open(tmp_path, "wb") as fp:
+            fp.write(data)
+        os.replace(tmp_path, target)
+        report["shards_written"] += 1
+        report["bytes_written"] += len(data)
+
+    for relative_path in set(previous) - set(entries):
+        try:
+            os.remove(os.path.join(output_dir, relative_path))
+            report["shards_removed"] += 1
+        except FileNotFoundError:
+            pass
+
+    if report["shards_written"] or report["shards_removed"] or not os.path.exists(manifest_path):
+        os.makedirs(output_dir, exist_ok=True)
+        with open(manifest_path, "w", encoding="utf-8") as fp:
+            json.dump({
+                "generated_at": datetime.now(timezone.utc).isoformat(),
+                "page_size": CATALOG_PAGE_SIZE,
+                "home": "home.json.gz",
+                **index,
+                "shards": entries,
+            }, fp, ensure_ascii=False, sort_keys=True)
+    return report
+
+
+async def export_catalog(supabase, output_dir: str = CATALOG_EXPORT_DIR):
+    stats = make_run_stats()
+    export_stats = {**make_run_stats(), "shards_written": 0, "shards_unchanged": 0, "shards_removed": 0, "bytes_written": 0}
+    if not supabase or not output_dir:
+        print("[Catalog] A Supabase client and CATALOG_EXPORT_DIR are required to export the catalog. Skipping.")
+        return stats, {"catalog_export": export_stats}
+
+    started = time.monotonic()
+    videos = await select_catalog_videos(supabase)
+    shards, index = build_catalog_shards(videos)
+    export_stats.update(write_catalog_shards(output_dir, shards, index))
+    stats["discovered_count"] = len(videos)
+    export_stats["discovered_count"] = len(videos)
+    print(
+        f"[Catalog] {len(videos)} videos -> {len(shards)} shards in {time.monotonic() - started:.1f}s: "
+        f"written={export_stats['shards_written']} unchanged={export_stats['shards_unchanged']} "
+        f"removed={export_stats['shards_removed']} ({export_stats['bytes_written']} bytes)"
+    )
+    return stats, {"catalog_export": export_stats}
+
+
+async def scrape_combined_backfill(supabase, context, semaphore):
+    targets = merge_backfill_targets(parse_null_cover_queue(NULL_COVER_QUEUE_JSON), parse_metadata_queue(METADATA_QUEUE_JSON))
+    if not targets:
+        print("[CombinedBackfill] No targets provided. Exiting.")
+        return make_run_stats(), {"combined_backfill": make_run_stats()}
+
+    stealth = Stealth()
+    detail_pages = []
+    for _ in range(CONCURRENT_DETAIL_PAGES):
+        dp = await context.new_page()
+        await stealth.apply_stealth_async(dp)
+        detail_pages.append(dp)
+
+    stats = await process_combined_backfill_queue(targets, detail_pages, supabase, semaphore)
+
+    for page in detail_pages:
+        await page.close()
+
+    return {key: stats[key] for key in make_run_stats()}, {"combined_backfill": dict(stats)}
+
+
+def resolve_queue_processor(queue_kind: str):
+    if queue_kind == "null_cover":
+        return process_null_cover_queue
+    if queue_kind == "metadata":
+        return process_metadata_queue
+    return None
+
+
+async def claim_backfill_targets(supabase, queue_kind: str, worker_id: str, batch_size: int):
+    response = await execute_with_retry(
+        label=f"queue-claim-{queue_kind}",
+        fn=lambda: supabase.rpc("claim_backfill_targets", {
+            "queue_kind": queue_kind,
+            "worker_id": worker_id,
+            "batch_size": batch_size,
+            "lease_seconds": QUEUE_LEASE_SECONDS,
+            "max_attempts": QUEUE_MAX_ATTEMPTS,
+        }).execute()
+    )
+    return response.data or []
+
+
+def split_queue_outcomes(claimed_rows, outcomes: dict):
+    done_ids = []
+    retry_ids = []
+    for row in claimed_rows:
+        external_id = str(row.get("external_id") or "").strip()
+        if outcomes.get(external_id) == "done":
+            done_ids.append(row["id"])
+        else:
+            retry_ids.append(row["id"])
+    return done_ids, retry_ids
+
+
+async def ack_backfill_targets(supabase, worker_id: str, done_ids: list, retry_ids: list):
+    if not done_ids and not retry_ids:
+        return 0
+    response = await execute_with_retry(
+        label=f"queue-ack-{worker_id}",
+        fn=lambda: supabase.rpc("ack_backfill_targets", {
+            "worker_id": worker_id,
+            "done_ids": done_ids,
+            "retry_ids": retry_ids,
+            "max_attempts": QUEUE_MAX_ATTEMPTS,
+            "error_text": "detail fetch did not complete" if retry_ids else None,
+        }).execute()
+    )
+    return response.data or 0
+
+
+async def scrape_queue_worker(supabase, context, semaphore):
+    queue_kind = BACKFILL_QUEUE_KIND
+    label = f"queue_{queue_kind}"
+    processor = resolve_queue_processor(queue_kind)
+    if processor is None:
+        print(f"[Queue] Unknown BACKFILL_QUEUE_KIND={queue_kind}. Exiting.")
+        return make_run_stats(), {label: make_run_stats()}
+    if not supabase:
+        print("[Queue] A Supabase client is required to claim queue targets. Exiting.")
+        return make_run_stats(), {label: make_run_stats()}
+
+    stealth = Stealth()
+    detail_pages = []
+    for _ in range(CONCURRENT_DETAIL_PAGES):
+        dp = await context.new_page()
+        await stealth.apply_stealth_async(dp)
+        detail_pages.append(dp)
+
+    stats = make_run_stats()
+    claims = 0
+    try:
+        while claims < QUEUE_MAX_CLAIMS:
+            if RUN_DEADLINE.stopping():
+                RUN_DEADLINE.defer("queue_claims_skipped", QUEUE_MAX_CLAIMS - claims)
+                break
+            claimed = await claim_backfill_targets(supabase, queue_kind, QUEUE_WORKER_ID, QUEUE_CLAIM_BATCH_SIZE)
+            if not claimed:
+                print(f"[Queue] {queue_kind} queue drained after {claims} claims.")
+                break
+            claims += 1
+
+            outcomes = {}
+            page_stats = await processor(normalize_queue_rows(claimed), detail_pages, supabase, semaphore, outcomes=outcomes)
+            merge_stats(stats, page_stats)
+
+            done_ids, retry_ids = split_queue_outcomes(claimed, outcomes)
+            await ack_backfill_targets(supabase, QUEUE_WORKER_ID, done_ids, retry_ids)
+            print(f"[Queue] {queue_kind} claim {claims}: claimed={len(claimed)} done={len(done_ids)} retry={len(retry_ids)}")
+    finally:
+        for page in detail_pages:
+            await page.close()
+
+    return stats, {label: dict(stats)}
+
+
+def resolve_site_pool_sizes(sites: list[str], global_cap: int | None = None) -> dict:
+    global_cap = GLOBAL_MAX_DETAIL_PAGES if global_cap is None else global_cap
+    sizes = {site: SITE_PROFILES[site]["detail_pages"] for site in sites}
+    while sizes and sum(sizes.values()) > max(global_cap, len(sizes)):
+        largest = max(sizes, key=sizes.get)
+        sizes[largest] -= 1
+    return sizes
+
+
+class SharedLimiter:
+    def __init__(self, local: asyncio.Semaphore, shared: asyncio.Semaphore):
+        self.local = local
+        self.shared = shared
+
+    async def __aenter__(self):
+        await self.local.acquire()
+        try:
+            await self.shared.acquire()
+        except BaseException:
+            self.local.release()
+            raise
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.shared.release()
+        self.local.release()
+        return False
+
+
+async def launch_site_context(p, site: str, user_data_dir: str, headless: bool):
+    profile = SITE_PROFILES[site]
+    launch_started = time.monotonic()
+    args = ["--disable-blink-features=AutomationControlled", "--no-sandbox"]
+    profile_dir = os.path.join(user_data_dir, site)
+    try:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=profile_dir, headless=headless, channel="chrome", user_agent=USER_AGENT,
+            args=args, ignore_default_args=["--enable-automation"], viewport={"width": 1280, "height": 720}
+        )
+    except Exception:
+        context = await p.chromium.launch_persistent_context(
+            user_data_dir=profile_dir, headless=headless, user_agent=USER_AGENT,
+            args=args, viewport={"width": 1280, "height": 720}
+        )
+
+    if BLOCK_HEAVY_RESOURCES:
+        blocked_types = profile["blocked_resource_types"]
+
+        async def route_handler(route, request):
+            if request.resource_type in blocked_types:
+                await route.abort()
+            else:
+                await route.continue_()
+
+        await context.route("**/*", route_handler)
+
+    report = await restore_browser_state(context, hosts=profile["hosts"])
+    report["launch_seconds"] = round(time.monotonic() - launch_started, 2)
+    return context, report
+
+
+async def open_detail_pages(context, count: int) -> list:
+    stealth = Stealth()
+    detail_pages = []
+    for _ in range(count):
+        dp = await context.new_page()
+        await stealth.apply_stealth_async(dp)
+        detail_pages.append(dp)
+    return detail_pages
+
+
+async def crawl_51cg_site(context, supabase, limiter, run_config, pool_size: int) -> dict:
+    detail_pages = await open_detail_pages(context, pool_size)
+    source_breakdown = {}
+    feeds = []
+    if run_config["run_51cg_main"]:
+        feeds.append("51cg")
+    if run_config["run_51cg_mrds"]:
+        feeds.append("51mrds")
+    for tag in feeds:
+        stats = None
+        if CG_INGEST_MODE in ("auto", "api"):
+            stats = await scrape_51cg_api(
+                supabase,
+                limiter,
+                detail_pages,
+                tag,
+                max_pages=run_config["cg_pages"],
+                detail_fetch_policy=run_config["detail_fetch_policy"],
+            )
+        if stats is None and CG_INGEST_MODE != "api":
+            stats = await scrape_51cg_feed(
+                context,
+                supabase,
+                limiter,
+                detail_pages,
+                CG_FEEDS[tag]["url"],
+                tag,
+                max_pages=run_config["cg_pages"],
+                detail_fetch_policy=run_config["detail_fetch_policy"],
+            )
+        source_breakdown[tag] = stats or make_run_stats()
+    return source_breakdown
+
+
+MISSAV_LIST_EXTRACT_JS = '''() => {
+    const resMap = new Map();
+    const items = document.querySelectorAll('div.grid > div, div.thumbnail, .group');
+    items.forEach(item => {
+        const img = item.querySelector('img');
+        const link = item.querySelector('a');
+        if (img && link && link.href) {
+            const href = link.href;
+            // Simple check for video ID pattern or /dm
+            const isVideo = href.includes('/dm') || href.split('/').pop().includes('-');
+            if (isVideo) {
+                const id = href.split('?')[0].split('/').pop();
+                if (id && !resMap.has(id)) {
+                    let t = img.alt || "";
+                    if (t.length < 5) {
+                        const te = item.querySelector('h1, h2, h3, .text-secondary');
+                        if (te) t = te.innerText;
+                    }
+                    if (t.length > 5) {
+                        const candidates = [
+                            img.getAttribute('data-src'),
+                            img.getAttribute('data-original'),
+                            img.getAttribute('data-lazy-src'),
+                            img.getAttribute('data-cfsrc'),
+                            img.getAttribute('data-xkrkllgl'),
+                            img.currentSrc,
+                            img.src
+                        ].filter(Boolean);
+
+                        let c = "";
+                        for (const candidate of candidates) {
+                            if (!candidate.startsWith('data:image')) {
+                                c = candidate;
+                                break;
+                            }
+                        }
+                        if (!c && candidates.length > 0) {
+                            c = candidates[0];
+                        }
+                        if (c.includes('cover-t.jpg')) c = c.replace('cover-t.jpg', 'cover-n.jpg');
+                        resMap.set(id, {
+                            external_id: id,
+                            title: t.trim(),
+                            cover_url: c,
+                            source_url: href
+                        });
+                    }
+                }
+            }
+        }
+    });
+    return Array.from(resMap.values());
+}'''
+
+
+@profiled("load_missav_list_page")
+async def load_missav_list_page(list_page, url: str):
+    await playwright_call("goto", list_page.goto(url, timeout=60000, wait_until="domcontentloaded"))
+    try:
+        await list_page.wait_for_selector('div.grid > div, div.thumbnail, .group', timeout=10000)
+    except Exception:
+        pass
+    await jitter_sleep(LIST_POST_LOAD_DELAY_MIN, LIST_POST_LOAD_DELAY_MAX)
+    if "Just a moment" in await list_page.title():
+        return "blocked", []
+    return "ok", await playwright_call("evaluate", list_page.evaluate(MISSAV_LIST_EXTRACT_JS))
+
+
+async def replay_retry_entry(url: str, payload: dict, list_page, detail_pages, supabase, limiter, tag_stats: dict) -> str:
+    tag = payload["tag"]
+    if payload["kind"] == "list":
+        if not await HOST_BREAKER.wait_until_allowed(url):
+            return "circuit_open"
+        try:
+            list_status, videos = await load_missav_list_page(list_page, url)
+        except Exception as e:
+            HOST_BREAKER.record_failure(url)
+            print(f"[Retry] {url}: {e}")
+            return "error"
+        if list_status == "blocked":
+            HOST_BREAKER.record_failure(url)
+            tag_stats["blocked_count"] += 1
+            return "blocked"
+        HOST_BREAKER.record_success(url)
+        merge_stats(tag_stats, await process_page_batch(videos, tag, detail_pages, supabase, limiter))
+        return "success"
+
+    rows_to_upsert = []
+    tag_stats["detail_attempted_count"] += 1
+    status = await prepare_video_detail(
+        dict(payload["video"]), tag, payload.get("existing"), detail_pages, limiter, tag_stats, rows_to_upsert
+    )
+    merge_stats(tag_stats, await batch_upsert_videos(rows_to_upsert, supabase, f"{tag.upper()} RETRY"))
+    return status
+
+
+async def replay_missav_retries(retry_queue: DetailRetryQueue, list_page, detail_pages, supabase, limiter, source_breakdown: dict, wait_for_all: bool = False):
+    while len(retry_queue) and not RUN_DEADLINE.stopping():
+        due = retry_queue.pop_due()
+        if not due:
+            if not wait_for_all:
+                return
+            await asyncio.sleep(min(retry_queue.next_due_in() or 0.0, 5.0))
+            continue
+        print(f"[Retry] Replaying {len(due)} blocked/failed targets ({len(retry_queue)} still waiting).")
+
+        async def replay(url, payload):
+            tag_stats = source_breakdown.setdefault(payload["tag"], make_run_stats())
+            status = await replay_retry_entry(url, payload, list_page, detail_pages, supabase, limiter, tag_stats)
+            if status == "success":
+                tag_stats["retry_recovered_count"] += 1
+            elif status in DETAIL_RETRY_STATUSES and not retry_queue.schedule(url, payload):
+                tag_stats["retry_lost_count"] += 1
+
+        list_entries = [(url, payload) for url, payload in due if payload["kind"] == "list"]
+        for url, payload in list_entries:
+            await replay(url, payload)
+        await asyncio.gather(*(replay(url, payload) for url, payload in due if payload["kind"] != "list"))
+
+    if wait_for_all:
+        for _, payload in retry_queue.drain():
+            source_breakdown.setdefault(payload["tag"], make_run_stats())["retry_lost_count"] += 1
+
+
+async def crawl_missav_sitemap(supabase, detail_pages, limiter, run_config, retry_queue) -> dict:
+    stats = make_run_stats()
+    async with create_http_client(HOST_MAX_CONCURRENCY) as client:
+        videos, report = await discover_sitemap_videos(supabase, client, MISSAV_SITEMAP_URL, SITEMAP_MAX_NEW_IDS)
+    print(
+        f"[Sitemap] segments={report['segments']} scanned={report['segments_scanned']} "
+        f"unchanged={report['segments_skipped']} failed={report['segments_failed']} entries={report['entries']} "
+        f"new={report['new']}{' (capped)' if report['truncated'] else ''}"
+    )
+
+    completed = True
+    for index, batch in enumerate(chunked(videos, SITEMAP_BATCH_SIZE)):
+        if RUN_DEADLINE.stopping():
+            RUN_DEADLINE.defer("sitemap_ids_skipped", len(videos) - index * SITEMAP_BATCH_SIZE)
+            completed = False
+            break
+        page_stats = await process_page_batch(
+            batch,
+            SITEMAP_SOURCE_TAG,
+            detail_pages,
+            supabase,
+            limiter,
+            detail_fetch_policy=run_config["detail_fetch_policy"],
+            retry_queue=retry_queue,
+        )
+        merge_stats(stats, page_stats)
+
+    # Watermarks only move once every new ID from those segments has been written.
+    if supabase and completed and report["watermarks"]:
+        try:
+            await save_sitemap_watermarks(supabase, report["watermarks"])
+        except Exception as e:
+            print(f"[Sitemap] Failed to save watermarks: {e}")
+    return stats
+
+
+async def crawl_missav_site(context, supabase, limiter, run_config, pool_size: int, run_id, run_source: str, site_report: dict, launch_started: float):
+    stealth = Stealth()
+    list_page = await context.new_page()
+    await stealth.apply_stealth_async(list_page)
+    detail_pages = await open_detail_pages(context, pool_size)
+    retry_queue = DetailRetryQueue()
+    source_breakdown = {}
+    source_yields = {}
+
+    if run_config.get("sitemap_discovery"):
+        try:
+            with PROFILER.span("sitemap"):
+                source_breakdown[SITEMAP_SOURCE_TAG] = await crawl_missav_sitemap(supabase, detail_pages, limiter, run_config, retry_queue)
+        except Exception as e:
+            print(f"[Sitemap] Discovery failed, continuing with list sources: {e}")
+
+    missav_sources = run_config["missav_sources"]
+    discovered_urls = set()
+    if run_config["discover_missav_sources"] and missav_sources:
+        discovered_sources = await resolve_discovered_sources(
+            list_page,
+            supabase,
+            missav_sources,
+            set(run_config["selected_tags"]),
+            DISCOVERED_SOURCE_LIMIT,
+        )
+        missav_sources = filter_discovered_sources_for_run(
+            seed_sources=run_config["missav_sources"],
+            discovered_sources=[source for source in discovered_sources if source not in run_config["missav_sources"]],
+            selected_tags=set(run_config["selected_tags"]),
+            run_mode=run_config["mode"],
+            manual_source_tags=run_config["manual_source_tags"],
+        )
+        discovered_urls = {source["url"] for source in discovered_sources} - {source["url"] for source in run_config["missav_sources"]}
+        print(f"[Discovery] Using {len(missav_sources)} MissAV sources after discovery.")
+
+    page_budgets = {}
+    if run_config["adaptive_page_budgets"] and supabase and missav_sources:
+        try:
+            history = await load_source_yield_history(supabase, run_source)
+            time_budget_seconds = PLANNER_TIME_BUDGET_MINUTES * 60
+            if RUN_DEADLINE.remaining() is not None:
+                time_budget_seconds = min(time_budget_seconds, RUN_DEADLINE.remaining() - RUN_DEADLINE.drain_reserve_seconds)
+            plan = plan_page_budgets(
+                missav_sources,
+                history,
+                max_pages=run_config["missav_pages"],
+                time_budget_seconds=max(time_budget_seconds, 0.0),
+            )
+            missav_sources, page_budgets = apply_page_plan(missav_sources, plan)
+            print(
+                f"[Planner] {len(missav_sources)} sources, {sum(page_budgets.values())} pages, "
+                f"~{plan['planned_seconds']:.0f}s, expected_new={plan['expected_new_total']}"
+            )
+            await update_scrape_run(supabase, run_id, {"run_plan": plan}, label="plan")
+        except Exception as e:
+            print(f"[Planner] Falling back to uniform page budgets: {e}")
+
+    for source_index, source in enumerate(missav_sources):
+        if RUN_DEADLINE.stopping():
+            RUN_DEADLINE.skip_sources(item["tag"] for item in missav_sources[source_index:])
+            break
+        base_url = source["url"]
+        tag = source["tag"]
+        source_stats = make_run_stats()
+        source_yield = {"pages": 0, "new": 0, "elapsed_seconds": 0.0, "page_yields": []}
+        source_started = time.monotonic()
+        stale_streak = 0
+        print(f"\n>>> Starting Category: {tag} <<<")
+
+        page_budget = page_budgets.get(tag, run_config["missav_pages"])
+        for page_num in range(1, page_budget + 1):
+            if RUN_DEADLINE.stopping():
+                RUN_DEADLINE.defer("pages_skipped", page_budget - page_num + 1)
+                break
+            current_url = build_paged_url(base_url, page_num)
+            print(f"[{tag.upper()}] Page {page_num}...")
+            if not await HOST_BREAKER.wait_until_allowed(current_url):
+                RUN_DEADLINE.defer("pages_skipped", page_budget - page_num + 1)
+                break
+            try:
+                list_status, videos = await load_missav_list_page(list_page, current_url)
+                if page_num == 1:
+                    record_first_page(site_report, launch_started, list_status == "blocked")
+                if list_status == "blocked":
+                    HOST_BREAKER.record_failure(current_url)
+                    print(f"[{tag.upper()}] Blocked. Queued for retry.")
+                    source_stats["blocked_count"] += 1
+                    retry_queue.schedule(current_url, {"kind": "list", "tag": tag})
+                    continue
+                HOST_BREAKER.record_success(current_url)
+
+                if not videos:
+                    print(f"[{tag.upper()}] No videos found.")
+                    break
+
+                page_stats = await process_page_batch(
+                    videos,
+                    tag,
+                    detail_pages,
+                    supabase,
+                    limiter,
+                    detail_fetch_policy=run_config["detail_fetch_policy"],
+                    retry_queue=retry_queue,
+                )
+                merge_stats(source_stats, page_stats)
+                source_yield["page_yields"].append(page_stats["new_external_count"])
+                if page_stats.get("stale_page"):
+                    stale_streak += 1
+                else:
+                    stale_streak = 0
+
+                if page_num >= run_config["early_stop_min_page"] and stale_streak >= run_config["early_stop_streak"]:
+                    print(f"[{tag.upper()}] Early stop after {stale_streak} stale pages (page {page_num}).")
+                    break
+
+                await jitter_sleep(INTER_PAGE_DELAY_MIN, INTER_PAGE_DELAY_MAX)
+            except Exception as e:
+                HOST_BREAKER.record_failure(current_url)
+                retry_queue.schedule(current_url, {"kind": "list", "tag": tag})
+                source_stats["detail_fail_count"] += 1
+                print(f"Error: {e}")
+
+        source_breakdown[tag] = source_stats
+        source_yield["pages"] = len(source_yield["page_yields"])
+        source_yield["new"] = source_stats["new_external_count"]
+        source_yield["elapsed_seconds"] = round(time.monotonic() - source_started, 1)
+        source_yields[tag] = source_yield
+        await replay_missav_retries(retry_queue, list_page, detail_pages, supabase, limiter, source_breakdown)
+
+    await replay_missav_retries(retry_queue, list_page, detail_pages, supabase, limiter, source_breakdown, wait_for_all=True)
+    if supabase and discovered_urls:
+        await record_discovered_source_yields(supabase, missav_sources, source_yields, discovered_urls)
+    return source_breakdown, source_yields
+
+
 async def scrape_videos():
+    global VIDEO_SINK
+    RUN_DEADLINE.start(resolve_run_budget_seconds())
+    HOST_BREAKER.reset()
+    PROFILER.start(PROFILE_RUN or random.random() < PROFILE_SAMPLE_RATE)
     supabase: Client = None
     if SUPABASE_URL and SUPABASE_KEY:
         supabase = create_client(SUPABASE_URL, SUPABASE_KEY)
     null_cover_targets = parse_null_cover_queue(NULL_COVER_QUEUE_JSON)
     metadata_targets = parse_metadata_queue(METADATA_QUEUE_JSON)
-    run_config = None if SCRAPER_RUN_MODE in {"null_cover", "metadata_queue"} else resolve_run_configuration()
+    combined_targets = merge_backfill_targets(null_cover_targets, metadata_targets)
+    run_config = None if SCRAPER_RUN_MODE in {"null_cover", "metadata_queue", "combined_backfill", "queue_worker", "verify", "catalog_export", "cover_check", "fingerprint_seed"} else resolve_run_configuration()
     
     HEADLESS = os.environ.get("HEADLESS", "true").lower() == "true"
     USER_DATA_DIR = os.environ.get("USER_DATA_DIR", os.path.join(os.getcwd(), "user_data"))
@@ -1498,6 +4840,41 @@ async def scrape_videos():
         if not metadata_targets:
             print("[Config] No metadata targets selected. Exiting without work.")
             return
+    elif SCRAPER_RUN_MODE == "combined_backfill":
+        print(
+            f"[Config] HEADLESS={HEADLESS} | RUN_MODE=combined_backfill | TARGETS={len(combined_targets)} "
+            f"(null_cover={len(null_cover_targets)}, metadata={len(metadata_targets)}) | "
+            f"CONCURRENT_DETAIL_PAGES={CONCURRENT_DETAIL_PAGES} | UPSERT_CHUNK={SUPABASE_UPSERT_CHUNK_SIZE} | "
+            f"RETRIES={SUPABASE_MAX_RETRIES} | BLOCK_HEAVY_RESOURCES={BLOCK_HEAVY_RESOURCES}"
+        )
+        if not combined_targets:
+            print("[Config] No backfill targets selected. Exiting without work.")
+            return
+    elif SCRAPER_RUN_MODE == "queue_worker":
+        print(
+            f"[Config] HEADLESS={HEADLESS} | RUN_MODE=queue_worker | QUEUE_KIND={BACKFILL_QUEUE_KIND} | "
+            f"WORKER_ID={QUEUE_WORKER_ID} | CLAIM_BATCH={QUEUE_CLAIM_BATCH_SIZE} | LEASE_SECONDS={QUEUE_LEASE_SECONDS} | "
+            f"MAX_ATTEMPTS={QUEUE_MAX_ATTEMPTS} | CONCURRENT_DETAIL_PAGES={CONCURRENT_DETAIL_PAGES} | "
+            f"UPSERT_CHUNK={SUPABASE_UPSERT_CHUNK_SIZE} | BLOCK_HEAVY_RESOURCES={BLOCK_HEAVY_RESOURCES}"
+        )
+    elif SCRAPER_RUN_MODE == "verify":
+        print(
+            f"[Config] RUN_MODE=verify | BATCH_SIZE={VERIFY_BATCH_SIZE} | CONCURRENCY={VERIFY_CONCURRENCY} | "
+            f"HOST_MAX_CONCURRENCY={HOST_MAX_CONCURRENCY} | HOST_MIN_INTERVAL={HOST_MIN_INTERVAL_SECONDS} | "
+            f"WRITE_CHUNK={VERIFY_WRITE_CHUNK_SIZE}"
+        )
+    elif SCRAPER_RUN_MODE == "cover_check":
+        print(
+            f"[Config] RUN_MODE=cover_check | CONCURRENCY={COVER_CHECK_CONCURRENCY} | PAGE_SIZE={COVER_CHECK_PAGE_SIZE} | "
+            f"MIN_AGE_HOURS={COVER_CHECK_MIN_AGE_HOURS} | CACHE={COVER_CHECK_CACHE_PATH or 'off'}"
+        )
+    elif SCRAPER_RUN_MODE == "fingerprint_seed":
+        print(f"[Config] RUN_MODE=fingerprint_seed | PAGE_SIZE={NEAR_DUP_SEED_PAGE_SIZE} | UPSERT_CHUNK={SUPABASE_UPSERT_CHUNK_SIZE}")
+    elif SCRAPER_RUN_MODE == "catalog_export":
+        print(
+            f"[Config] RUN_MODE=catalog_export | CATALOG_EXPORT_DIR={CATALOG_EXPORT_DIR or 'unset'} | "
+            f"PAGE_SIZE={CATALOG_PAGE_SIZE} | ACTOR_LIMIT={CATALOG_ACTOR_LIMIT}"
+        )
     else:
         print(
             f"[Config] HEADLESS={HEADLESS} | RUN_MODE={run_config['mode']} | "
@@ -1506,230 +4883,156 @@ async def scrape_videos():
             f"UPSERT_CHUNK={SUPABASE_UPSERT_CHUNK_SIZE} | RETRIES={SUPABASE_MAX_RETRIES} | "
             f"EARLY_STOP_STREAK={run_config['early_stop_streak']} | EARLY_STOP_MIN_PAGE={run_config['early_stop_min_page']} | "
             f"SOURCE_TAGS={run_config['selected_tags'] or 'ALL'} | DETAIL_FETCH_POLICY={run_config['detail_fetch_policy']} | "
-            f"DISCOVER_MISSAV_SOURCES={run_config['discover_missav_sources']} | SKIP_51CG={SKIP_51CG} | "
-            f"BLOCK_HEAVY_RESOURCES={BLOCK_HEAVY_RESOURCES}"
+            f"DISCOVER_MISSAV_SOURCES={run_config['discover_missav_sources']} | SITEMAP_DISCOVERY={run_config['sitemap_discovery']} | "
+            f"SKIP_51CG={SKIP_51CG} | "
+            f"ADAPTIVE_PAGE_BUDGETS={run_config['adaptive_page_budgets']} | BLOCK_HEAVY_RESOURCES={BLOCK_HEAVY_RESOURCES} | "
+            f"RUN_BUDGET_SECONDS={RUN_DEADLINE.budget_seconds or 'unbounded'}"
         )
-        if not run_config["missav_sources"] and not run_config["run_51cg_main"] and not run_config["run_51cg_mrds"]:
+        if not run_config["missav_sources"] and not run_config["sitemap_discovery"] and not run_config["run_51cg_main"] and not run_config["run_51cg_mrds"]:
             print("[Config] No sources selected. Exiting without work.")
             return
     semaphore = asyncio.Semaphore(CONCURRENT_DETAIL_PAGES)
     run_stats = make_run_stats()
     source_breakdown = {}
+    source_yields = {}
+    browser_report = {}
     run_source = "daily_scraper"
     if SCRAPER_RUN_MODE == "null_cover":
         run_source = "null_cover_backfill"
     elif SCRAPER_RUN_MODE == "metadata_queue":
         run_source = "metadata_backfill"
+    elif SCRAPER_RUN_MODE == "combined_backfill":
+        run_source = "combined_backfill"
+    elif SCRAPER_RUN_MODE == "queue_worker":
+        run_source = f"queue_worker_{BACKFILL_QUEUE_KIND}"
+    elif SCRAPER_RUN_MODE == "verify":
+        run_source = "liveness_verify"
+    elif SCRAPER_RUN_MODE == "catalog_export":
+        run_source = "catalog_export"
+    elif SCRAPER_RUN_MODE == "cover_check":
+        run_source = "cover_check"
+    elif SCRAPER_RUN_MODE == "fingerprint_seed":
+        run_source = "fingerprint_seed"
     run_id = await create_scrape_run(supabase, run_source)
     run_error = None
+    VIDEO_SINK = open_video_sink()
+    PROFILER.start_sampler()
 
     try:
-        async with async_playwright() as p:
-            args = ["--disable-blink-features=AutomationControlled", "--no-sandbox"]
-            try:
-                context = await p.chromium.launch_persistent_context(
-                    user_data_dir=USER_DATA_DIR, headless=HEADLESS, channel="chrome", user_agent=USER_AGENT,
-                    args=args, ignore_default_args=["--enable-automation"], viewport={"width": 1280, "height": 720}
-                )
-            except Exception:
-                context = await p.chromium.launch_persistent_context(
-                    user_data_dir=USER_DATA_DIR, headless=HEADLESS, user_agent=USER_AGENT,
-                    args=args, viewport={"width": 1280, "height": 720}
-                )
-
-            if BLOCK_HEAVY_RESOURCES:
-                async def route_handler(route, request):
-                    if request.resource_type in BLOCKED_RESOURCE_TYPES:
-                        await route.abort()
-                    else:
-                        await route.continue_()
+        if SCRAPER_RUN_MODE == "verify":
+            run_stats, source_breakdown = await verify_video_liveness(supabase)
+            return
+        if SCRAPER_RUN_MODE == "catalog_export":
+            run_stats, source_breakdown = await export_catalog(supabase)
+            return
+        if SCRAPER_RUN_MODE == "cover_check":
+            run_stats, source_breakdown = await check_cover_health(supabase)
+            return
+        if SCRAPER_RUN_MODE == "fingerprint_seed":
+            run_stats, source_breakdown = await seed_video_fingerprints(supabase)
+            return
 
-                await context.route("**/*", route_handler)
+        async with async_playwright() as p:
+            if SCRAPER_RUN_MODE in {"null_cover", "metadata_queue", "combined_backfill", "queue_worker"}:
+                context, browser_report["missav"] = await launch_site_context(p, "missav", USER_DATA_DIR, HEADLESS)
 
             if SCRAPER_RUN_MODE == "null_cover":
                 run_stats, source_breakdown = await scrape_null_cover_backfill(supabase, context, semaphore)
-                await context.close()
+                await close_context(context)
             elif SCRAPER_RUN_MODE == "metadata_queue":
                 run_stats, source_breakdown = await scrape_metadata_backfill(supabase, context, semaphore)
-                await context.close()
+                await close_context(context)
+            elif SCRAPER_RUN_MODE == "combined_backfill":
+                run_stats, source_breakdown = await scrape_combined_backfill(supabase, context, semaphore)
+                await close_context(context)
+            elif SCRAPER_RUN_MODE == "queue_worker":
+                run_stats, source_breakdown = await scrape_queue_worker(supabase, context, semaphore)
+                await close_context(context)
             else:
-                stealth = Stealth()
-                list_page = await context.new_page()
-                await stealth.apply_stealth_async(list_page)
-
-                detail_pages = []
-                for _ in range(CONCURRENT_DETAIL_PAGES):
-                    dp = await context.new_page()
-                    await stealth.apply_stealth_async(dp)
-                    detail_pages.append(dp)
-
-                if run_config["run_51cg_main"]:
-                    source_stats = await scrape_51cg_feed(
-                        context,
-                        supabase,
-                        semaphore,
-                        detail_pages,
-                        "https://51cg1.com/",
-                        "51cg",
-                        max_pages=run_config["cg_pages"],
-                        detail_fetch_policy=run_config["detail_fetch_policy"],
-                    )
-                    source_breakdown["51cg"] = source_stats
-                    merge_stats(run_stats, source_stats)
-
-                if run_config["run_51cg_mrds"]:
-                    source_stats = await scrape_51cg_feed(
-                        context,
-                        supabase,
-                        semaphore,
-                        detail_pages,
-                        "https://51cg1.com/category/mrds/",
-                        "51mrds",
-                        max_pages=run_config["cg_pages"],
-                        detail_fetch_policy=run_config["detail_fetch_policy"],
-                    )
-                    source_breakdown["51mrds"] = source_stats
-                    merge_stats(run_stats, source_stats)
-
-                missav_sources = run_config["missav_sources"]
-                if run_config["discover_missav_sources"] and missav_sources:
-                    discovered_sources = await discover_missav_sources(
-                        list_page,
-                        missav_sources,
-                        set(run_config["selected_tags"]),
-                        DISCOVERED_SOURCE_LIMIT,
-                    )
-                    missav_sources = filter_discovered_sources_for_run(
-                        seed_sources=run_config["missav_sources"],
-                        discovered_sources=[source for source in discovered_sources if source not in run_config["missav_sources"]],
-                        selected_tags=set(run_config["selected_tags"]),
-                        run_mode=run_config["mode"],
-                        manual_source_tags=run_config["manual_source_tags"],
-                    )
-                    print(f"[Discovery] Using {len(missav_sources)} MissAV sources after discovery.")
-
-                for source in missav_sources:
-                    base_url = source["url"]
-                    tag = source["tag"]
-                    source_stats = make_run_stats()
-                    stale_streak = 0
-                    print(f"\n>>> Starting Category: {tag} <<<")
-
-                    for page_num in range(1, run_config["missav_pages"] + 1):
-                        current_url = build_paged_url(base_url, page_num)
-                        print(f"[{tag.upper()}] Page {page_num}...")
-                        try:
-                            await list_page.goto(current_url, timeout=60000, wait_until="domcontentloaded")
-                            
-                            try:
-                                await list_page.wait_for_selector('div.grid > div, div.thumbnail, .group', timeout=10000)
-                            except:
-                                pass
-                            await jitter_sleep(LIST_POST_LOAD_DELAY_MIN, LIST_POST_LOAD_DELAY_MAX)
-                            
-                            if "Just a moment" in await list_page.title():
-                                print(f"[{tag.upper()}] Blocked. Skipping.")
-                                source_stats["blocked_count"] += 1
-                                continue
-
-                            videos = await list_page.evaluate('''() => {
-                                const resMap = new Map();
-                                const items = document.querySelectorAll('div.grid > div, div.thumbnail, .group');
-                                items.forEach(item => {
-                                    const img = item.querySelector('img');
-                                    const link = item.querySelector('a');
-                                    if (img && link && link.href) {
-                                        const href = link.href;
-                                        // Simple check for video ID pattern or /dm
-                                        const isVideo = href.includes('/dm') || href.split('/').pop().includes('-');
-                                        if (isVideo) {
-                                            const id = href.split('?')[0].split('/').pop();
-                                            if (id && !resMap.has(id)) {
-                                                let t = img.alt || "";
-                                                if (t.length < 5) {
-                                                    const te = item.querySelector('h1, h2, h3, .text-secondary');
-                                                    if (te) t = te.innerText;
-                                                }
-                                                if (t.length > 5) {
-                                                    const candidates = [
-                                                        img.getAttribute('data-src'),
-                                                        img.getAttribute('data-original'),
-                                                        img.getAttribute('data-lazy-src'),
-                                                        img.getAttribute('data-cfsrc'),
-                                                        img.getAttribute('data-xkrkllgl'),
-                                                        img.currentSrc,
-                                                        img.src
-                                                    ].filter(Boolean);
-
-                                                    let c = "";
-                                                    for (const candidate of candidates) {
-                                                        if (!candidate.startsWith('data:image')) {
-                                                            c = candidate;
-                                                            break;
-                                                        }
-                                                    }
-                                                    if (!c && candidates.length > 0) {
-                                                        c = candidates[0];
-                                                    }
-                                                    if (c.includes('cover-t.jpg')) c = c.replace('cover-t.jpg', 'cover-n.jpg');
-                                                    resMap.set(id, {
-                                                        external_id: id,
-                                                        title: t.trim(),
-                                                        cover_url: c,
-                                                        source_url: href
-                                                    });
-                                                }
-                                            }
-                                        }
-                                    }
-                                });
-                                return Array.from(resMap.values());
-                            }''')
-
-                            if not videos:
-                                print(f"[{tag.upper()}] No videos found.")
-                                break
-
-                            page_stats = await process_page_batch(
-                                videos,
-                                tag,
-                                detail_pages,
-                                supabase,
-                                semaphore,
-                                detail_fetch_policy=run_config["detail_fetch_policy"],
+                sites = []
+                if run_config["run_51cg_main"] or run_config["run_51cg_mrds"]:
+                    sites.append("51cg")
+                if run_config["missav_sources"] or run_config["sitemap_discovery"]:
+                    sites.append("missav")
+                pool_sizes = resolve_site_pool_sizes(sites)
+                shared_limit = asyncio.Semaphore(GLOBAL_MAX_DETAIL_PAGES)
+                print(f"[Sites] Running {', '.join(sites)} concurrently | pools={pool_sizes} | GLOBAL_MAX_DETAIL_PAGES={GLOBAL_MAX_DETAIL_PAGES}")
+
+                async def run_site(site: str):
+                    launch_started = time.monotonic()
+                    site_context, site_report = await launch_site_context(p, site, USER_DATA_DIR, HEADLESS)
+                    browser_report[site] = site_report
+                    limiter = SharedLimiter(asyncio.Semaphore(pool_sizes[site]), shared_limit)
+                    try:
+                        with PROFILER.span(f"site.{site}"):
+                            if site == "51cg":
+                                return await crawl_51cg_site(site_context, supabase, limiter, run_config, pool_sizes[site]), {}
+                            return await crawl_missav_site(
+                                site_context, supabase, limiter, run_config, pool_sizes[site], run_id, run_source, site_report, launch_started
                             )
-                            merge_stats(source_stats, page_stats)
-                            if page_stats.get("stale_page"):
-                                stale_streak += 1
-                            else:
-                                stale_streak = 0
-
-                            if page_num >= run_config["early_stop_min_page"] and stale_streak >= run_config["early_stop_streak"]:
-                                print(f"[{tag.upper()}] Early stop after {stale_streak} stale pages (page {page_num}).")
-                                break
-
-                            await jitter_sleep(INTER_PAGE_DELAY_MIN, INTER_PAGE_DELAY_MAX)
-                        except Exception as e:
-                            source_stats["detail_fail_count"] += 1
-                            print(f"Error: {e}")
-
-                    source_breakdown[tag] = source_stats
-                    merge_stats(run_stats, source_stats)
-
-                await context.close()
+                    finally:
+                        await close_context(site_context)
+
+                results = await asyncio.gather(*(run_site(site) for site in sites), return_exceptions=True)
+                site_errors = []
+                for site, result in zip(sites, results):
+                    if isinstance(result, BaseException):
+                        print(f"[Sites] {site} crawl failed: {result}")
+                        site_errors.append(result)
+                        continue
+                    site_breakdown, site_yields = result
+                    for tag, source_stats in site_breakdown.items():
+                        source_breakdown[tag] = source_stats
+                        merge_stats(run_stats, source_stats)
+                    source_yields.update(site_yields)
+                if site_errors:
+                    raise site_errors[0]
     except Exception as e:
         run_error = str(e)
         raise
     finally:
-        write_step_summary(run_stats, source_breakdown)
+        if VIDEO_SINK:
+            await VIDEO_SINK.close()
+            print(
+                f"[Sink] Wrote {VIDEO_SINK.written} rows to {OUTPUT_SINK} sink at {OUTPUT_SINK_PATH} "
+                f"({VIDEO_SINK.written / max(RUN_DEADLINE.elapsed(), 1e-6):.1f} rows/s)"
+            )
+        deadline_report = RUN_DEADLINE.report() if RUN_DEADLINE.cut_short() else None
+        if deadline_report:
+            print(f"[Deadline] Finished early: {json.dumps(deadline_report, ensure_ascii=False)}")
+        run_status = "success"
+        if run_error:
+            run_status = "failed"
+        elif deadline_report:
+            run_status = "partial"
+        run_report = {
+            "deadline": deadline_report,
+            "browser_state": browser_report or None,
+            "circuit_breaker": HOST_BREAKER.report() or None,
+        }
+        await PROFILER.stop_sampler()
+        if PROFILER.enabled:
+            try:
+                run_report["profile"] = PROFILER.write(PROFILE_DIR)
+            except OSError as e:
+                print(f"[Profile] Failed to write profile artifacts: {e}")
+        write_step_summary(run_stats, source_breakdown, run_report)
         await finalize_scrape_run(
             supabase=supabase,
             run_id=run_id,
             stats=run_stats,
             source_breakdown=source_breakdown,
-            status="failed" if run_error else "success",
+            status=run_status,
             error_message=run_error,
+            run_report=run_report,
         )
+        if source_yields:
+            await update_scrape_run(supabase, run_id, {"source_yields": source_yields}, label="source-yields")
+        if CATALOG_EXPORT_DIR and run_status == "success" and SCRAPER_RUN_MODE in CATALOG_EXPORT_RUN_MODES:
+            try:
+                await export_catalog(supabase)
+            except Exception as e:
+                print(f"[Catalog] Export failed: {e}")
 
 if __name__ == "__main__":
     asyncio.run(scrape_videos())
@@ -0,0 +1,221 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+CONTENT = """
+<p>Intro text</p>
+<p>NO1: first clip</p>
+<p><div class="dplayer" data-config='{"video":{"url":"https://cdn.example/a.m3u8"}}'></div></p>
+<p>NO2: <strong>second</strong> clip</p>
+<div class="dplayer" data-config="{&quot;video&quot;:{&quot;url&quot;:&quot;https://cdn.example/b.m3u8&quot;}}"></div>
+<img src="x.jpg">
+<div class="dplayer" data-config='{"video":{"url":"https://cdn.example/c.m3u8"}}'></div>
+"""
+
+
+def rest_post(post_id, modified, content=CONTENT):
+    return {
+        "id": post_id,
+        "link": f"https://51cg1.com/archives/{post_id}/",
+        "title": {"rendered": "Title &amp; more"},
+        "date_gmt": "2026-10-18T01:00:00",
+        "modified_gmt": modified,
+        "content": {"rendered": content},
+        "_embedded": {
+            "wp:term": [
+                [{"taxonomy": "category", "name": "今日吃瓜"}],
+                [{"taxonomy": "post_tag", "name": "学生"}],
+            ],
+            "wp:featuredmedia": [{"source_url": "https://img.example/cover.jpg"}],
+        },
+    }
+
+
+class FakeResponse:
+    def __init__(self, payload=None, status_code=200, headers=None, content=b""):
+        self.payload = payload
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = content
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise RuntimeError(f"HTTP {self.status_code}")
+
+    def json(self):
+        return self.payload
+
+
+class FakeClient:
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def get(self, url, params=None):
+        self.requests.append((url, dict(params or {})))
+        return self.responses.pop(0)
+
+
+class Feed51cgIngestionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_players_match_browser_title_suffixes(self):
+        videos = self.main.parse_51cg_players(CONTENT)
+        self.assertEqual(
+            [
+                {"url": "https://cdn.example/a.m3u8", "title_suffix": "NO1: first clip"},
+                {"url": "https://cdn.example/b.m3u8", "title_suffix": "NO2: second clip"},
+                {"url": "https://cdn.example/c.m3u8", "title_suffix": ""},
+            ],
+            videos,
+        )
+        self.assertEqual(
+            [{"url": "https://cdn.example/only.m3u8", "title_suffix": ""}],
+            self.main.parse_51cg_players("<script>var u = 'https://cdn.example/only.m3u8';</script>"),
+        )
+
+    def test_rest_post_expands_into_suffixed_rows(self):
+        post = self.main.parse_51cg_rest_post(rest_post(101, "2026-10-18T02:00:00"))
+        vid, details = self.main.build_51cg_post_video(post)
+        rows = self.main.build_51cg_rows(vid, details, "51cg")
+
+        self.assertEqual(["51cg_101", "51cg_101_2", "51cg_101_3"], [row["external_id"] for row in rows])
+        self.assertEqual("Title & more NO1: first clip", rows[0]["title"])
+        self.assertEqual("https://cdn.example/b.m3u8", rows[1]["source_url"])
+        self.assertEqual("https://img.example/cover.jpg", rows[2]["cover_url"])
+        self.assertEqual("2026-10-18", rows[0]["release_date"])
+        self.assertIn("51cg", rows[0]["categories"])
+        self.assertIn("学生", rows[0]["tags"])
+
+    def test_rest_post_keys_on_permalink_archive_number(self):
+        post = self.main.parse_51cg_rest_post({**rest_post(101, "2026-10-18T02:00:00"), "link": "https://51cg1.com/archives/88001/"})
+        vid, details = self.main.build_51cg_post_video(post)
+        rows = self.main.build_51cg_rows(vid, details, "51cg")
+        self.assertEqual(["51cg_88001", "51cg_88001_2", "51cg_88001_3"], [row["external_id"] for row in rows])
+
+        fallback = self.main.parse_51cg_rest_post({**rest_post(101, "2026-10-18T02:00:00"), "link": "https://51cg1.com/some-slug/"})
+        self.assertEqual("101", fallback["id"])
+
+    def test_rest_pagination_requests_modified_window(self):
+        client = FakeClient([
+            FakeResponse([{"id": 7}]),
+            FakeResponse([rest_post(1, "2026-10-18T02:00:00")], headers={"x-wp-totalpages": "2"}),
+            FakeResponse([rest_post(2, "2026-10-18T03:00:00")], headers={"x-wp-totalpages": "2"}),
+        ])
+        with mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)):
+            posts, complete = asyncio.run(self.main.fetch_51cg_rest_posts(
+                client, self.main.CG_FEEDS["51mrds"], "2026-10-17T00:00:00+00:00", max_pages=5
+            ))
+
+        self.assertTrue(complete)
+        self.assertEqual(["1", "2"], [post["id"] for post in posts])
+        self.assertEqual({"slug": "mrds", "_fields": "id"}, client.requests[0][1])
+        params = client.requests[2][1]
+        self.assertEqual(7, params["categories"])
+        self.assertEqual(2, params["page"])
+        self.assertEqual("modified", params["orderby"])
+        self.assertEqual("asc", params["order"])
+        self.assertEqual("2026-10-17T00:00:00+00:00", params["modified_after"])
+        self.assertEqual(3, len(client.requests))
+
+    def test_rss_stops_at_watermark(self):
+        rss = b"""<?xml version="1.0"?>
+<rss xmlns:content="http://purl.org/rss/1.0/modules/content/"><channel>
+<item><title>New</title><link>https://51cg1.com/archives/9/</link><pubDate>Sun, 18 Oct 2026 05:00:00 +0000</pubDate>
+<category>Tag A</category><content:encoded><![CDATA[<div class="dplayer" data-config='{"video":{"url":"https://cdn.example/n.m3u8"}}'></div>]]></content:encoded></item>
+<item><title>Old</title><link>https://51cg1.com/archives/8/</link><pubDate>Fri, 16 Oct 2026 05:00:00 +0000</pubDate></item>
+</channel></rss>"""
+        client = FakeClient([FakeResponse(content=rss)])
+        with mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)):
+            posts, complete = asyncio.run(self.main.fetch_51cg_rss_posts(
+                client, self.main.CG_FEEDS["51cg"], "2026-10-17T00:00:00+00:00", max_pages=3
+            ))
+
+        self.assertTrue(complete)
+        self.assertEqual(["9"], [post["id"] for post in posts])
+        self.assertEqual(["Tag A"], posts[0]["tags"])
+        self.assertEqual(1, len(client.requests))
+
+    def test_api_run_advances_watermark_and_hands_empty_posts_to_browser(self):
+        posts = [
+            self.main.parse_51cg_rest_post(rest_post(1, "2026-10-18T02:00:00")),
+            self.main.parse_51cg_rest_post(rest_post(2, "2026-10-18T04:00:00", content="")),
+        ]
+        upserted = []
+        browser_batches = []
+        saved = []
+
+        async def fake_ingest(supabase, source_tag, max_pages):
+            return {"kind": "rest", "posts": posts, "complete": True}
+
+        async def fake_existing(supabase, external_ids, label):
+            return {}
+
+        async def fake_upsert(records, supabase, mode_label):
+            upserted.extend(records)
+            return {"upserted_count": len(records), "placeholder_cover_count": 0}
+
+        async def fake_batch(videos, *args, **kwargs):
+            browser_batches.append([video["external_id"] for video in videos])
+            return self.main.make_run_stats()
+
+        async def fake_save(supabase, feed, modified_after, post_count):
+            saved.append((feed, modified_after, post_count))
+
+        with mock.patch.object(self.main, "ingest_51cg_feed", fake_ingest), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_existing), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert), \
+             mock.patch.object(self.main, "process_51cg_batch", fake_batch), \
+             mock.patch.object(self.main, "save_feed_watermark", fake_save):
+            stats = asyncio.run(self.main.scrape_51cg_api(object(), None, [object()], "51cg", max_pages=1))
+
+        self.assertEqual(["51cg_1", "51cg_1_2", "51cg_1_3"], [row["external_id"] for row in upserted])
+        self.assertEqual([["51cg_2"]], browser_batches)
+        self.assertEqual(3, stats["new_external_count"])
+        self.assertEqual([("51cg", "2026-10-18T04:00:00", 2)], saved)
+
+    def test_crawl_falls_back_to_browser_when_api_is_unavailable(self):
+        calls = []
+
+        async def fake_open(context, count):
+            return []
+
+        async def fake_api(*args, **kwargs):
+            calls.append("api")
+            return None
+
+        async def fake_feed(context, supabase, limiter, detail_pages, base_url, tag, **kwargs):
+            calls.append(base_url)
+            return self.main.make_run_stats()
+
+        run_config = {"run_51cg_main": True, "run_51cg_mrds": False, "cg_pages": 1, "detail_fetch_policy": "smart"}
+        with mock.patch.object(self.main, "open_detail_pages", fake_open), \
+             mock.patch.object(self.main, "scrape_51cg_api", fake_api), \
+             mock.patch.object(self.main, "scrape_51cg_feed", fake_feed), \
+             mock.patch.object(self.main, "CG_INGEST_MODE", "auto"):
+            breakdown = asyncio.run(self.main.crawl_51cg_site(object(), None, None, run_config, 1))
+
+        self.assertEqual(["api", self.main.CG_FEEDS["51cg"]["url"]], calls)
+        self.assertIn("51cg", breakdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
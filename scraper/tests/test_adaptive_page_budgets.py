@@ -0,0 +1,70 @@
+import importlib
+import json
+import sys
+import types
+import unittest
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class AdaptivePageBudgetTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_marginal_yields_average_observed_pages_and_never_increase(self):
+        samples = [
+            {"pages": 3, "new": 18, "page_yields": [10, 6, 2]},
+            {"pages": 2, "new": 14, "page_yields": [8, 6]},
+        ]
+
+        curve = self.main.estimate_marginal_yields(samples, max_pages=5, decay=0.5, prior_first_page=4)
+
+        self.assertEqual([9.0, 6.0, 2.0, 1.0, 0.5], curve)
+
+    def test_marginal_yields_fall_back_to_prior_without_history(self):
+        curve = self.main.estimate_marginal_yields([], max_pages=3, decay=0.5, prior_first_page=4)
+        self.assertEqual([4, 2.0, 1.0], curve)
+
+    def test_history_parses_source_yields_and_legacy_error_summary(self):
+        rows = [
+            {"source_yields": {"new": {"pages": 2, "new": 9, "page_yields": [6, 3]}}, "error_summary": None},
+            {"source_yields": None, "error_summary": json.dumps({"sources": {"new": {"pages_scanned": 4, "new_external_count": 12}}})},
+            {"source_yields": None, "error_summary": '{"sources": {"trunc'},
+        ]
+
+        history = self.main.parse_source_yield_history(rows)
+
+        self.assertEqual([{"pages": 2, "new": 9, "page_yields": [6, 3]}, {"pages": 4, "new": 12}], history["new"])
+
+    def test_plan_spends_time_budget_on_highest_yield_pages(self):
+        sources = [
+            {"tag": "new", "url": "https://missav.ws/new"},
+            {"tag": "niche", "url": "https://missav.ws/genres/niche"},
+        ]
+        history = {
+            "new": [{"pages": 4, "new": 60, "elapsed_seconds": 40, "page_yields": [20, 18, 12, 10]}],
+            "niche": [{"pages": 4, "new": 1, "elapsed_seconds": 40, "page_yields": [1, 0, 0, 0]}],
+        }
+
+        plan = self.main.plan_page_budgets(sources, history, max_pages=4, time_budget_seconds=50)
+        ordered, budgets = self.main.apply_page_plan(sources, plan)
+
+        self.assertEqual({"new": 4, "niche": 1}, budgets)
+        self.assertEqual(["new", "niche"], [source["tag"] for source in ordered])
+        self.assertEqual(61.0, plan["expected_new_total"])
+        self.assertLessEqual(plan["planned_seconds"], 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
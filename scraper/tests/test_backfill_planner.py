@@ -0,0 +1,140 @@
+import importlib.util
+import json
+import os
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+
+def load_planner_module():
+    path = pathlib.Path(__file__).resolve().parents[2] / 'scripts' / 'plan_backfill.py'
+    spec = importlib.util.spec_from_file_location('plan_backfill', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def queue_row(external_id, release_date):
+    return {
+        'external_id': external_id,
+        'source_url': f'https://missav.ws/{external_id}',
+        'source_site': 'missav',
+        'source_release_date': release_date,
+        'created_at': '2026-10-01T00:00:00+00:00',
+    }
+
+
+PLAN_ROW = {
+    'tag_rows': [{'tag': 'exclusive', 'missing_cover_count': 40, 'pending_count': 2, 'partial_count': 50}],
+    'null_cover_rows': json.dumps([queue_row('abc-1', '2026-09-01'), queue_row('abc-2', '2026-10-01')]),
+    'metadata_rows': [queue_row('abc-3', '2026-10-02')],
+}
+
+
+class BackfillPlannerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.planner = load_planner_module()
+
+    def test_plan_query_scans_videos_once(self):
+        query = self.planner.build_plan_query(source_site='missav', null_cover_limit=30, metadata_limit=20)
+        self.assertEqual(1, query.count('from public.videos'))
+        self.assertEqual(1, query.count('from public.video_backlog'))
+        self.assertEqual(1, query.strip().count(';'))
+        self.assertIn("and v.source_site = 'missav'", query)
+        self.assertIn("('null_cover', 30), ('metadata', 20)", query)
+        self.assertNotIn('public.favorites', query)
+        self.assertNotIn('priority_report r', query)
+
+    def test_popularity_query_scores_demand_in_sql(self):
+        query = self.planner.build_plan_query(priority='popularity', watch_window_days=7)
+        self.assertEqual(1, query.count('from public.videos'))
+        self.assertIn('from public.favorites', query)
+        self.assertIn("interval '7 days'", query)
+        self.assertIn("'weekly_hot' = any(", query)
+        self.assertIn('where priority_rank <= queue_limit', query)
+        self.assertIn('as priority_report', query)
+
+    def test_build_plan_splits_the_single_result_row(self):
+        plan = self.planner.build_plan(
+            [PLAN_ROW],
+            source_site='missav',
+            focus='cover',
+            include_51cg=False,
+            tag_limit=2,
+            null_cover_limit=50,
+            metadata_limit=50,
+        )
+        self.assertEqual(['exclusive', 'creampie'], plan['selected_tags'])
+        self.assertTrue(plan['skip_51cg'])
+        self.assertEqual(['abc-2', 'abc-1'], [row['external_id'] for row in plan['null_cover_rows']])
+        self.assertEqual(['abc-3'], [row['external_id'] for row in plan['metadata_rows']])
+
+    def test_popularity_plan_keeps_sql_order_and_reports_gain(self):
+        hot = dict(queue_row('abc-1', '2026-01-01'), favorite_count=3, recent_watch_count=5, priority=8.1)
+        fresh = dict(queue_row('abc-2', '2026-10-01'), favorite_count=0, recent_watch_count=0, priority=0.9)
+        row = {
+            'tag_rows': [],
+            'null_cover_rows': [hot, fresh],
+            'metadata_rows': [],
+            'priority_report': {
+                'null_cover': {
+                    'priority_fetches': 2, 'priority_visible_rows': 1, 'priority_demand': 8,
+                    'recency_fetches': 2, 'recency_visible_rows': 0, 'recency_demand': 0,
+                },
+            },
+        }
+        plan = self.planner.build_plan([row], 'missav', 'mixed', False, 4, 50, 50, priority='popularity')
+
+        self.assertEqual(['abc-1', 'abc-2'], [item['external_id'] for item in plan['null_cover_rows']])
+        report = plan['priority_report']['null_cover']
+        self.assertEqual(0.5, report['visible_completeness_per_fetch'])
+        self.assertEqual(0.5, report['visible_completeness_gained_per_fetch'])
+        self.assertEqual(4.0, report['demand_per_fetch'])
+
+    def test_env_files_source_cleanly(self):
+        plan = self.planner.build_plan([PLAN_ROW], 'missav', 'mixed', False, 4, 50, 50)
+        with tempfile.TemporaryDirectory() as output_dir:
+            written = self.planner.write_plan_files(plan, output_dir)
+            self.assertEqual(
+                {'targets.env', 'null_cover.env', 'metadata.env', 'plan.json'},
+                {os.path.basename(path) for path in written},
+            )
+            proc = subprocess.run(
+                ['bash', '-lc', f'''set -euo pipefail
+source {output_dir}/targets.env
+source {output_dir}/null_cover.env
+source {output_dir}/metadata.env
+[[ "$NULL_COVER_QUEUE_JSON" == *'"external_id": "abc-2"'* ]]
+printf '%s %s %s' "$SCRAPER_SOURCE_TAGS" "$NULL_COVER_QUEUE_COUNT" "$METADATA_QUEUE_COUNT"'''],
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        self.assertEqual('exclusive,creampie,new,weekly_hot 2 1', proc.stdout.strip())
+
+    def test_main_makes_one_round_trip(self):
+        calls = []
+
+        def fake_run_sql(project_ref, token, query, read_only=True):
+            calls.append((query, read_only))
+            return [PLAN_ROW]
+
+        argv = ['plan_backfill.py', '--output', 'json']
+        with mock.patch.object(self.planner, 'run_sql', fake_run_sql), \
+             mock.patch.dict(os.environ, {'SUPABASE_ACCESS_TOKEN': 'token'}), \
+             mock.patch.object(sys, 'argv', argv), \
+             mock.patch('builtins.print') as printed:
+            self.planner.main()
+
+        self.assertEqual(1, len(calls))
+        self.assertTrue(calls[0][1])
+        plan = json.loads(printed.call_args[0][0])
+        self.assertEqual(2, len(plan['null_cover_rows']))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeRpc:
+    def __init__(self, supabase, name, params):
+        self.supabase = supabase
+        self.name = name
+        self.params = params
+
+    def execute(self):
+        self.supabase.calls.append((self.name, self.params))
+        if self.name == "claim_backfill_targets":
+            data = self.supabase.pages.pop(0) if self.supabase.pages else []
+        else:
+            data = len(self.params["done_ids"]) + len(self.params["retry_ids"])
+        return types.SimpleNamespace(data=data)
+
+
+class FakeSupabase:
+    def __init__(self, pages):
+        self.pages = list(pages)
+        self.calls = []
+
+    def rpc(self, name, params):
+        return FakeRpc(self, name, params)
+
+
+class FakePage:
+    async def close(self):
+        return None
+
+
+class FakeContext:
+    async def new_page(self):
+        return FakePage()
+
+
+class FakeStealth:
+    async def apply_stealth_async(self, page):
+        return None
+
+
+class BackfillQueueWorkerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_split_queue_outcomes_retries_unknown_rows(self):
+        claimed = [
+            {"id": 1, "external_id": "abc-1"},
+            {"id": 2, "external_id": "abc-2"},
+            {"id": 3, "external_id": "abc-3"},
+        ]
+        done, retry = self.main.split_queue_outcomes(claimed, {"abc-1": "done", "abc-2": "retry"})
+        self.assertEqual([1], done)
+        self.assertEqual([2, 3], retry)
+
+    def test_queue_worker_claims_pages_until_drained_and_acks_in_bulk(self):
+        pages = [
+            [
+                {"id": 10, "external_id": "abc-1", "source_url": "https://missav.ws/abc-1", "source_site": "missav"},
+                {"id": 11, "external_id": "abc-2", "source_url": "https://missav.ws/abc-2", "source_site": "missav"},
+            ],
+            [
+                {"id": 12, "external_id": "abc-3", "source_url": "https://missav.ws/abc-3", "source_site": "missav"},
+            ],
+        ]
+        supabase = FakeSupabase(pages)
+        processed = []
+
+        async def fake_process(targets, detail_pages, supabase, semaphore, outcomes=None):
+            processed.append([target["external_id"] for target in targets])
+            for target in targets:
+                outcomes[target["external_id"]] = "retry" if target["external_id"] == "abc-2" else "done"
+            stats = self.main.make_run_stats()
+            stats["detail_attempted_count"] = len(targets)
+            return stats
+
+        with mock.patch.object(self.main, "BACKFILL_QUEUE_KIND", "null_cover"), \
+             mock.patch.object(self.main, "QUEUE_WORKER_ID", "worker-a"), \
+             mock.patch.object(self.main, "CONCURRENT_DETAIL_PAGES", 1), \
+             mock.patch.object(self.main, "Stealth", FakeStealth), \
+             mock.patch.object(self.main, "process_null_cover_queue", fake_process):
+            stats, breakdown = asyncio.run(
+                self.main.scrape_queue_worker(supabase, FakeContext(), asyncio.Semaphore(1))
+            )
+
+        self.assertEqual([["abc-1", "abc-2"], ["abc-3"]], processed)
+        self.assertEqual(3, stats["detail_attempted_count"])
+        self.assertIn("queue_null_cover", breakdown)
+
+        acks = [params for name, params in supabase.calls if name == "ack_backfill_targets"]
+        self.assertEqual(2, len(acks))
+        self.assertEqual([10], acks[0]["done_ids"])
+        self.assertEqual([11], acks[0]["retry_ids"])
+        self.assertEqual([12], acks[1]["done_ids"])
+        self.assertTrue(all(params["worker_id"] == "worker-a" for params in acks))
+
+        claims = [name for name, _ in supabase.calls if name == "claim_backfill_targets"]
+        self.assertEqual(3, len(claims))
+
+
+if __name__ == "__main__":
+    unittest.main()
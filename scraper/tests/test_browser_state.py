@@ -0,0 +1,100 @@
+import asyncio
+import importlib
+import json
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+STATE = {
+    "cookies": [
+        {"name": "cf_clearance", "value": "ok", "domain": ".missav.ws", "path": "/", "expires": 2000.0},
+        {"name": "stale", "value": "old", "domain": ".missav.ws", "path": "/", "expires": 500.0},
+        {"name": "session", "value": "s", "domain": "51cg1.com", "path": "/", "expires": -1},
+    ],
+    "origins": [
+        {"origin": "https://missav.ws", "localStorage": [{"name": "theme", "value": "dark"}]},
+        {"origin": "https://empty.example", "localStorage": []},
+    ],
+}
+
+
+class FakeContext:
+    def __init__(self):
+        self.cookies = []
+        self.scripts = []
+
+    async def add_cookies(self, cookies):
+        self.cookies.extend(cookies)
+
+    async def add_init_script(self, script):
+        self.scripts.append(script)
+
+
+class BrowserStateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_state_is_split_per_host_without_expired_cookies(self):
+        hosts = self.main.split_storage_state(STATE, now=1000.0)
+
+        self.assertEqual({"missav.ws", "51cg1.com"}, set(hosts))
+        self.assertEqual(["cf_clearance"], [cookie["name"] for cookie in hosts["missav.ws"]["cookies"]])
+        self.assertEqual(1, len(hosts["missav.ws"]["origins"]))
+
+    def test_load_skips_stale_files_expired_cookies_and_other_hosts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.assertEqual(2, self.main.save_browser_state(STATE, directory, now=1000.0))
+
+            loaded = self.main.load_browser_state(directory, now=1500.0, max_age_seconds=3600, hosts={"missav.ws"})
+            self.assertEqual(["missav.ws"], loaded["hosts"])
+            self.assertEqual(["cf_clearance"], [cookie["name"] for cookie in loaded["cookies"]])
+
+            expired = self.main.load_browser_state(directory, now=2500.0, max_age_seconds=3600)
+            self.assertEqual(["session"], [cookie["name"] for cookie in expired["cookies"]])
+
+            too_old = self.main.load_browser_state(directory, now=1000.0 + 7200, max_age_seconds=3600)
+            self.assertEqual([], too_old["hosts"])
+
+    def test_restore_adds_cookies_and_local_storage_scripts(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.main.save_browser_state(STATE, directory, now=1000.0)
+            context = FakeContext()
+            with mock.patch.object(self.main, "BROWSER_STATE_DIR", directory), \
+                 mock.patch.object(self.main.time, "time", lambda: 1100.0):
+                report = asyncio.run(self.main.restore_browser_state(context))
+
+        self.assertTrue(report["warm_start"])
+        self.assertEqual(2, report["hosts_restored"])
+        self.assertEqual({"cf_clearance", "session"}, {cookie["name"] for cookie in context.cookies})
+        self.assertEqual(1, len(context.scripts))
+        self.assertIn(json.dumps("https://missav.ws"), context.scripts[0])
+        self.assertIn('"theme": "dark"', context.scripts[0])
+
+    def test_first_page_block_rate(self):
+        report = {}
+        self.main.record_first_page(report, launch_started=0.0, blocked=True)
+        self.main.record_first_page(report, launch_started=0.0, blocked=False)
+
+        self.assertEqual(2, report["first_page_attempts"])
+        self.assertEqual(0.5, report["first_page_block_rate"])
+        self.assertIn("time_to_first_page_seconds", report)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+import asyncio
+import gzip
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+def make_video(external_id, release_date, tags=(), actors=()):
+    return {
+        "id": external_id,
+        "external_id": external_id,
+        "title": f"Video {external_id}",
+        "cover_url": f"https://fourhoi.com/{external_id}/cover-n.jpg",
+        "source_url": f"https://missav.ws/{external_id}",
+        "source_release_date": release_date,
+        "created_at": "2026-10-01T00:00:00+00:00",
+        "actors": list(actors),
+        "tags": list(tags),
+        "categories": [],
+    }
+
+
+VIDEOS = [
+    make_video("abc-1", "2026-10-01", tags=["weekly_hot"], actors=["Alice"]),
+    make_video("abc-2", "2026-10-03", tags=["weekly_hot", "uncensored"], actors=["Alice", "Bea"]),
+    make_video("abc-3", None, tags=["uncensored"], actors=["Alice"]),
+]
+
+
+def read_shard(path):
+    with gzip.open(path, "rt", encoding="utf-8") as fp:
+        return json.load(fp)
+
+
+class CatalogExportTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_shards_are_sorted_and_paginated(self):
+        shards, index = self.main.build_catalog_shards(VIDEOS, page_size=2, section_limit=1, weekly_limit=5, actor_limit=10)
+
+        home = shards["home.json.gz"]["sections"]
+        self.assertEqual(["abc-2"], [item["external_id"] for item in home["new"]])
+        self.assertEqual(["abc-2", "abc-1"], [item["external_id"] for item in home["weekly_hot"]])
+        self.assertEqual([], home["vr"])
+
+        alice = index["actors"]["Alice"]
+        self.assertEqual(3, alice["count"])
+        self.assertEqual(2, alice["pages"])
+        first = shards[f"actors/{alice['key']}/page-1.json.gz"]
+        second = shards[f"actors/{alice['key']}/page-2.json.gz"]
+        self.assertEqual(["abc-2", "abc-1"], [item["external_id"] for item in first["items"]])
+        self.assertEqual(["abc-3"], [item["external_id"] for item in second["items"]])
+        self.assertEqual({"key": "uncensored", "count": 2, "pages": 1}, index["categories"]["uncensored"])
+
+    def test_home_sections_drop_linked_duplicates(self):
+        repost = {**make_video("51cg_9", "2026-10-05", tags=["weekly_hot"], actors=["Alice"]), "duplicate_of": "abc-2"}
+        shards, index = self.main.build_catalog_shards(VIDEOS + [repost], page_size=10, section_limit=5, weekly_limit=5, actor_limit=10)
+
+        home = shards["home.json.gz"]["sections"]
+        self.assertEqual(["abc-2", "abc-1", "abc-3"], [item["external_id"] for item in home["new"]])
+        self.assertEqual(["abc-2", "abc-1"], [item["external_id"] for item in home["weekly_hot"]])
+        self.assertEqual(4, index["actors"]["Alice"]["count"])
+
+    def test_catalog_select_pages_by_id_and_shards_ignore_row_order(self):
+        rows = [make_video(f"abc-{index:04d}", "2026-10-01") for index in range(2500)]
+
+        class FakeVideos:
+            def __init__(self):
+                self.after = None
+
+            def table(self, name):
+                self.after = None
+                return self
+
+            def select(self, columns):
+                return self
+
+            def eq(self, column, value):
+                return self
+
+            def gt(self, column, value):
+                self.after = value
+                return self
+
+            def order(self, column):
+                return self
+
+            def limit(self, count):
+                self.count = count
+                return self
+
+            def execute(self):
+                page = [row for row in rows if self.after is None or row["id"] > self.after][: self.count]
+                return types.SimpleNamespace(data=page)
+
+        videos = asyncio.run(self.main.select_catalog_videos(FakeVideos()))
+        self.assertEqual([row["external_id"] for row in rows], [row["external_id"] for row in videos])
+
+        shards, _ = self.main.build_catalog_shards(videos, page_size=100)
+        reversed_shards, _ = self.main.build_catalog_shards(list(reversed(videos)), page_size=100)
+        self.assertEqual(shards, reversed_shards)
+
+    def test_only_changed_shards_are_rewritten(self):
+        with tempfile.TemporaryDirectory() as output_dir:
+            shards, index = self.main.build_catalog_shards(VIDEOS, page_size=2)
+            first = self.main.write_catalog_shards(output_dir, shards, index)
+            self.assertEqual(len(shards), first["shards_written"])
+
+            again = self.main.write_catalog_shards(output_dir, shards, index)
+            self.assertEqual(0, again["shards_written"])
+            self.assertEqual(len(shards), again["shards_unchanged"])
+
+            shards, index = self.main.build_catalog_shards(VIDEOS[:2] + [make_video("abc-3", None, tags=["vr"])], page_size=2)
+            changed = self.main.write_catalog_shards(output_dir, shards, index)
+            self.assertGreater(changed["shards_written"], 0)
+            self.assertEqual(1, changed["shards_removed"])
+            self.assertFalse(os.path.exists(os.path.join(output_dir, "actors", index["actors"]["Alice"]["key"], "page-2.json.gz")))
+
+            with open(os.path.join(output_dir, "manifest.json"), encoding="utf-8") as fp:
+                manifest = json.load(fp)
+            self.assertEqual(set(shards), set(manifest["shards"]))
+            self.assertIn("vr", manifest["categories"])
+            home = read_shard(os.path.join(output_dir, "home.json.gz"))
+            self.assertEqual(["abc-3"], [item["external_id"] for item in home["sections"]["vr"]])
+
+
+if __name__ == "__main__":
+    unittest.main()
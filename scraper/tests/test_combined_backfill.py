@@ -0,0 +1,105 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class CombinedBackfillTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_detail_patch_fills_cover_and_metadata_in_one_pass(self):
+        existing = {
+            "external_id": "abc-1",
+            "source_url": "https://missav.ws/abc-1",
+            "cover_url": None,
+            "actors": [],
+            "tags": [],
+            "release_date": None,
+        }
+        details = {
+            "cover_url": "https://fourhoi.com/abc-1/cover-n.jpg",
+            "actors": ["Actor One"],
+            "tags": ["tag-1"],
+            "release_date": "2026-03-15",
+        }
+
+        patched = self.main.apply_detail_patch(existing, details)
+
+        self.assertEqual("https://fourhoi.com/abc-1/cover-n.jpg", patched["cover_url"])
+        self.assertEqual(["Actor One"], patched["actors"])
+        self.assertEqual("2026-03-15", patched["release_date"])
+        self.assertEqual("valid", patched["cover_status"])
+        self.assertEqual("success", patched["detail_status"])
+
+    def test_merge_backfill_targets_dedupes_by_external_id(self):
+        covers = [{"external_id": "abc-1", "source_url": "u1"}, {"external_id": "abc-2", "source_url": "u2"}]
+        metadata = [{"external_id": "abc-2", "source_url": "u2"}, {"external_id": "abc-3", "source_url": "u3"}]
+
+        merged = self.main.merge_backfill_targets(covers, metadata)
+
+        self.assertEqual(["abc-1", "abc-2", "abc-3"], [item["external_id"] for item in merged])
+
+    def test_combined_queue_visits_each_row_once(self):
+        targets = [
+            {"external_id": "abc-1", "source_url": "https://missav.ws/abc-1"},
+            {"external_id": "abc-2", "source_url": "https://missav.ws/abc-2"},
+            {"external_id": "abc-3", "source_url": "https://missav.ws/abc-3"},
+        ]
+        existing = {
+            "abc-1": {"external_id": "abc-1", "cover_url": None, "actors": [], "tags": [], "release_date": None},
+            "abc-2": {"external_id": "abc-2", "cover_url": "https://fourhoi.com/abc-2/cover-n.jpg", "actors": [], "tags": [], "release_date": None},
+            "abc-3": {"external_id": "abc-3", "cover_url": "https://fourhoi.com/abc-3/cover-n.jpg", "actors": ["A"], "tags": [], "release_date": None},
+        }
+        visited = []
+        upserted = []
+
+        async def fake_lookup(supabase, external_ids, label):
+            return {external_id: existing[external_id] for external_id in external_ids}
+
+        async def fake_details(page, url):
+            visited.append(url)
+            external_id = url.rsplit("/", 1)[-1]
+            return {
+                "cover_url": f"https://fourhoi.com/{external_id}/cover-n.jpg",
+                "tags": ["tag-1"],
+                "release_date": "2026-03-15",
+            }
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "fetch_existing_records", fake_lookup), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(
+                self.main.process_combined_backfill_queue(targets, [object()], object(), asyncio.Semaphore(1))
+            )
+
+        self.assertEqual(["https://missav.ws/abc-1", "https://missav.ws/abc-2"], visited)
+        self.assertEqual(1, stats["existing_complete_count"])
+        self.assertEqual(2, stats["detail_attempted_count"])
+        self.assertEqual(1, stats["detail_navigations_saved"])
+        self.assertEqual(1, stats["cover_patched_count"])
+        self.assertEqual(2, stats["metadata_patched_count"])
+        self.assertEqual(["abc-1", "abc-2"], sorted(row["external_id"] for row in upserted))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,192 @@
+import asyncio
+import importlib
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+class FakeStream:
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self.response
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class FakeHttpClient:
+    def __init__(self, heads, gets=None):
+        self.heads = heads
+        self.gets = gets or {}
+        self.calls = []
+
+    async def head(self, url):
+        self.calls.append(("HEAD", url, None))
+        return self.heads[url]
+
+    def stream(self, method, url, headers=None):
+        self.calls.append((method, url, headers))
+        return FakeStream(self.gets[url])
+
+
+IMAGE = {"content-type": "image/jpeg", "content-length": "5120", "etag": '"v1"', "last-modified": "Mon, 01 Sep 2026 00:00:00 GMT"}
+
+
+class CoverHealthTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_classify_cover_response(self):
+        self.assertEqual("alive", self.main.classify_cover_response(200, "image/jpeg", 5120))
+        self.assertEqual("alive", self.main.classify_cover_response(304))
+        self.assertEqual("dead", self.main.classify_cover_response(404))
+        self.assertEqual("dead", self.main.classify_cover_response(403))
+        self.assertEqual("dead", self.main.classify_cover_response(200, "text/html", 800))
+        self.assertEqual("dead", self.main.classify_cover_response(200, "image/jpeg", 0))
+        self.assertEqual("error", self.main.classify_cover_response(503))
+        self.assertEqual("error", self.main.classify_cover_response(None))
+
+    def test_recheck_uses_cached_validators_and_costs_one_304(self):
+        url = "https://fourhoi.com/abc-1/cover-n.jpg"
+        video = {"id": "v1", "cover_url": url}
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "covers.json")
+            politeness = self.main.HostPoliteness(max_concurrency=4, min_interval=0)
+
+            cache = self.main.CoverCheckCache(cache_path)
+            first_client = FakeHttpClient({url: FakeResponse(200, IMAGE)})
+            first = asyncio.run(self.main.check_cover(first_client, politeness, cache, video))
+            cache.save()
+            self.assertEqual({"id": "v1", "outcome": "alive", "http_status": 200, "content_length": 5120}, first)
+
+            cache = self.main.CoverCheckCache(cache_path)
+            second_client = FakeHttpClient({}, gets={url: FakeResponse(304)})
+            second = asyncio.run(self.main.check_cover(second_client, politeness, cache, video))
+
+        self.assertEqual([("GET", url, {"If-None-Match": '"v1"', "If-Modified-Since": IMAGE["last-modified"]})], second_client.calls)
+        self.assertEqual("alive", second["outcome"])
+        self.assertEqual(5120, second["content_length"])
+
+    def test_mass_demotion_guard_downgrades_dead_pages(self):
+        results = [{"id": str(i), "outcome": "dead", "http_status": 403, "content_length": None} for i in range(15)]
+        results += [{"id": str(i), "outcome": "alive", "http_status": 200, "content_length": 1} for i in range(15, 20)]
+        self.assertTrue(self.main.guard_mass_demotion(results, max_dead_ratio=0.5))
+        self.assertFalse(any(result["outcome"] == "dead" for result in results))
+
+        few = [{"id": "1", "outcome": "dead", "http_status": 404, "content_length": None}]
+        self.assertFalse(self.main.guard_mass_demotion(few, max_dead_ratio=0.5))
+        self.assertEqual("dead", few[0]["outcome"])
+
+    def test_check_cover_health_pages_through_catalog_and_records_results(self):
+        pages = [
+            [{"id": "a", "cover_url": "https://fourhoi.com/a/cover-n.jpg"}, {"id": "b", "cover_url": "https://fourhoi.com/b/cover-n.jpg"}],
+            [{"id": "c", "cover_url": "https://fourhoi.com/c/cover-n.jpg"}],
+            [],
+        ]
+        client = FakeHttpClient({
+            "https://fourhoi.com/a/cover-n.jpg": FakeResponse(200, IMAGE),
+            "https://fourhoi.com/b/cover-n.jpg": FakeResponse(404),
+            "https://fourhoi.com/c/cover-n.jpg": FakeResponse(503),
+        })
+        cursors = []
+        recorded = []
+
+        async def fake_select(supabase, after_id, checked_before, limit):
+            cursors.append(after_id)
+            return pages.pop(0)
+
+        async def fake_record(supabase, results):
+            recorded.extend(results)
+            return len(results)
+
+        class FakeClientContext:
+            async def __aenter__(self):
+                return client
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return False
+
+        with mock.patch.object(self.main, "select_cover_check_targets", fake_select), \
+             mock.patch.object(self.main, "record_cover_checks", fake_record), \
+             mock.patch.object(self.main, "create_http_client", lambda max_connections: FakeClientContext()), \
+             mock.patch.object(self.main, "COVER_CHECK_CACHE_PATH", ""), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)):
+            stats, breakdown = asyncio.run(self.main.check_cover_health(object()))
+
+        self.assertEqual([None, "b", "c"], cursors)
+        self.assertEqual({"a": "alive", "b": "dead", "c": "error"}, {result["id"]: result["outcome"] for result in recorded})
+        self.assertEqual(3, stats["upserted_count"])
+        self.assertEqual(1, breakdown["cover_check"]["dead_count"])
+
+    def test_cache_is_saved_every_few_pages_and_when_the_sweep_fails(self):
+        pages = [[{"id": letter, "cover_url": f"https://fourhoi.com/{letter}/cover-n.jpg"}] for letter in "abc"]
+        client = FakeHttpClient({
+            f"https://fourhoi.com/{letter}/cover-n.jpg": FakeResponse(200, {**IMAGE, "etag": f'"{letter}"'})
+            for letter in "abc"
+        })
+        saved = []
+
+        async def fake_select(supabase, after_id, checked_before, limit):
+            return pages.pop(0)
+
+        async def fake_record(supabase, results):
+            if results[0]["id"] == "c":
+                raise RuntimeError("supabase down")
+            return len(results)
+
+        class FakeClientContext:
+            async def __aenter__(self):
+                return client
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return False
+
+        original_save = self.main.CoverCheckCache.save
+
+        def tracking_save(cache):
+            saved.append(sorted(cache.entries))
+            original_save(cache)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_path = os.path.join(tmp, "covers.json")
+            with mock.patch.object(self.main, "select_cover_check_targets", fake_select), \
+                 mock.patch.object(self.main, "record_cover_checks", fake_record), \
+                 mock.patch.object(self.main, "create_http_client", lambda max_connections: FakeClientContext()), \
+                 mock.patch.object(self.main, "COVER_CHECK_CACHE_PATH", cache_path), \
+                 mock.patch.object(self.main, "COVER_CHECK_CACHE_SAVE_PAGES", 2), \
+                 mock.patch.object(self.main.CoverCheckCache, "save", tracking_save), \
+                 mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)):
+                with self.assertRaises(RuntimeError):
+                    asyncio.run(self.main.check_cover_health(object()))
+
+            urls = [f"https://fourhoi.com/{letter}/cover-n.jpg" for letter in "abc"]
+            self.assertEqual([urls[:2], urls], saved)
+            self.assertTrue(os.path.exists(cache_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import asyncio
+import importlib
+import importlib.util
+import pathlib
+import sys
+import types
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+def load_script(name):
+    path = pathlib.Path(__file__).resolve().parents[2] / 'scripts' / f'{name}.py'
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def list_video(external_id):
+    return {
+        "external_id": external_id,
+        "title": f"{external_id.upper()} title",
+        "source_url": f"https://missav.ws/{external_id}",
+        "cover_url": "",
+    }
+
+
+def partial_row(external_id, **fields):
+    return {**list_video(external_id), "source_site": "missav", "actors": [], "tags": [], "categories": [], **fields}
+
+
+EMPTY = {"_status": "success", "duration": None, "release_date": None, "actors": [], "tags": []}
+FULL = {"_status": "success", "cover_url": "https://fourhoi.com/abc-003/cover-n.jpg", "duration": "02:00:00", "release_date": "2026-10-01", "actors": ["A"], "tags": ["Tag"]}
+
+
+class DetailBackoffTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_retry_schedule_doubles_up_to_the_cap(self):
+        now = datetime(2026, 10, 19, tzinfo=timezone.utc)
+        with mock.patch.object(self.main, "DETAIL_BACKOFF_BASE_HOURS", 6), \
+             mock.patch.object(self.main, "DETAIL_BACKOFF_MAX_HOURS", 48):
+            delays = [
+                datetime.fromisoformat(self.main.detail_retry_at(attempts, now)) - now
+                for attempts in (1, 2, 3, 4, 5)
+            ]
+        self.assertEqual([6, 12, 24, 48, 48], [delay / timedelta(hours=1) for delay in delays])
+
+    def test_smart_policy_defers_rows_in_backoff(self):
+        future = (datetime.now(timezone.utc) + timedelta(hours=3)).isoformat()
+        past = (datetime.now(timezone.utc) - timedelta(hours=3)).isoformat()
+        waiting = partial_row("abc-001", next_detail_attempt_at=future)
+
+        self.assertEqual("backoff", self.main.detail_skip_reason(waiting))
+        self.assertFalse(self.main.should_fetch_details(waiting))
+        self.assertTrue(self.main.should_fetch_details(waiting, "force"))
+        self.assertTrue(self.main.should_fetch_details(partial_row("abc-001", next_detail_attempt_at=past)))
+        complete = {**waiting, "cover_url": "https://fourhoi.com/abc-001/cover-n.jpg", "release_date": "2026-10-01"}
+        self.assertEqual("complete", self.main.detail_skip_reason(complete))
+
+    def test_attempt_history_grows_on_failure_and_clears_on_success(self):
+        record = self.main.VideoRecord.from_mapping(partial_row("abc-001"))
+        record.note_detail_attempt("empty").note_detail_attempt("blocked")
+        self.assertEqual(2, record.detail_attempts)
+        self.assertEqual("blocked", record.detail_last_outcome)
+        self.assertIsNotNone(record.next_detail_attempt_at)
+
+        merged = self.main.merge_video_record(list_video("abc-001"), record.to_payload())
+        self.assertEqual(2, merged.detail_attempts)
+        self.assertEqual(record.next_detail_attempt_at, merged.next_detail_attempt_at)
+
+        merged.cover_url = "https://fourhoi.com/abc-001/cover-n.jpg"
+        merged.release_date = "2026-10-01"
+        merged.classify()
+        merged.note_detail_attempt("success")
+        self.assertEqual((0, "success", None), (merged.detail_attempts, merged.detail_last_outcome, merged.next_detail_attempt_at))
+
+    def run_batch(self, videos, existing, responses):
+        fetched = []
+        upserted = []
+
+        async def fake_existing(supabase, external_ids, label):
+            return {external_id: existing[external_id] for external_id in external_ids if external_id in existing}
+
+        async def fake_details(page, url):
+            fetched.append(url)
+            return dict(responses.pop(0))
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "HOST_BREAKER", self.main.HostCircuitBreaker()), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_existing), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(self.main.process_page_batch(videos, "new", [object()], object(), asyncio.Semaphore(1)))
+        return stats, fetched, {row["external_id"]: row for row in upserted}
+
+    def test_page_batch_spends_detail_slots_on_rows_out_of_backoff(self):
+        future = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+        existing = {
+            "abc-001": partial_row("abc-001", detail_attempts=3, detail_last_outcome="empty", next_detail_attempt_at=future),
+            "abc-002": partial_row("abc-002", detail_attempts=1, detail_last_outcome="empty"),
+        }
+        stats, fetched, rows = self.run_batch(
+            [list_video("abc-001"), list_video("abc-002"), list_video("abc-003")], existing, [EMPTY, FULL]
+        )
+
+        self.assertEqual(["https://missav.ws/abc-002", "https://missav.ws/abc-003"], fetched)
+        self.assertEqual(1, stats["detail_backoff_count"])
+        self.assertEqual(3, rows["abc-001"]["detail_attempts"])
+        self.assertEqual(future, rows["abc-001"]["next_detail_attempt_at"])
+        self.assertEqual(2, rows["abc-002"]["detail_attempts"])
+        self.assertEqual("empty", rows["abc-002"]["detail_last_outcome"])
+        self.assertEqual(0, rows["abc-003"]["detail_attempts"])
+        self.assertEqual("success", rows["abc-003"]["detail_last_outcome"])
+
+    def test_metadata_queue_records_failures_and_skips_backoff(self):
+        future = (datetime.now(timezone.utc) + timedelta(days=2)).isoformat()
+        existing = {
+            "abc-001": partial_row("abc-001", next_detail_attempt_at=future),
+            "abc-002": partial_row("abc-002"),
+        }
+        targets = [{"external_id": key, "source_url": f"https://missav.ws/{key}"} for key in existing]
+        upserted = []
+        outcomes = {}
+
+        async def fake_existing(supabase, external_ids, label):
+            return existing
+
+        async def fake_details(page, url):
+            return dict(EMPTY)
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "HOST_BREAKER", self.main.HostCircuitBreaker()), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_existing), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(self.main.process_metadata_queue(targets, [object()], object(), asyncio.Semaphore(1), outcomes))
+
+        self.assertEqual(1, stats["detail_backoff_count"])
+        self.assertEqual(1, stats["detail_attempted_count"])
+        self.assertEqual({"abc-001": "done", "abc-002": "retry"}, outcomes)
+        self.assertEqual(["abc-002"], [row["external_id"] for row in upserted])
+        self.assertEqual(1, upserted[0]["detail_attempts"])
+
+    def test_selectors_skip_rows_in_backoff(self):
+        for name in ('select_metadata_queue', 'select_null_cover_queue'):
+            self.assertIn('next_detail_attempt_at <= now()', load_script(name).build_query(50))
+        self.assertIn('v.next_detail_attempt_at <= now()', load_script('plan_backfill').build_plan_query())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+SEEDS = [{"url": "https://missav.ws/new", "tag": "new"}]
+ROWS = [
+    {"url": "https://missav.ws/genres/a", "tag": "genre_a", "last_seen_at": "2026-10-19T00:00:00+00:00", "last_yield": 2},
+    {"url": "https://missav.ws/genres/b", "tag": "genre_b", "last_seen_at": "2026-10-18T12:00:00+00:00", "last_yield": 9},
+    {"url": "https://missav.ws/genres/c", "tag": "genre_c", "last_seen_at": "2026-10-18T12:00:00+00:00", "last_yield": None},
+]
+
+
+class DiscoveryCacheTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+        cls.now = cls.main.parse_timestamp("2026-10-19T06:00:00Z")
+
+    def test_fresh_cache_is_ranked_by_last_yield(self):
+        cached = self.main.select_cached_discovery(ROWS, self.now, ttl_seconds=24 * 3600, limit=2)
+        self.assertEqual(["genre_b", "genre_a"], [source["tag"] for source in cached])
+
+    def test_stale_empty_or_disabled_cache_forces_a_crawl(self):
+        self.assertIsNone(self.main.select_cached_discovery(ROWS, self.now, ttl_seconds=3600, limit=10))
+        self.assertIsNone(self.main.select_cached_discovery([], self.now, ttl_seconds=24 * 3600, limit=10))
+        self.assertIsNone(self.main.select_cached_discovery(ROWS, self.now, ttl_seconds=0, limit=10))
+
+    def test_cache_hit_skips_hub_crawl(self):
+        async def fake_load(supabase):
+            return ROWS
+
+        async def fake_discover(*args, **kwargs):
+            raise AssertionError("hubs should not be crawled on a cache hit")
+
+        with mock.patch.object(self.main, "load_discovered_sources", fake_load), \
+             mock.patch.object(self.main, "discover_missav_sources", fake_discover), \
+             mock.patch.object(self.main.time, "time", return_value=self.now):
+            sources = asyncio.run(self.main.resolve_discovered_sources(None, object(), SEEDS, set(), 10))
+
+        self.assertEqual(["new", "genre_b", "genre_a", "genre_c"], [source["tag"] for source in sources])
+
+    def test_cache_miss_crawls_and_saves_only_new_sources(self):
+        saved = []
+
+        async def fake_load(supabase):
+            return []
+
+        async def fake_discover(page, seed_sources, selected_tags, limit):
+            return seed_sources + [{"url": "https://missav.ws/genres/d", "tag": "genre_d"}]
+
+        async def fake_save(supabase, sources):
+            saved.extend(sources)
+
+        with mock.patch.object(self.main, "load_discovered_sources", fake_load), \
+             mock.patch.object(self.main, "discover_missav_sources", fake_discover), \
+             mock.patch.object(self.main, "save_discovered_sources", fake_save):
+            sources = asyncio.run(self.main.resolve_discovered_sources(None, object(), SEEDS, set(), 10))
+
+        self.assertEqual(["new", "genre_d"], [source["tag"] for source in sources])
+        self.assertEqual(["genre_d"], [source["tag"] for source in saved])
+
+
+if __name__ == "__main__":
+    unittest.main()
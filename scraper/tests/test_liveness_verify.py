@@ -0,0 +1,134 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeQuery:
+    def __init__(self, supabase):
+        self.supabase = supabase
+        self.bounds = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def order(self, column, desc=False, nullsfirst=False):
+        self.supabase.order_calls.append((column, desc, nullsfirst))
+        return self
+
+    def range(self, start, end):
+        self.bounds = (start, end)
+        return self
+
+    def execute(self):
+        start, end = self.bounds
+        return types.SimpleNamespace(data=self.supabase.rows[start:end + 1])
+
+
+class FakeRpc:
+    def __init__(self, supabase, params):
+        self.supabase = supabase
+        self.params = params
+
+    def execute(self):
+        self.supabase.rpc_calls.append(self.params)
+        return types.SimpleNamespace(data=sum(len(ids) for ids in self.params.values()))
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.order_calls = []
+        self.rpc_calls = []
+
+    def table(self, name):
+        return FakeQuery(self)
+
+    def rpc(self, name, params):
+        return FakeRpc(self, params)
+
+
+class FakeHttpClient:
+    def __init__(self, statuses):
+        self.statuses = statuses
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def head(self, url):
+        status = self.statuses[url]
+        if isinstance(status, Exception):
+            raise status
+        return types.SimpleNamespace(status_code=status)
+
+
+class LivenessVerifyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_classify_liveness_status(self):
+        self.assertEqual("alive", self.main.classify_liveness_status(200))
+        self.assertEqual("alive", self.main.classify_liveness_status(301))
+        self.assertEqual("dead", self.main.classify_liveness_status(404))
+        self.assertEqual("dead", self.main.classify_liveness_status(410))
+        self.assertEqual("error", self.main.classify_liveness_status(403))
+        self.assertEqual("error", self.main.classify_liveness_status(None))
+
+    def test_verify_rotates_by_last_verified_and_writes_in_bulk(self):
+        rows = [
+            {"id": "a", "external_id": "a-1", "source_url": "https://missav.ws/a-1"},
+            {"id": "b", "external_id": "b-1", "source_url": "https://missav.ws/b-1"},
+            {"id": "c", "external_id": "c-1", "source_url": "https://missav.ws/c-1"},
+            {"id": "d", "external_id": "d-1", "source_url": "https://missav.ws/d-1"},
+        ]
+        statuses = {
+            "https://missav.ws/a-1": 200,
+            "https://missav.ws/b-1": 404,
+            "https://missav.ws/c-1": 200,
+            "https://missav.ws/d-1": TimeoutError("timed out"),
+        }
+        supabase = FakeSupabase(rows)
+
+        with mock.patch.object(self.main, "VERIFY_BATCH_SIZE", 10), \
+             mock.patch.object(self.main, "HOST_MIN_INTERVAL_SECONDS", 0.0), \
+             mock.patch.object(self.main, "create_http_client", lambda max_connections: FakeHttpClient(statuses)):
+            stats, breakdown = asyncio.run(self.main.verify_video_liveness(supabase))
+
+        self.assertEqual([("last_verified_at", False, True)], supabase.order_calls)
+        verify = breakdown["verify"]
+        self.assertEqual(2, verify["alive_count"])
+        self.assertEqual(1, verify["dead_count"])
+        self.assertEqual(1, verify["error_count"])
+        self.assertGreater(verify["checks_per_second"], 0)
+        self.assertEqual(4, stats["upserted_count"])
+
+        self.assertEqual(3, len(supabase.rpc_calls))
+        alive_call = next(call for call in supabase.rpc_calls if call["alive_ids"])
+        self.assertEqual(["a", "c"], alive_call["alive_ids"])
+        dead_call = next(call for call in supabase.rpc_calls if call["dead_ids"])
+        self.assertEqual(["b"], dead_call["dead_ids"])
+
+
+if __name__ == "__main__":
+    unittest.main()
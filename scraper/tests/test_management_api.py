@@ -0,0 +1,143 @@
+import gzip
+import importlib.util
+import json
+import pathlib
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+SCRIPTS_DIR = pathlib.Path(__file__).resolve().parents[2] / 'scripts'
+
+
+def load_script(name):
+    spec = importlib.util.spec_from_file_location(name, SCRIPTS_DIR / f'{name}.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# Local stand-in for the Management API that replays scripted (status, headers, body) responses.
+class StandInServer:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.requests = []
+        self.connections = set()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                stand_in.requests.append({
+                    'path': self.path,
+                    'headers': dict(self.headers),
+                    'payload': json.loads(self.rfile.read(length) or b'{}'),
+                })
+                stand_in.connections.add(self.client_address)
+                status, headers, body = stand_in.responses.pop(0)
+                self.send_response(status)
+                for key, value in headers.items():
+                    self.send_header(key, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self):
+        host, port = self.server.server_address
+        return f'http://{host}:{port}'
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+        return False
+
+
+def json_body(rows):
+    return json.dumps(rows).encode()
+
+
+class ManagementApiTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.api = load_script('management_api')
+
+    def make_client(self, server, **kwargs):
+        self.sleeps = []
+        return self.api.ManagementApiClient('proj', 'token', base_url=server.url, sleep=self.sleeps.append, **kwargs)
+
+    def test_retries_server_errors_and_honours_retry_after(self):
+        responses = [
+            (503, {'Retry-After': '2'}, b'busy'),
+            (200, {}, json_body([{'tag': 'new'}])),
+        ]
+        with StandInServer(responses) as server, self.make_client(server) as client:
+            rows = client.query('select 1')
+
+        self.assertEqual([{'tag': 'new'}], rows)
+        self.assertEqual([2.0], self.sleeps)
+        self.assertEqual('/v1/projects/proj/database/query', server.requests[0]['path'])
+        self.assertEqual({'query': 'select 1', 'read_only': True}, server.requests[1]['payload'])
+
+    def test_writes_are_not_retried_after_server_errors(self):
+        with StandInServer([(502, {}, b'bad gateway')]) as server, self.make_client(server) as client:
+            with self.assertRaises(self.api.ManagementApiError) as raised:
+                client.query('insert into t values (1)', read_only=False)
+
+        self.assertEqual(502, raised.exception.status)
+        self.assertEqual(1, len(server.requests))
+        self.assertEqual({'query': 'insert into t values (1)'}, server.requests[0]['payload'])
+
+    def test_client_errors_raise_with_body(self):
+        with StandInServer([(400, {}, b'{"message": "syntax error"}')]) as server, self.make_client(server) as client:
+            with self.assertRaises(self.api.ManagementApiError) as raised:
+                client.query('selec 1')
+
+        self.assertEqual(400, raised.exception.status)
+        self.assertIn('syntax error', raised.exception.body)
+        self.assertEqual([], self.sleeps)
+
+    def test_gzip_responses_are_decoded_and_connection_is_reused(self):
+        rows = [{'external_id': f'abc-{index}', 'title': 'タイトル'} for index in range(500)]
+        responses = [
+            (200, {'Content-Encoding': 'gzip'}, gzip.compress(json_body(rows))),
+            (200, {}, json_body([])),
+        ]
+        with StandInServer(responses) as server, self.make_client(server) as client:
+            first = client.query('select * from videos')
+            second = client.query('select 1')
+
+        self.assertEqual(rows, first)
+        self.assertEqual([], second)
+        self.assertEqual('gzip', server.requests[0]['headers']['Accept-Encoding'])
+        self.assertEqual(1, len(server.connections))
+
+    def test_iter_json_array_handles_split_chunks(self):
+        text = json.dumps([{'a': 1}, 'x', 2, [3, 4], None, {'b': 'é'}])
+        chunks = [text[index:index + 3] for index in range(0, len(text), 3)]
+        self.assertEqual([{'a': 1}, 'x', 2, [3, 4], None, {'b': 'é'}], list(self.api.iter_json_array(chunks)))
+        self.assertEqual([{'ok': True}], list(self.api.iter_json_array(['{"ok"', ': true}'])))
+        with self.assertRaises(ValueError):
+            list(self.api.iter_json_array(['[{"a": 1}, {"b"']))
+
+    def test_selector_scripts_share_the_client(self):
+        for name in ('select_backfill_targets', 'select_null_cover_queue', 'select_metadata_queue'):
+            module = load_script(name)
+            self.assertEqual('management_api', module.run_sql.__module__)
+            self.assertEqual('management_api', module.ManagementApiError.__module__)
+
+
+if __name__ == '__main__':
+    unittest.main()
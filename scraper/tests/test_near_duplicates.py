@@ -0,0 +1,185 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+TITLE = "SSIS-001 新人NO.1STYLE 彼女の姉に誘惑されて 中出し性交を繰り返した三日間"
+
+
+class FakeFingerprintTable:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+        self.upserts = []
+
+    def table(self, name):
+        self.name = name
+        return self
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.queries.append((column, list(values)))
+        self.filter = (column, set(values))
+        return self
+
+    def upsert(self, rows, on_conflict=None):
+        self.upserts.extend(rows)
+        self.filter = None
+        return self
+
+    def execute(self):
+        if not self.filter:
+            return types.SimpleNamespace(data=[])
+        column, values = self.filter
+        return types.SimpleNamespace(data=[row for row in self.rows if row.get(column) in values])
+
+
+class NearDuplicateTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def fingerprint(self, external_id, title, cover_url=""):
+        return self.main.video_fingerprint({"external_id": external_id, "title": title, "cover_url": cover_url, "source_url": "https://missav.ws/x"})
+
+    def test_simhash_ignores_decoration_and_is_stable(self):
+        base = self.main.title_simhash(TITLE)
+        self.assertEqual(base, self.main.title_simhash(f"【高清】{TITLE} !"))
+        self.assertEqual(base, self.main.title_simhash(TITLE.lower().replace(" ", "  ")))
+        self.assertGreater((base ^ self.main.title_simhash("FC2-PPV-1234567 素人 全く別のタイトル 初撮り")).bit_count(), 3)
+        self.assertIsNone(self.main.title_simhash("短い"))
+
+    def test_cover_fingerprint_drops_host_query_and_thumbnail_size(self):
+        fingerprint = self.main.cover_fingerprint("https://a.example/uploads/2026/10/pic-300x200.jpg?ver=2")
+        self.assertEqual(fingerprint, self.main.cover_fingerprint("https://b.example/uploads/2026/10/pic.jpg"))
+        self.assertIsNone(self.main.cover_fingerprint(""))
+
+    def test_index_links_across_sources_but_not_within_a_group(self):
+        index = self.main.NearDuplicateIndex(max_distance=3)
+        index.add(self.fingerprint("ssis-001", TITLE))
+        self.assertIsNone(index.match(self.fingerprint("ssis-001-uncensored-leak", TITLE)))
+        self.assertEqual("ssis-001", index.match(self.fingerprint("51cg_5000", f"【高清】{TITLE}")))
+
+        repost = self.fingerprint("51cg_6000", "完全不同的标题内容在这里", "https://img.example/a/b.jpg")
+        index.add(repost)
+        self.assertIsNone(index.match(self.fingerprint("51cg_6000_2", "另一个完全不同的标题", "https://img.example/a/b.jpg")))
+        chained = self.fingerprint("51cg_7000", "第三个标题也完全不同", "https://img.example/a/b-150x150.jpg")
+        self.assertEqual("51cg_6000", index.match(chained))
+
+        repost["duplicate_of"] = "ssis-001"
+        self.assertEqual("ssis-001", index.match(chained))
+
+    def test_generic_cover_does_not_link_unrelated_titles(self):
+        index = self.main.NearDuplicateIndex(max_distance=3)
+        no_image = "https://missav.ws/img/no-image.png"
+        index.add(self.fingerprint("ssis-001", TITLE, no_image))
+
+        self.assertIsNone(index.match(self.fingerprint("fc2-ppv-1234567", "FC2-PPV-1234567 素人 全く別のタイトル 初撮り", no_image)))
+        self.assertEqual("ssis-001", index.match(self.fingerprint("51cg_5000", f"【高清】{TITLE}", no_image)))
+
+        index.add(self.fingerprint("fc2-ppv-1234567", "FC2-PPV-1234567 素人 全く別のタイトル 初撮り", no_image))
+        self.assertIsNone(index.match(self.fingerprint("51cg_6000", "短标题", no_image)))
+
+    def test_candidate_loading_only_queries_new_keys(self):
+        stored = self.fingerprint("ssis-001", TITLE)
+        table = FakeFingerprintTable([self.main.fingerprint_row(stored)])
+        index = self.main.NearDuplicateIndex()
+        incoming = [self.fingerprint("51cg_5000", f"【高清】{TITLE}")]
+
+        asyncio.run(self.main.load_fingerprint_candidates(table, index, incoming))
+        self.assertEqual({"ssis-001"}, set(index.entries))
+        self.assertEqual(stored["title_simhash"], index.entries["ssis-001"]["title_simhash"])
+        self.assertEqual(4, len(table.queries))
+
+        asyncio.run(self.main.load_fingerprint_candidates(table, index, incoming))
+        self.assertEqual(4, len(table.queries))
+
+    def test_duplicates_skip_detail_fetch_and_are_linked(self):
+        table = FakeFingerprintTable([self.main.fingerprint_row(self.fingerprint("ssis-001", TITLE))])
+        videos = [
+            {"external_id": "51cg_5000", "title": f"【高清】{TITLE}", "cover_url": "", "source_url": "https://51cg1.com/archives/5000/"},
+            {"external_id": "51cg_5001", "title": "这是一个完全不同的新帖子标题", "cover_url": "", "source_url": "https://51cg1.com/archives/5001/"},
+        ]
+        fetched = []
+        upserted = []
+
+        async def fake_existing(supabase, external_ids, label):
+            return {}
+
+        async def fake_details(page, url):
+            fetched.append(url)
+            return {"_status": "success", "title": None, "tags": [], "actors": [], "release_date": None, "videos": []}
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "NEAR_DUP_DETECTION", True), \
+             mock.patch.object(self.main, "NEAR_DUP_INDEX", self.main.NearDuplicateIndex()), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_existing), \
+             mock.patch.object(self.main, "get_51cg_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(self.main.process_51cg_batch(videos, [object()], table, asyncio.Semaphore(1)))
+
+        self.assertEqual(["https://51cg1.com/archives/5001/"], fetched)
+        self.assertEqual(1, stats["near_duplicate_count"])
+        self.assertEqual(0, stats["existing_complete_count"])
+        rows = {row["external_id"]: row for row in upserted}
+        self.assertEqual("ssis-001", rows["51cg_5000"]["duplicate_of"])
+        self.assertNotIn("duplicate_of", rows["51cg_5001"])
+        saved = {row["external_id"]: row for row in table.upserts}
+        self.assertEqual({"51cg_5000", "51cg_5001"}, set(saved))
+        self.assertEqual("ssis-001", saved["51cg_5000"]["duplicate_of"])
+
+
+    def test_api_ingested_posts_are_fingerprinted_and_linked(self):
+        table = FakeFingerprintTable([self.main.fingerprint_row(self.fingerprint("ssis-001", TITLE))])
+        content = '<div class="dplayer" data-config=\'{"video":{"url":"https://cdn.example/a.m3u8"}}\'></div>'
+        posts = [
+            {"id": "5000", "link": "https://51cg1.com/archives/5000/", "title": f"【高清】{TITLE}", "date": "2026-10-18T01:00:00",
+             "modified": "2026-10-18T02:00:00", "content": content, "tags": [], "categories": [], "cover_url": ""},
+            {"id": "5001", "link": "https://51cg1.com/archives/5001/", "title": "这是一个完全不同的新帖子标题", "date": "2026-10-18T01:00:00",
+             "modified": "2026-10-18T02:00:00", "content": content, "tags": [], "categories": [], "cover_url": ""},
+        ]
+        upserted = []
+
+        async def fake_existing(supabase, external_ids, label):
+            return {}
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "NEAR_DUP_DETECTION", True), \
+             mock.patch.object(self.main, "NEAR_DUP_INDEX", self.main.NearDuplicateIndex()), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_existing), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats, browser_videos = asyncio.run(self.main.process_51cg_posts(posts, table, "51cg"))
+
+        self.assertEqual([], browser_videos)
+        self.assertEqual(1, stats["near_duplicate_count"])
+        rows = {row["external_id"]: row for row in upserted}
+        self.assertEqual("ssis-001", rows["51cg_5000"]["duplicate_of"])
+        self.assertNotIn("duplicate_of", rows["51cg_5001"])
+        self.assertEqual({"51cg_5000", "51cg_5001"}, {row["external_id"] for row in table.upserts})
+
+if __name__ == "__main__":
+    unittest.main()
@@ -203,6 +203,70 @@ printf '%s' "$NULL_COVER_QUEUE_COUNT"'''],
         selected = self.queue.select_queue_rows(rows, limit=5)
         self.assertEqual(["ok"], [row["external_id"] for row in selected])
 
+    def test_build_cover_candidates_only_predicts_missav_ids(self):
+        self.assertEqual(
+            [
+                "https://fourhoi.com/abc-123-uncensored-leak/cover-n.jpg",
+                "https://fourhoi.com/abc-123/cover-n.jpg",
+            ],
+            self.main.build_cover_candidates("ABC-123-uncensored-leak", "missav"),
+        )
+        self.assertEqual([], self.main.build_cover_candidates("post-1", "51cg"))
+
+    def test_null_cover_queue_sends_only_prediction_misses_to_detail_pages(self):
+        targets = [
+            {"external_id": "abc-1", "source_url": "https://missav.ws/abc-1", "source_site": "missav"},
+            {"external_id": "abc-2", "source_url": "https://missav.ws/abc-2", "source_site": "missav"},
+        ]
+        existing = {
+            external_id: {"external_id": external_id, "source_site": "missav", "cover_url": None, "actors": [], "tags": []}
+            for external_id in ("abc-1", "abc-2")
+        }
+        heads = []
+        visited = []
+        upserted = []
+
+        class FakeClient:
+            async def __aenter__(self):
+                return self
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return False
+
+            async def head(self, url):
+                heads.append(url)
+                status = 200 if "/abc-1/" in url else 404
+                return types.SimpleNamespace(status_code=status, headers={"content-type": "image/jpeg"})
+
+        async def fake_lookup(supabase, external_ids, label):
+            return {external_id: existing[external_id] for external_id in external_ids}
+
+        async def fake_details(page, url):
+            visited.append(url)
+            return {"cover_url": "https://fourhoi.com/abc-2/cover-t.jpg"}
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "fetch_existing_records", fake_lookup), \
+             mock.patch.object(self.main, "create_http_client", lambda max_connections: FakeClient()), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert), \
+             mock.patch.object(self.main, "PREDICTIVE_COVER_ENABLED", True):
+            stats = asyncio.run(
+                self.main.process_null_cover_queue(targets, [object()], object(), asyncio.Semaphore(1))
+            )
+
+        self.assertEqual(["https://missav.ws/abc-2"], visited)
+        self.assertEqual(1, stats["predicted_cover_hits"])
+        self.assertEqual(1, stats["predicted_cover_misses"])
+        self.assertEqual(1, stats["detail_attempted_count"])
+        self.assertEqual(
+            {"abc-1": "https://fourhoi.com/abc-1/cover-n.jpg", "abc-2": "https://fourhoi.com/abc-2/cover-n.jpg"},
+            {row["external_id"]: row["cover_url"] for row in upserted},
+        )
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,115 @@
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+def make_row(external_id, **fields):
+    return {
+        "external_id": external_id,
+        "title": f"Video {external_id}",
+        "source_url": f"https://missav.ws/{external_id}",
+        **fields,
+    }
+
+
+class OutputSinksTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_sqlite_sink_merges_like_supabase_rows(self):
+        path = os.path.join(self.tmp.name, "videos.sqlite")
+
+        async def run():
+            sink = self.main.SQLiteSink(path, buffer_rows=10)
+            await sink.write([make_row("abc-1", tags=["new"], cover_url="https://fourhoi.com/abc-1/cover-n.jpg")])
+            await sink.flush()
+            await sink.write([make_row("abc-1", tags=["weekly_hot"], duration="01:58:00", actors=["A"])])
+            await sink.close()
+            return sink.written
+
+        self.assertEqual(2, asyncio.run(run()))
+
+        sink = self.main.SQLiteSink(path)
+        record = sink.load(["abc-1"])["abc-1"]
+        sink.connection.close()
+        self.assertEqual("https://fourhoi.com/abc-1/cover-n.jpg", record["cover_url"])
+        self.assertEqual(["new", "weekly_hot"], record["tags"])
+        self.assertEqual("01:58:00", record["duration"])
+        self.assertEqual("valid", record["cover_status"])
+
+    def test_gzip_jsonl_sink_buffers_until_threshold(self):
+        path = os.path.join(self.tmp.name, "videos.jsonl.gz")
+
+        async def run():
+            sink = self.main.JsonlSink(path, buffer_rows=2)
+            await sink.write([make_row("abc-1")])
+            self.assertEqual(0, sink.written)
+            await sink.write([make_row("abc-2"), make_row("abc-3")])
+            self.assertEqual(3, sink.written)
+            await sink.write([make_row("abc-4")])
+            await sink.close()
+
+        asyncio.run(run())
+        self.assertEqual(
+            ["abc-1", "abc-2", "abc-3", "abc-4"],
+            [row["external_id"] for row in self.main.read_jsonl_records(path)],
+        )
+
+    def test_batch_upsert_routes_to_configured_sink(self):
+        path = os.path.join(self.tmp.name, "videos.jsonl")
+        sink = self.main.open_video_sink("jsonl", path)
+
+        async def run():
+            result = await self.main.batch_upsert_videos([make_row("abc-1")], object(), "TEST")
+            await sink.close()
+            return result
+
+        with mock.patch.object(self.main, "VIDEO_SINK", sink):
+            result = asyncio.run(run())
+
+        self.assertEqual(1, result["upserted_count"])
+        with open(path, encoding="utf-8") as fp:
+            row = json.loads(fp.readline())
+        self.assertTrue(row["is_active"])
+        self.assertEqual("missav", row["source_site"])
+
+    def test_open_video_sink_validates_configuration(self):
+        self.assertIsNone(self.main.open_video_sink("supabase", ""))
+        with self.assertRaises(ValueError):
+            self.main.open_video_sink("sqlite", "")
+        with self.assertRaises(ValueError):
+            self.main.open_video_sink("parquet", "out.parquet")
+
+    def test_sink_without_write_rows_fails_at_construction(self):
+        class IncompleteSink(self.main.BufferedSink):
+            pass
+
+        with self.assertRaises(TypeError):
+            IncompleteSink()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import importlib
+import os
+import sys
+import types
+import unittest
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+# PERF_SCALE=100k or 1m runs the larger stored baselines; PERF_TOLERANCE overrides the allowed slowdown.
+class PerfRegressionTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        load_main_module()
+        cls.bench = importlib.import_module("scraper.benchmarks.record_pipeline")
+
+    def test_stages_stay_within_baseline(self):
+        scale = os.environ.get("PERF_SCALE", "10k")
+        tolerance = float(os.environ.get("PERF_TOLERANCE", self.bench.DEFAULT_TOLERANCE))
+        baseline = self.bench.load_baseline()
+        self.assertEqual(set(self.bench.STAGES), set(baseline[scale]))
+
+        result = self.bench.run_benchmark(scale)
+
+        self.assertEqual([], self.bench.find_regressions(result, baseline, tolerance))
+
+    def test_slow_stage_is_reported(self):
+        result = {"scale": "10k", "stages": {"map_categories": {"units": 100.0}, "merge_video_record": {"units": 2.0}}}
+        baseline = {"10k": {"map_categories": 10.0, "merge_video_record": 2.0}}
+
+        regressions = self.bench.find_regressions(result, baseline, tolerance=2.5)
+
+        self.assertEqual(["map_categories"], [item["stage"] for item in regressions])
+        self.assertEqual(10.0, regressions[0]["ratio"])
+
+    def test_synthetic_rows_cover_placeholders_and_cjk(self):
+        data = self.bench.build_rows(500)
+        covers = [video["cover_url"] for video, _, _ in data]
+        self.assertTrue(any(self.bench.scraper.looks_like_placeholder_cover(cover) for cover in covers))
+        self.assertTrue(any(any("一" <= char <= "鿿" for char in video["title"]) for video, _, _ in data))
+        self.assertTrue(any(existing and len(existing["tags"]) >= 10 for _, existing, _ in data))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RetryCircuitBreakerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_breaker_opens_then_half_open_probe_closes_it(self):
+        clock = FakeClock()
+        breaker = self.main.HostCircuitBreaker(failure_threshold=2, cooldown_seconds=30, max_cooldown_seconds=100, clock=clock)
+        url = "https://missav.ws/abc-1"
+
+        breaker.record_failure(url)
+        self.assertTrue(breaker.allow(url))
+        breaker.record_failure(url)
+        self.assertFalse(breaker.allow(url))
+        self.assertEqual(30, breaker.cooldown_remaining(url))
+        self.assertTrue(breaker.allow("https://fourhoi.com/abc-1/cover-n.jpg"))
+
+        clock.now = 31
+        self.assertTrue(breaker.allow(url))
+        self.assertFalse(breaker.allow(url))
+        breaker.record_failure(url)
+        self.assertEqual(60, breaker.cooldown_remaining(url))
+
+        clock.now = 92
+        self.assertTrue(breaker.allow(url))
+        breaker.record_success(url)
+        self.assertTrue(breaker.allow(url))
+        self.assertTrue(breaker.allow(url))
+        self.assertIn("closed", breaker.report()["missav.ws"])
+
+    def test_stale_success_does_not_close_an_open_breaker(self):
+        breaker = self.main.HostCircuitBreaker(failure_threshold=1, cooldown_seconds=30, clock=FakeClock())
+        url = "https://missav.ws/abc-1"
+        breaker.record_failure(url)
+        breaker.record_success(url)
+        self.assertFalse(breaker.allow(url))
+
+    def test_retry_queue_backs_off_and_gives_up_after_max_attempts(self):
+        clock = FakeClock()
+        queue = self.main.DetailRetryQueue(max_attempts=2, base_seconds=10, max_seconds=15, clock=clock)
+        url = "https://missav.ws/abc-1"
+
+        self.assertTrue(queue.schedule(url, {"tag": "new"}))
+        self.assertEqual([], queue.pop_due())
+        self.assertEqual(10, queue.next_due_in())
+        clock.now = 10
+        self.assertEqual([(url, {"tag": "new"})], queue.pop_due())
+        self.assertEqual(0, len(queue))
+
+        self.assertTrue(queue.schedule(url, {"tag": "new"}))
+        self.assertEqual(15, queue.next_due_in())
+        self.assertFalse(queue.schedule(url, {"tag": "new"}))
+        self.assertEqual(0, len(queue))
+
+    def test_blocked_detail_is_queued_and_recovered_on_replay(self):
+        videos = [
+            {"external_id": "abc-1", "title": "Video number one", "cover_url": "", "source_url": "https://missav.ws/abc-1"},
+        ]
+        responses = [
+            {"_status": "blocked", "duration": None, "release_date": None, "actors": [], "tags": []},
+            {"_status": "success", "duration": "01:58:00", "release_date": "2026-01-01", "actors": ["A"], "tags": ["Tag"]},
+        ]
+        upserted = []
+
+        async def fake_details(page, url):
+            return responses.pop(0)
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        clock = FakeClock()
+        queue = self.main.DetailRetryQueue(max_attempts=3, base_seconds=0, clock=clock)
+        breaker = self.main.HostCircuitBreaker(failure_threshold=3, clock=clock)
+        breakdown = {}
+
+        async def run():
+            semaphore = asyncio.Semaphore(1)
+            stats = await self.main.process_page_batch(
+                videos, "new", [object()], None, semaphore, retry_queue=queue
+            )
+            breakdown["new"] = stats
+            await self.main.replay_missav_retries(queue, None, [object()], None, semaphore, breakdown, wait_for_all=True)
+
+        with mock.patch.object(self.main, "HOST_BREAKER", breaker), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            asyncio.run(run())
+
+        stats = breakdown["new"]
+        self.assertEqual(1, stats["blocked_count"])
+        self.assertEqual(1, stats["retry_recovered_count"])
+        self.assertEqual(0, stats["retry_lost_count"])
+        self.assertEqual(1, stats["detail_success_count"])
+        self.assertEqual(["abc-1", "abc-1"], [row["external_id"] for row in upserted])
+        self.assertEqual("01:58:00", upserted[-1]["duration"])
+
+    def test_targets_still_failing_at_the_end_count_as_lost(self):
+        clock = FakeClock()
+        queue = self.main.DetailRetryQueue(max_attempts=5, base_seconds=60, clock=clock)
+        queue.schedule("https://missav.ws/new?page=3", {"kind": "list", "tag": "new"})
+        breakdown = {}
+
+        deadline = self.main.RunDeadline(budget_seconds=60, drain_reserve_seconds=120)
+        with mock.patch.object(self.main, "RUN_DEADLINE", deadline):
+            asyncio.run(self.main.replay_missav_retries(queue, None, [], None, asyncio.Semaphore(1), breakdown, wait_for_all=True))
+
+        self.assertEqual(1, breakdown["new"]["retry_lost_count"])
+        self.assertEqual(0, len(queue))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+import asyncio
+import importlib
+import json
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class RunDeadlineTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_budget_prefers_explicit_deadline_then_job_timeout(self):
+        with mock.patch.object(self.main, "RUN_DEADLINE_MINUTES", 30.0), \
+             mock.patch.object(self.main, "JOB_TIMEOUT_MINUTES", 120.0):
+            self.assertEqual(1800.0, self.main.resolve_run_budget_seconds())
+        with mock.patch.object(self.main, "RUN_DEADLINE_MINUTES", 0.0), \
+             mock.patch.object(self.main, "JOB_TIMEOUT_MINUTES", 120.0), \
+             mock.patch.object(self.main, "RUN_DEADLINE_MARGIN_MINUTES", 10.0):
+            self.assertEqual(6600.0, self.main.resolve_run_budget_seconds())
+        with mock.patch.object(self.main, "RUN_DEADLINE_MINUTES", 0.0), \
+             mock.patch.object(self.main, "JOB_TIMEOUT_MINUTES", 0.0):
+            self.assertIsNone(self.main.resolve_run_budget_seconds())
+
+    def test_error_summary_keeps_run_report_and_stays_valid_json(self):
+        stats = self.main.make_run_stats()
+        stats["new_external_count"] = 7
+        source_stats = {**self.main.make_run_stats(), "pages_scanned": 3, "new_external_count": 2, "url": "https://missav.ws/" + "x" * 200}
+        breakdown = {f"tag_{index}": dict(source_stats) for index in range(20)}
+        report = {"deadline": {"stopped_early": True, "deferred": {"details_deferred": 12}}}
+
+        text = self.main.build_error_summary(stats, breakdown, None, report)
+        summary = json.loads(text)
+        self.assertLessEqual(len(text), self.main.ERROR_SUMMARY_MAX_CHARS)
+        self.assertEqual(report["deadline"], summary["deadline"])
+        self.assertEqual(7, summary["new_external_count"])
+        self.assertEqual({"pages_scanned": 3, "new_external_count": 2}, summary["sources"]["tag_19"])
+        self.assertEqual([{"pages": 3, "new": 2}], self.main.parse_source_yield_history([{"error_summary": text}])["tag_0"])
+
+        many = {f"tag_{index}": dict(source_stats) for index in range(400)}
+        summary = json.loads(self.main.build_error_summary(stats, many, None, report))
+        self.assertNotIn("sources", summary)
+        self.assertEqual(400, summary["sources_omitted"])
+        self.assertEqual(report["deadline"], summary["deadline"])
+
+    def test_unbounded_deadline_never_stops(self):
+        deadline = self.main.RunDeadline(None)
+        self.assertFalse(deadline.stopping())
+        self.assertFalse(deadline.cut_short())
+
+    def test_page_batch_indexes_list_rows_without_details_when_draining(self):
+        videos = [
+            {"external_id": "abc-1", "title": "Video number one", "cover_url": "", "source_url": "https://missav.ws/abc-1"},
+        ]
+        upserted = []
+
+        async def fake_details(page, url):
+            raise AssertionError("detail page should not be opened while draining")
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        deadline = self.main.RunDeadline(budget_seconds=60, drain_reserve_seconds=120)
+        with mock.patch.object(self.main, "RUN_DEADLINE", deadline), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(
+                self.main.process_page_batch(videos, "new", [object()], None, asyncio.Semaphore(1))
+            )
+
+        self.assertEqual(["abc-1"], [row["external_id"] for row in upserted])
+        self.assertEqual(1, stats["upserted_count"])
+        self.assertTrue(deadline.cut_short())
+        report = deadline.report()
+        self.assertEqual(1, report["details_deferred"])
+        self.assertEqual(60, report["budget_seconds"])
+
+    def test_queue_targets_stay_retryable_when_draining(self):
+        targets = [{"external_id": "abc-1", "source_url": "https://missav.ws/abc-1"}]
+        existing = {"abc-1": {"external_id": "abc-1", "cover_url": "https://fourhoi.com/abc-1/cover-n.jpg", "actors": [], "tags": []}}
+        outcomes = {}
+
+        async def fake_lookup(supabase, external_ids, label):
+            return existing
+
+        async def fake_upsert(rows, supabase, label):
+            return {"upserted_count": len(rows)}
+
+        deadline = self.main.RunDeadline(budget_seconds=0, drain_reserve_seconds=0)
+        with mock.patch.object(self.main, "RUN_DEADLINE", deadline), \
+             mock.patch.object(self.main, "fetch_existing_records", fake_lookup), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            asyncio.run(
+                self.main.process_metadata_queue(targets, [object()], object(), asyncio.Semaphore(1), outcomes=outcomes)
+            )
+
+        self.assertEqual({"abc-1": "retry"}, outcomes)
+        self.assertEqual(1, deadline.report()["backfill_targets_deferred"])
+
+
+if __name__ == "__main__":
+    unittest.main()
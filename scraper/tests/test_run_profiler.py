@@ -0,0 +1,113 @@
+import asyncio
+import importlib
+import json
+import os
+import sys
+import tempfile
+import types
+import unittest
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RunProfilerTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_nested_spans_record_self_time_per_stack(self):
+        clock = FakeClock()
+        profiler = self.main.RunProfiler(clock=clock)
+        profiler.start(True)
+
+        with profiler.span("process_page_batch"):
+            clock.now += 1.0
+            with profiler.span("get_video_details"):
+                clock.now += 3.0
+                with profiler.span("playwright.goto"):
+                    clock.now += 2.0
+
+        self.assertEqual(
+            {
+                "process_page_batch": 1.0,
+                "process_page_batch;get_video_details": 3.0,
+                "process_page_batch;get_video_details;playwright.goto": 2.0,
+            },
+            profiler.collapsed,
+        )
+        self.assertEqual(6.0, profiler.spans["process_page_batch"]["total_seconds"])
+
+    def test_concurrent_tasks_keep_separate_stacks(self):
+        profiler = self.main.RunProfiler()
+        profiler.start(True)
+
+        async def worker(name):
+            with profiler.span(name):
+                await asyncio.sleep(0)
+                with profiler.span("get_video_details"):
+                    await asyncio.sleep(0)
+
+        async def run():
+            with profiler.span("site.missav"):
+                await asyncio.gather(worker("a"), worker("b"))
+
+        asyncio.run(run())
+        self.assertIn("site.missav;a;get_video_details", profiler.collapsed)
+        self.assertIn("site.missav;b;get_video_details", profiler.collapsed)
+        self.assertNotIn("site.missav;a;b", profiler.collapsed)
+        self.assertEqual(2, profiler.spans["get_video_details"]["count"])
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = self.main.RunProfiler()
+        profiler.start(False)
+        with profiler.span("get_video_details"):
+            pass
+        self.assertEqual({}, profiler.collapsed)
+
+    def test_sampler_and_artifacts(self):
+        profiler = self.main.RunProfiler()
+        profiler.start(True)
+
+        async def run():
+            profiler.start_sampler(interval=0.01)
+            with profiler.span("batch_upsert_videos"):
+                await asyncio.sleep(0.05)
+            await profiler.stop_sampler()
+
+        asyncio.run(run())
+        self.assertGreater(len(profiler.samples), 0)
+        self.assertIn("loop_lag_ms", profiler.samples[0])
+
+        with tempfile.TemporaryDirectory() as directory:
+            report = profiler.write(directory)
+            with open(os.path.join(directory, "profile.collapsed"), encoding="utf-8") as fp:
+                collapsed = fp.read().splitlines()
+            with open(os.path.join(directory, "profile-summary.json"), encoding="utf-8") as fp:
+                summary = json.load(fp)
+
+        self.assertTrue(collapsed[0].startswith("batch_upsert_videos "))
+        self.assertEqual(1, summary["spans"]["batch_upsert_videos"]["count"])
+        self.assertEqual(len(profiler.samples), len(summary["timeline"]))
+        self.assertIn("batch_upsert_videos", report["top_spans"])
+
+
+if __name__ == "__main__":
+    unittest.main()
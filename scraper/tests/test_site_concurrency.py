@@ -0,0 +1,123 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class FakeContext:
+    def __init__(self, site):
+        self.site = site
+        self.closed = False
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywrightManager:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+
+class SiteConcurrencyTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_pool_sizes_shrink_largest_pool_to_fit_global_cap(self):
+        with mock.patch.dict(self.main.SITE_PROFILES, {
+            "missav": {**self.main.SITE_PROFILES["missav"], "detail_pages": 6},
+            "51cg": {**self.main.SITE_PROFILES["51cg"], "detail_pages": 2},
+        }):
+            self.assertEqual({"51cg": 2, "missav": 4}, self.main.resolve_site_pool_sizes(["51cg", "missav"], global_cap=6))
+            self.assertEqual({"51cg": 1, "missav": 1}, self.main.resolve_site_pool_sizes(["51cg", "missav"], global_cap=1))
+
+    def test_shared_limiter_caps_work_across_sites(self):
+        shared = asyncio.Semaphore(2)
+        active = []
+        peak = []
+
+        async def work(limiter):
+            async with limiter:
+                active.append(1)
+                peak.append(len(active))
+                await asyncio.sleep(0.01)
+                active.pop()
+
+        async def run():
+            missav = self.main.SharedLimiter(asyncio.Semaphore(2), shared)
+            cg = self.main.SharedLimiter(asyncio.Semaphore(2), shared)
+            await asyncio.gather(*(work(missav) for _ in range(4)), *(work(cg) for _ in range(4)))
+
+        asyncio.run(run())
+        self.assertEqual(2, max(peak))
+        self.assertEqual(2, shared._value)
+
+    def test_sites_run_concurrently_in_own_contexts_and_merge_breakdown(self):
+        contexts = {}
+        started = {}
+        finalize_calls = []
+
+        async def fake_launch(p, site, user_data_dir, headless):
+            contexts[site] = FakeContext(site)
+            return contexts[site], {"warm_start": False}
+
+        def stats_with(upserted):
+            stats = self.main.make_run_stats()
+            stats["upserted_count"] = upserted
+            return stats
+
+        async def fake_cg(context, supabase, limiter, run_config, pool_size):
+            started.setdefault("51cg", asyncio.Event()).set()
+            await asyncio.wait_for(started.setdefault("missav", asyncio.Event()).wait(), timeout=1)
+            return {"51cg": stats_with(2)}
+
+        async def fake_missav(context, supabase, limiter, run_config, pool_size, run_id, run_source, site_report, launch_started):
+            started.setdefault("missav", asyncio.Event()).set()
+            await asyncio.wait_for(started.setdefault("51cg", asyncio.Event()).wait(), timeout=1)
+            return {"new": stats_with(3)}, {"new": {"pages": 1, "new": 3, "page_yields": [3]}}
+
+        async def fake_finalize(**kwargs):
+            finalize_calls.append(kwargs)
+
+        async def fake_create(supabase, source):
+            return None
+
+        with mock.patch.object(self.main, "SCRAPER_RUN_MODE", "sample"), \
+             mock.patch.object(self.main, "SCRAPER_SOURCE_TAGS", ["new", "51cg"]), \
+             mock.patch.object(self.main, "SKIP_51CG", False), \
+             mock.patch.object(self.main, "SUPABASE_URL", ""), \
+             mock.patch.object(self.main, "SUPABASE_KEY", ""), \
+             mock.patch.object(self.main, "async_playwright", lambda: FakePlaywrightManager()), \
+             mock.patch.object(self.main, "launch_site_context", fake_launch), \
+             mock.patch.object(self.main, "crawl_51cg_site", fake_cg), \
+             mock.patch.object(self.main, "crawl_missav_site", fake_missav), \
+             mock.patch.object(self.main, "create_scrape_run", fake_create), \
+             mock.patch.object(self.main, "finalize_scrape_run", fake_finalize):
+            asyncio.run(self.main.scrape_videos())
+
+        self.assertEqual({"51cg", "missav"}, set(contexts))
+        self.assertTrue(all(context.closed for context in contexts.values()))
+        self.assertEqual(["51cg", "new"], list(finalize_calls[0]["source_breakdown"]))
+        self.assertEqual(5, finalize_calls[0]["stats"]["upserted_count"])
+        self.assertEqual("success", finalize_calls[0]["status"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import asyncio
+import gzip
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+NS = 'xmlns="http://www.sitemaps.org/schemas/sitemap/0.9" xmlns:video="http://www.google.com/schemas/sitemap-video/1.1"'
+
+INDEX = f"""<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex {NS}>
+  <sitemap><loc>https://missav.ws/sitemap_items_1.xml</loc><lastmod>2026-09-01T00:00:00+00:00</lastmod></sitemap>
+  <sitemap><loc>https://missav.ws/sitemap_items_2.xml.gz</loc><lastmod>2026-10-18T00:00:00+00:00</lastmod></sitemap>
+</sitemapindex>""".encode()
+
+SEGMENT_1 = f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://missav.ws/old-001</loc></url>
+</urlset>""".encode()
+
+SEGMENT_2 = gzip.compress(f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset {NS}>
+  <url><loc>https://missav.ws/en/abc-001</loc><lastmod>2026-10-18</lastmod></url>
+  <url><loc>https://missav.ws/cn/abc-001</loc></url>
+  <url><loc>https://missav.ws/dm12/abc-002-uncensored-leak</loc>
+    <video:video><video:title>ABC-002 Title</video:title><video:thumbnail_loc>https://fourhoi.com/abc-002/cover-n.jpg</video:thumbnail_loc></video:video>
+  </url>
+  <url><loc>https://missav.ws/abc-003</loc></url>
+  <url><loc>https://missav.ws/en/genres/big-tits</loc></url>
+</urlset>""".encode())
+
+
+class FakeStreamResponse:
+    def __init__(self, body, status_code=200, chunk_size=37):
+        self.body = body
+        self.status_code = status_code
+        self.chunk_size = chunk_size
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return False
+
+    async def aiter_bytes(self):
+        for index in range(0, len(self.body), self.chunk_size):
+            yield self.body[index:index + self.chunk_size]
+
+
+class FakeSitemapClient:
+    def __init__(self, bodies):
+        self.bodies = bodies
+        self.requested = []
+
+    def stream(self, method, url):
+        self.requested.append(url)
+        return FakeStreamResponse(self.bodies[url])
+
+
+class SitemapDiscoveryTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_video_id_from_url(self):
+        self.assertEqual("abc-001", self.main.missav_video_id_from_url("https://missav.ws/en/abc-001"))
+        self.assertEqual("fc2-ppv-1234567", self.main.missav_video_id_from_url("https://missav.ws/dm5/fc2-ppv-1234567?x=1"))
+        self.assertEqual("abc-002-chinese-subtitle", self.main.missav_video_id_from_url("https://missav.ws/abc-002-chinese-subtitle"))
+        self.assertIsNone(self.main.missav_video_id_from_url("https://missav.ws/en/genres/big-tits"))
+        self.assertIsNone(self.main.missav_video_id_from_url("https://missav.ws/dm263/monthly-hot"))
+        self.assertIsNone(self.main.missav_video_id_from_url("https://missav.ws/actresses/some-one"))
+
+    def test_stream_parses_split_gzip_chunks_and_releases_entries(self):
+        stream = self.main.SitemapStream()
+        entries = []
+        for index in range(0, len(SEGMENT_2), 11):
+            entries.extend(stream.feed(SEGMENT_2[index:index + 11]))
+        entries.extend(stream.close())
+
+        self.assertEqual(5, len(entries))
+        self.assertEqual("2026-10-18", entries[0]["lastmod"])
+        self.assertEqual("ABC-002 Title", entries[2]["title"])
+        self.assertEqual("https://fourhoi.com/abc-002/cover-n.jpg", entries[2]["thumbnail_loc"])
+        self.assertEqual(0, len(stream.root))
+
+    def test_discovery_skips_unchanged_segments_and_diffs_known_ids(self):
+        client = FakeSitemapClient({
+            "https://missav.ws/sitemap.xml": INDEX,
+            "https://missav.ws/sitemap_items_2.xml.gz": SEGMENT_2,
+        })
+        lookups = []
+
+        async def fake_watermarks(supabase):
+            return {"https://missav.ws/sitemap_items_1.xml": "2026-09-01T00:00:00+00:00"}
+
+        async def fake_known(supabase, external_ids):
+            lookups.append(list(external_ids))
+            return {"abc-003"}
+
+        with mock.patch.object(self.main, "load_sitemap_watermarks", fake_watermarks), \
+             mock.patch.object(self.main, "fetch_known_external_ids", fake_known):
+            videos, report = asyncio.run(
+                self.main.discover_sitemap_videos(object(), client, "https://missav.ws/sitemap.xml", max_new=10)
+            )
+
+        self.assertNotIn("https://missav.ws/sitemap_items_1.xml", client.requested)
+        self.assertEqual(["abc-001", "abc-002-uncensored-leak"], [video["external_id"] for video in videos])
+        self.assertEqual("ABC-002 Title", videos[1]["title"])
+        self.assertEqual("abc-001", videos[0]["title"])
+        self.assertEqual(1, report["segments_skipped"])
+        self.assertEqual(1, report["known"])
+        self.assertEqual(
+            [{"url": "https://missav.ws/sitemap_items_2.xml.gz", "lastmod": "2026-10-18T00:00:00+00:00", "entry_count": 5, "new_count": 2}],
+            report["watermarks"],
+        )
+        self.assertTrue(all(len(chunk) <= self.main.EXISTING_LOOKUP_CHUNK_SIZE for chunk in lookups))
+
+    def test_capped_discovery_does_not_advance_watermark(self):
+        client = FakeSitemapClient({
+            "https://missav.ws/sitemap.xml": INDEX,
+            "https://missav.ws/sitemap_items_2.xml.gz": SEGMENT_2,
+            "https://missav.ws/sitemap_items_1.xml": SEGMENT_1,
+        })
+
+        async def fake_watermarks(supabase):
+            return {}
+
+        async def fake_known(supabase, external_ids):
+            return set()
+
+        with mock.patch.object(self.main, "load_sitemap_watermarks", fake_watermarks), \
+             mock.patch.object(self.main, "fetch_known_external_ids", fake_known):
+            videos, report = asyncio.run(
+                self.main.discover_sitemap_videos(object(), client, "https://missav.ws/sitemap.xml", max_new=1)
+            )
+
+        self.assertEqual(["abc-001"], [video["external_id"] for video in videos])
+        self.assertTrue(report["truncated"])
+        self.assertEqual([], report["watermarks"])
+        self.assertNotIn("https://missav.ws/sitemap_items_1.xml", client.requested)
+
+    def test_sitemap_rows_are_not_tagged_with_the_stage_name(self):
+        row = self.main.build_missav_list_row(
+            {"external_id": "abc-001", "title": "abc-001", "source_url": "https://missav.ws/abc-001"},
+            self.main.SITEMAP_SOURCE_TAG,
+            None,
+        )
+        self.assertNotIn("sitemap", row["tags"])
+        self.assertNotIn("sitemap", row["categories"])
+
+    def test_crawl_saves_watermarks_after_batches(self):
+        videos = [{"external_id": f"abc-{index:03d}", "title": f"abc-{index:03d}", "source_url": f"https://missav.ws/abc-{index:03d}"} for index in range(5)]
+        report = {
+            "segments": 1, "segments_scanned": 1, "segments_skipped": 0, "segments_failed": 0,
+            "entries": 5, "known": 0, "new": 5, "truncated": False,
+            "watermarks": [{"url": "https://missav.ws/s.xml", "lastmod": "2026-10-18", "entry_count": 5, "new_count": 5}],
+        }
+        batches = []
+        saved = []
+
+        async def fake_discover(supabase, client, index_url, max_new):
+            return videos, report
+
+        async def fake_process(batch, source_tag, *args, **kwargs):
+            batches.append((source_tag, len(batch)))
+            stats = self.main.make_run_stats()
+            stats["new_external_count"] = len(batch)
+            return stats
+
+        async def fake_save(supabase, watermarks):
+            saved.extend(watermarks)
+
+        class FakeClientContext:
+            async def __aenter__(self):
+                return object()
+
+            async def __aexit__(self, exc_type, exc, tb):
+                return False
+
+        with mock.patch.object(self.main, "discover_sitemap_videos", fake_discover), \
+             mock.patch.object(self.main, "process_page_batch", fake_process), \
+             mock.patch.object(self.main, "save_sitemap_watermarks", fake_save), \
+             mock.patch.object(self.main, "create_http_client", lambda max_connections: FakeClientContext()), \
+             mock.patch.object(self.main, "SITEMAP_BATCH_SIZE", 2), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)):
+            stats = asyncio.run(self.main.crawl_missav_sitemap(object(), [], None, {"detail_fetch_policy": "smart"}, None))
+
+        self.assertEqual([("sitemap", 2), ("sitemap", 2), ("sitemap", 1)], batches)
+        self.assertEqual(5, stats["new_external_count"])
+        self.assertEqual(report["watermarks"], saved)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -79,6 +79,13 @@ class TargetedBackfillSelectorTest(unittest.TestCase):
         )
         self.assertEqual(['51cg', '51mrds'], selected)
 
+    def test_build_query_reads_precomputed_backlog(self):
+        query = self.selector.build_query(limit=4, source_site='missav', include_51cg=False, focus='metadata')
+        self.assertIn('from public.video_backlog b', query)
+        self.assertNotIn('public.videos', query)
+        self.assertIn("b.source_site = 'missav'", query)
+        self.assertNotIn("'51cg'", query.split('where b.tag in', 1)[1].split(')', 1)[0])
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,104 @@
+import asyncio
+import importlib
+import sys
+import types
+import unittest
+from unittest import mock
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+def list_video(external_id, cover_id=None):
+    return {
+        "external_id": external_id,
+        "title": f"{external_id.upper()} title",
+        "cover_url": f"https://fourhoi.com/{cover_id or external_id}/cover-n.jpg",
+        "source_url": f"https://missav.ws/{external_id}",
+    }
+
+
+class VariantGroupingTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_content_key_strips_variant_suffixes(self):
+        self.assertEqual("abc-001", self.main.missav_content_key("abc-001"))
+        self.assertEqual("abc-001", self.main.missav_content_key("ABC-001-uncensored-leak"))
+        self.assertEqual("fc2-ppv-1234567", self.main.missav_content_key("fc2-ppv-1234567-chinese-subtitle"))
+        self.assertIsNone(self.main.missav_content_key("51cg_123"))
+        self.assertIsNone(self.main.missav_content_key(""))
+        self.assertEqual("original", self.main.missav_variant("abc-001"))
+        self.assertEqual("english-subtitle", self.main.missav_variant("abc-001-english-subtitle"))
+        self.assertIsNone(self.main.missav_variant("51cg_123_2"))
+
+    def test_share_key_requires_matching_cover(self):
+        base = self.main.variant_share_key(list_video("abc-001"))
+        leak = self.main.variant_share_key(list_video("abc-001-uncensored-leak"))
+        other_cover = self.main.variant_share_key(list_video("abc-001-chinese-subtitle", cover_id="xyz-999"))
+        self.assertEqual(base, leak)
+        self.assertNotEqual(base, other_cover)
+        self.assertIsNone(self.main.variant_share_key({**list_video("abc-001"), "cover_url": ""}))
+
+    def run_batch(self, videos, responses):
+        fetched = []
+        upserted = []
+
+        async def fake_details(page, url):
+            fetched.append(url)
+            await asyncio.sleep(0)
+            return dict(responses.pop(0))
+
+        async def fake_upsert(rows, supabase, label):
+            upserted.extend(rows)
+            return {"upserted_count": len(rows)}
+
+        with mock.patch.object(self.main, "HOST_BREAKER", self.main.HostCircuitBreaker()), \
+             mock.patch.object(self.main, "RUN_DEADLINE", self.main.RunDeadline(None)), \
+             mock.patch.object(self.main, "get_video_details", fake_details), \
+             mock.patch.object(self.main, "batch_upsert_videos", fake_upsert):
+            stats = asyncio.run(self.main.process_page_batch(videos, "new", [object(), object()], None, asyncio.Semaphore(2)))
+        return stats, fetched, {row["external_id"]: row for row in upserted}
+
+    def test_variants_share_one_detail_fetch(self):
+        videos = [list_video("abc-001"), list_video("abc-001-uncensored-leak"), list_video("abc-002")]
+        success = {"_status": "success", "duration": "02:00:00", "release_date": "2026-10-01", "actors": ["A"], "tags": ["Tag"]}
+        stats, fetched, rows = self.run_batch(videos, [success, success])
+
+        self.assertEqual(["https://missav.ws/abc-001", "https://missav.ws/abc-002"], sorted(fetched))
+        self.assertEqual(2, stats["detail_attempted_count"])
+        self.assertEqual(1, stats["detail_shared_count"])
+        leak = rows["abc-001-uncensored-leak"]
+        self.assertEqual(["A"], leak["actors"])
+        self.assertEqual("2026-10-01", leak["release_date"])
+        self.assertEqual("https://missav.ws/abc-001-uncensored-leak", leak["source_url"])
+        self.assertEqual("ABC-001-UNCENSORED-LEAK title", leak["title"])
+        self.assertEqual(rows["abc-001"]["detail_last_outcome"], leak["detail_last_outcome"])
+        self.assertEqual("success", leak["detail_last_outcome"])
+        self.assertIsNone(leak["next_detail_attempt_at"])
+
+    def test_sibling_fetches_itself_when_leader_fails(self):
+        videos = [list_video("abc-001"), list_video("abc-001-chinese-subtitle")]
+        responses = [
+            {"_status": "error", "duration": None, "release_date": None, "actors": [], "tags": []},
+            {"_status": "success", "duration": "01:00:00", "release_date": "2026-10-02", "actors": ["B"], "tags": []},
+        ]
+        stats, fetched, rows = self.run_batch(videos, responses)
+
+        self.assertEqual(2, len(fetched))
+        self.assertEqual(0, stats["detail_shared_count"])
+        self.assertEqual(["B"], rows["abc-001-chinese-subtitle"]["actors"])
+
+
+if __name__ == "__main__":
+    unittest.main()
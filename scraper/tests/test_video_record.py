@@ -0,0 +1,108 @@
+import importlib
+import json
+import sys
+import types
+import unittest
+
+
+def load_main_module():
+    if "playwright.async_api" not in sys.modules:
+        sys.modules["playwright.async_api"] = types.SimpleNamespace(async_playwright=None)
+    if "playwright_stealth" not in sys.modules:
+        sys.modules["playwright_stealth"] = types.SimpleNamespace(Stealth=object)
+    if "supabase" not in sys.modules:
+        sys.modules["supabase"] = types.SimpleNamespace(create_client=lambda *args, **kwargs: None, Client=object)
+    if "dotenv" not in sys.modules:
+        sys.modules["dotenv"] = types.SimpleNamespace(load_dotenv=lambda *args, **kwargs: None)
+    return importlib.import_module("scraper.main")
+
+
+class VideoRecordTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.main = load_main_module()
+
+    def test_from_mapping_normalizes_and_classifies_once(self):
+        record = self.main.VideoRecord.from_mapping({
+            "external_id": "abc-001",
+            "title": "ABC-001 Title",
+            "source_url": "https://missav.ws/abc-001",
+            "cover_url": "https://fourhoi.com/abc-001/cover-n.jpg",
+            "duration": "0",
+            "actors": ["A", "A", "B"],
+            "tags": ["new", "New", "巨乳"],
+            "categories": [],
+            "duplicate_of": "abc-000",
+        })
+
+        self.assertFalse(hasattr(record, "__dict__"))
+        self.assertEqual(["A", "B"], record.actors)
+        self.assertIsNone(record.duration)
+        self.assertEqual("valid", record.cover_status)
+        self.assertEqual("success", record.detail_status)
+        self.assertIsNotNone(record.detail_fetched_at)
+        self.assertEqual("abc-000", record["duplicate_of"])
+        self.assertTrue(record["is_active"])
+        self.assertIsNone(record.get("missing"))
+
+        payload = self.main.video_payload(record)
+        self.assertEqual("missav", payload["source_site"])
+        self.assertEqual("abc-000", payload["duplicate_of"])
+        self.assertEqual(payload, self.main.normalize_video_record(payload))
+        json.dumps(payload)
+
+    def test_placeholder_cover_is_flagged_before_normalization(self):
+        record = self.main.VideoRecord.from_mapping({
+            "external_id": "abc-002",
+            "title": "ABC-002",
+            "source_url": "https://missav.ws/abc-002",
+            "cover_url": "data:image/gif;base64,R0lGOD",
+        })
+        self.assertTrue(record.placeholder_cover)
+        self.assertIsNone(record.cover_url)
+        self.assertEqual("pending", record.detail_status)
+        self.assertIsNone(record.detail_fetched_at)
+
+    def test_merge_keeps_existing_fields_and_leaves_the_source_untouched(self):
+        video = self.main.VideoRecord.from_mapping({
+            "external_id": "abc-003",
+            "title": "x",
+            "source_url": "https://missav.ws/abc-003",
+            "tags": ["new"],
+        })
+        existing = {
+            "title": "ABC-003 Existing",
+            "cover_url": "https://fourhoi.com/abc-003/cover-n.jpg",
+            "release_date": "2026-10-01",
+            "actors": ["A"],
+            "tags": ["巨乳"],
+            "categories": ["new"],
+            "detail_fetched_at": "2026-10-01T00:00:00+00:00",
+        }
+
+        merged = self.main.merge_video_record(video, existing)
+
+        self.assertIsNot(video, merged)
+        self.assertEqual("x", video.title)
+        self.assertEqual("ABC-003 Existing", merged.title)
+        self.assertEqual(["big_tits", "new"], merged.tags)
+        self.assertEqual(["A"], merged.actors)
+        self.assertEqual("2026-10-01", merged.release_date)
+        self.assertEqual("success", merged.detail_status)
+        self.assertEqual("detail_ready", merged.inventory_status)
+
+    def test_prepend_taxonomy_reclassifies(self):
+        record = self.main.VideoRecord.from_mapping({
+            "external_id": "abc-004",
+            "title": "ABC-004",
+            "source_url": "https://missav.ws/abc-004",
+        })
+        self.assertEqual("pending", record.detail_status)
+        record.prepend_taxonomy(["weekly_hot"])
+        self.assertEqual(["weekly_hot"], record.tags)
+        self.assertEqual(["weekly_hot"], record.categories)
+        self.assertEqual("partial", record.detail_status)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+# Shared Supabase Management API client for the planning scripts. Stdlib only, because the
+# enqueue/select workflow steps run before any pip install.
+import codecs
+import http.client
+import json
+import os
+import random
+import time
+import zlib
+from urllib.parse import urlparse
+
+API_BASE_URL = os.environ.get('SUPABASE_MANAGEMENT_API_URL', 'https://api.supabase.com').rstrip('/')
+USER_AGENT = 'SupabaseCLI/2.78.1'
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Writes may already have been applied when a 5xx or a dropped connection comes back, so only
+# retry them when the API rejected the request outright.
+WRITE_RETRY_STATUSES = {429}
+READ_CHUNK_BYTES = 64 * 1024
+
+
+class ManagementApiError(Exception):
+    def __init__(self, status: int, body: str):
+        super().__init__(f'Management API returned HTTP {status}: {body[:500]}')
+        self.status = status
+        self.body = body
+
+
+def iter_json_array(chunks):
+    decoder = json.JSONDecoder()
+    buffer = ''
+    started = False
+    fallback = None
+    for chunk in chunks:
+        if fallback is not None:
+            fallback.append(chunk)
+            continue
+        buffer += chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n' + (',' if started else ''):
+                pos += 1
+            if pos >= len(buffer):
+                break
+            if not started:
+                if buffer[pos] != '[':
+                    fallback = [buffer[pos:]]
+                    buffer = ''
+                    break
+                started = True
+                pos += 1
+                continue
+            if buffer[pos] == ']':
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except ValueError:
+                break
+            if end >= len(buffer) and not isinstance(item, (dict, list, str)):
+                break
+            yield item
+            pos = end
+        buffer = buffer[pos:]
+
+    if fallback is not None:
+        document = json.loads(''.join(fallback))
+        yield from document if isinstance(document, list) else [document]
+    elif started:
+        raise ValueError('Truncated JSON array in Management API response')
+
+
+class ManagementApiClient:
+    def __init__(
+        self,
+        project_ref: str,
+        token: str,
+        base_url: str = API_BASE_URL,
+        timeout: float = 120,
+        max_retries: int = 4,
+        backoff_base: float = 1.0,
+        sleep=time.sleep,
+    ):
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme or 'https'
+        self.host = parsed.netloc
+        self.base_path = parsed.path.rstrip('/')
+        self.project_ref = project_ref
+        self.token = token
+        self.timeout = timeout
+        self.max_retries = max(1, max_retries)
+        self.backoff_base = backoff_base
+        self.sleep = sleep
+        self.connection = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def _connect(self):
+        if self.connection is None:
+            connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            self.connection = connection_class(self.host, timeout=self.timeout)
+        return self.connection
+
+    def _retry_wait(self, attempt: int, retry_after: str | None = None) -> float:
+        try:
+            if retry_after is not None:
+                return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        return self.backoff_base * (2 ** (attempt - 1)) + random.uniform(0.0, 0.25)
+
+    def _open(self, payload: dict, read_only: bool = True):
+        body = json.dumps(payload).encode()
+        headers = {
+            'Authorization': f'Bearer {self.token}',
+            'User-Agent': USER_AGENT,
+            'Content-Type': 'application/json',
+            'Accept-Encoding': 'gzip',
+            'Connection': 'keep-alive',
+        }
+        path = f'{self.base_path}/v1/projects/{self.project_ref}/database/query'
+        retry_statuses = RETRY_STATUSES if read_only else WRITE_RETRY_STATUSES
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                connection = self._connect()
+                connection.request('POST', path, body=body, headers=headers)
+                response = connection.getresponse()
+            except (OSError, http.client.HTTPException) as error:
+                self.close()
+                if not read_only or attempt >= self.max_retries:
+                    raise
+                wait = self._retry_wait(attempt)
+                print(f'[ManagementApi] {error}. Retry {attempt}/{self.max_retries - 1} in {wait:.1f}s', flush=True)
+                self.sleep(wait)
+                continue
+
+            if 200 <= response.status < 300:
+                return response
+            error_body = ''.join(self._iter_text(response))
+            if response.status not in retry_statuses or attempt >= self.max_retries:
+                raise ManagementApiError(response.status, error_body)
+            wait = self._retry_wait(attempt, response.getheader('Retry-After'))
+            print(f'[ManagementApi] HTTP {response.status}. Retry {attempt}/{self.max_retries - 1} in {wait:.1f}s', flush=True)
+            self.sleep(wait)
+
+    def _iter_text(self, response):
+        gzipped = (response.getheader('Content-Encoding') or '').lower() == 'gzip'
+        inflater = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+        text = codecs.getincrementaldecoder('utf-8')()
+        complete = False
+        try:
+            while True:
+                chunk = response.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                if inflater is not None:
+                    chunk = inflater.decompress(chunk)
+                yield text.decode(chunk)
+            if inflater is not None:
+                yield text.decode(inflater.flush())
+            yield text.decode(b'', final=True)
+            complete = True
+        finally:
+            if response.will_close or not complete:
+                self.close()
+
+    def iter_query(self, query: str, read_only: bool = True):
+        payload = {'query': query}
+        if read_only:
+            payload['read_only'] = True
+        chunks = self._iter_text(self._open(payload, read_only=read_only))
+        yield from iter_json_array(chunks)
+        for _ in chunks:
+            pass
+
+    def query(self, query: str, read_only: bool = True) -> list:
+        return list(self.iter_query(query, read_only=read_only))
+
+
+_CLIENTS = {}
+
+
+def get_client(project_ref: str, token: str, **kwargs) -> ManagementApiClient:
+    key = (project_ref, token)
+    if key not in _CLIENTS:
+        _CLIENTS[key] = ManagementApiClient(project_ref, token, **kwargs)
+    return _CLIENTS[key]
+
+
+def run_sql(project_ref: str, token: str, query: str, read_only: bool = True) -> list:
+    return get_client(project_ref, token).query(query, read_only=read_only)
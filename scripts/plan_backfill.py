@@ -0,0 +1,318 @@
+#!/usr/bin/env python3
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from management_api import ManagementApiError, run_sql  # noqa: E402
+import select_backfill_targets as targets  # noqa: E402
+import select_metadata_queue as metadata_queue  # noqa: E402
+import select_null_cover_queue as null_cover_queue  # noqa: E402
+
+QUEUE_COLUMNS = 'external_id, source_url, source_site, source_release_date, created_at'
+QUEUE_ORDER = 'source_release_date desc nulls last, created_at desc'
+PRIORITY_MODES = ['recency', 'popularity']
+PRIORITY_WEIGHTS = {
+    'recency': 1.0,
+    'weekly_hot': 1.5,
+    'monthly_hot': 0.75,
+    'favorites': 2.0,
+    'recent_watches': 3.0,
+}
+RECENCY_HALF_LIFE_DAYS = 30
+WATCH_WINDOW_DAYS = 14
+
+
+def build_priority_expression(weights: dict | None = None, half_life_days: float = RECENCY_HALF_LIFE_DAYS) -> str:
+    weights = {**PRIORITY_WEIGHTS, **(weights or {})}
+    age_days = "greatest(extract(epoch from now() - coalesce(v.source_release_date::timestamptz, v.created_at)) / 86400.0, 0)"
+    return f"""round((
+      {float(weights['recency'])} * exp(-{age_days} * ln(2) / {float(half_life_days)})
+      + case when 'weekly_hot' = any(coalesce(v.tags, '{{}}'::text[])) then {float(weights['weekly_hot'])} else 0 end
+      + case when 'monthly_hot' = any(coalesce(v.tags, '{{}}'::text[])) then {float(weights['monthly_hot'])} else 0 end
+      + {float(weights['favorites'])} * ln(1 + coalesce(f.favorite_count, 0))
+      + {float(weights['recent_watches'])} * ln(1 + coalesce(w.recent_watch_count, 0))
+    )::numeric, 4)"""
+
+
+def build_plan_query(
+    source_site: str = 'missav',
+    focus: str = 'mixed',
+    include_51cg: bool = False,
+    tag_limit: int = 4,
+    null_cover_limit: int = 50,
+    metadata_limit: int = 50,
+    priority: str = 'recency',
+    watch_window_days: int = WATCH_WINDOW_DAYS,
+) -> str:
+    source_filter = ''
+    if source_site in {'missav', '51cg'}:
+        source_filter = f" and v.source_site = '{source_site}'"
+    tag_order = targets.tag_order_clause(focus)
+    popularity = priority == 'popularity'
+
+    demand_ctes = ''
+    demand_columns = '0 as favorite_count,\n    0 as recent_watch_count,\n    0::numeric as priority'
+    demand_joins = ''
+    if popularity:
+        demand_ctes = f"""
+favorite_demand as (
+  select video_id, count(*)::int as favorite_count
+  from public.favorites
+  group by video_id
+),
+watch_demand as (
+  select video_id, count(*)::int as recent_watch_count
+  from public.watch_history
+  where updated_at >= now() - interval '{int(watch_window_days)} days'
+  group by video_id
+),"""
+        demand_columns = (
+            'coalesce(f.favorite_count, 0) as favorite_count,\n'
+            '    coalesce(w.recent_watch_count, 0) as recent_watch_count,\n'
+            f'    {build_priority_expression()} as priority'
+        )
+        demand_joins = """
+  left join favorite_demand f on f.video_id = v.id
+  left join watch_demand w on w.video_id = v.id"""
+
+    rank_column = 'priority_rank' if popularity else 'recency_rank'
+    report_column = ''
+    if popularity:
+        report_column = ",\n  (select coalesce(jsonb_object_agg(queue, to_jsonb(r) - 'queue'), '{}'::jsonb) from priority_report r) as priority_report"
+    row_columns = f'{QUEUE_COLUMNS}, favorite_count, recent_watch_count, priority' if popularity else QUEUE_COLUMNS
+    return f"""
+with {targets.build_backlog_cte(source_site, include_51cg)},
+tag_rows as (
+  select *
+  from backlog
+  where backlog_count > 0
+  order by {tag_order}
+  limit {int(tag_limit)}
+),{demand_ctes}
+candidates as materialized (
+  select
+    v.external_id,
+    v.source_url,
+    v.source_site,
+    v.source_release_date,
+    v.created_at,
+    case when v.cover_url is null then 'null_cover' else 'metadata' end as queue,
+    {demand_columns}
+  from public.videos v{demand_joins}
+  where coalesce(v.is_active, true) = true
+    and coalesce(btrim(v.source_url), '') <> ''
+    and (v.cover_url is null or v.detail_status in ('pending', 'partial'))
+    and (v.next_detail_attempt_at is null or v.next_detail_attempt_at <= now())
+    {source_filter}
+),
+queue_limits (queue, queue_limit) as (
+  values ('null_cover', {int(null_cover_limit)}), ('metadata', {int(metadata_limit)})
+),
+ranked as (
+  select
+    c.*,
+    l.queue_limit,
+    row_number() over (partition by c.queue order by c.{QUEUE_ORDER.replace(', ', ', c.')}) as recency_rank,
+    row_number() over (partition by c.queue order by c.priority desc, c.{QUEUE_ORDER.replace(', ', ', c.')}) as priority_rank
+  from candidates c
+  join queue_limits l on l.queue = c.queue
+),
+selected as (
+  select *
+  from ranked
+  where {rank_column} <= queue_limit
+),
+priority_report as (
+  select
+    queue,
+    count(*) filter (where priority_rank <= queue_limit)::int as priority_fetches,
+    count(*) filter (where priority_rank <= queue_limit and favorite_count + recent_watch_count > 0)::int as priority_visible_rows,
+    coalesce(sum(favorite_count + recent_watch_count) filter (where priority_rank <= queue_limit), 0)::int as priority_demand,
+    count(*) filter (where recency_rank <= queue_limit)::int as recency_fetches,
+    count(*) filter (where recency_rank <= queue_limit and favorite_count + recent_watch_count > 0)::int as recency_visible_rows,
+    coalesce(sum(favorite_count + recent_watch_count) filter (where recency_rank <= queue_limit), 0)::int as recency_demand
+  from ranked
+  group by queue
+)
+select
+  (select coalesce(jsonb_agg(t order by {tag_order}), '[]'::jsonb) from tag_rows t) as tag_rows,
+  (select coalesce(jsonb_agg(jsonb_build_object({json_pairs(row_columns)}) order by {rank_column}), '[]'::jsonb) from selected where queue = 'null_cover') as null_cover_rows,
+  (select coalesce(jsonb_agg(jsonb_build_object({json_pairs(row_columns)}) order by {rank_column}), '[]'::jsonb) from selected where queue = 'metadata') as metadata_rows{report_column};
+"""
+
+
+def json_pairs(columns: str) -> str:
+    return ', '.join(f"'{column}', {column}" for column in (part.strip() for part in columns.split(',')))
+
+
+def _json_column(row: dict, key: str, default=None):
+    value = row.get(key)
+    if isinstance(value, str):
+        value = json.loads(value)
+    if value is None:
+        return [] if default is None else default
+    return value
+
+
+def select_ranked_rows(rows, limit: int):
+    return [dict(row) for row in rows if str(row.get('source_url') or '').strip()][: max(int(limit), 1)]
+
+
+def _per_fetch(value: int, fetches: int) -> float:
+    return round(value / fetches, 4) if fetches else 0.0
+
+
+def summarize_priority_report(report: dict) -> dict:
+    summary = {}
+    for queue, row in sorted((report or {}).items()):
+        fetches = int(row.get('priority_fetches') or 0)
+        visible_rows = int(row.get('priority_visible_rows') or 0)
+        demand = int(row.get('priority_demand') or 0)
+        visible = _per_fetch(visible_rows, fetches)
+        baseline = _per_fetch(int(row.get('recency_visible_rows') or 0), int(row.get('recency_fetches') or 0))
+        summary[queue] = {
+            'fetches': fetches,
+            'visible_rows': visible_rows,
+            'demand': demand,
+            'visible_completeness_per_fetch': visible,
+            'recency_visible_completeness_per_fetch': baseline,
+            'visible_completeness_gained_per_fetch': round(visible - baseline, 4),
+            'demand_per_fetch': _per_fetch(demand, fetches),
+            'recency_demand_per_fetch': _per_fetch(int(row.get('recency_demand') or 0), int(row.get('recency_fetches') or 0)),
+        }
+    return summary
+
+
+def build_plan(
+    rows,
+    source_site: str,
+    focus: str,
+    include_51cg: bool,
+    tag_limit: int,
+    null_cover_limit: int,
+    metadata_limit: int,
+    priority: str = 'recency',
+) -> dict:
+    row = rows[0] if rows else {}
+    tag_rows = _json_column(row, 'tag_rows')
+    selected_tags = targets.select_tags_from_rows(
+        tag_rows,
+        limit=tag_limit,
+        focus=focus,
+        source_site=source_site,
+        include_51cg=include_51cg,
+    )
+    null_cover_rows = _json_column(row, 'null_cover_rows')
+    metadata_rows = _json_column(row, 'metadata_rows')
+    if priority == 'popularity':
+        null_cover_rows = select_ranked_rows(null_cover_rows, null_cover_limit)
+        metadata_rows = select_ranked_rows(metadata_rows, metadata_limit)
+    else:
+        null_cover_rows = null_cover_queue.select_queue_rows(null_cover_rows, null_cover_limit)
+        metadata_rows = metadata_queue.select_queue_rows(metadata_rows, metadata_limit)
+    plan = {
+        'source_site': source_site,
+        'focus': focus,
+        'priority': priority,
+        'selected_tags': selected_tags,
+        'skip_51cg': not any(tag in {'51cg', '51mrds'} for tag in selected_tags),
+        'tag_rows': tag_rows,
+        'null_cover_rows': null_cover_rows,
+        'metadata_rows': metadata_rows,
+    }
+    if priority == 'popularity':
+        plan['priority_report'] = summarize_priority_report(_json_column(row, 'priority_report', {}))
+    return plan
+
+
+def render_env_files(plan: dict) -> dict:
+    return {
+        'targets.env': targets.render_env_output(plan['selected_tags'], plan['skip_51cg'], plan['source_site'], plan['focus']),
+        'null_cover.env': null_cover_queue.render_env_output(plan['null_cover_rows'], plan['source_site']),
+        'metadata.env': metadata_queue.render_env_output(plan['metadata_rows'], plan['source_site']),
+    }
+
+
+def render_env_output(plan: dict) -> str:
+    return "\n".join(render_env_files(plan).values())
+
+
+def write_plan_files(plan: dict, output_dir: str) -> list[str]:
+    directory = Path(output_dir)
+    directory.mkdir(parents=True, exist_ok=True)
+    files = dict(render_env_files(plan))
+    files['plan.json'] = json.dumps(plan, ensure_ascii=False, indent=2)
+    written = []
+    for name, content in files.items():
+        path = directory / name
+        path.write_text(content + "\n", encoding='utf-8')
+        written.append(str(path))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plan targeted, null-cover and metadata backfill queues in one query.')
+    parser.add_argument('--project-ref', default=os.environ.get('SUPABASE_PROJECT_REF', 'gapmmwdbxzcglvvdhhiu'))
+    parser.add_argument('--source-site', choices=['all', 'missav', '51cg'], default='missav')
+    parser.add_argument('--focus', choices=['metadata', 'cover', 'mixed'], default='mixed')
+    parser.add_argument('--include-51cg', action='store_true')
+    parser.add_argument('--tag-limit', type=int, default=4)
+    parser.add_argument('--null-cover-limit', type=int, default=50)
+    parser.add_argument('--metadata-limit', type=int, default=50)
+    parser.add_argument('--priority', choices=PRIORITY_MODES, default='recency')
+    parser.add_argument('--watch-window-days', type=int, default=WATCH_WINDOW_DAYS)
+    parser.add_argument('--output', choices=['json', 'env', 'files'], default='json')
+    parser.add_argument('--output-dir', default='backfill-plan')
+    args = parser.parse_args()
+
+    token = os.environ.get('SUPABASE_ACCESS_TOKEN')
+    if not token:
+        print('SUPABASE_ACCESS_TOKEN is required', file=sys.stderr)
+        sys.exit(1)
+
+    query = build_plan_query(
+        source_site=args.source_site,
+        focus=args.focus,
+        include_51cg=args.include_51cg,
+        tag_limit=args.tag_limit,
+        null_cover_limit=args.null_cover_limit,
+        metadata_limit=args.metadata_limit,
+        priority=args.priority,
+        watch_window_days=args.watch_window_days,
+    )
+    plan = build_plan(
+        run_sql(args.project_ref, token, query),
+        source_site=args.source_site,
+        focus=args.focus,
+        include_51cg=args.include_51cg,
+        tag_limit=args.tag_limit,
+        null_cover_limit=args.null_cover_limit,
+        metadata_limit=args.metadata_limit,
+        priority=args.priority,
+    )
+    for queue, report in plan.get('priority_report', {}).items():
+        print(
+            f"[Planner] {queue}: {report['visible_completeness_per_fetch']:.2%} of fetches complete a video users "
+            f"favorited or recently watched ({report['visible_completeness_gained_per_fetch']:+.2%} vs recency), "
+            f"{report['demand_per_fetch']:.2f} demand per fetch",
+            file=sys.stderr,
+        )
+
+    if args.output == 'env':
+        print(render_env_output(plan))
+    elif args.output == 'files':
+        for path in write_plan_files(plan, args.output_dir):
+            print(path)
+    else:
+        print(json.dumps(plan, ensure_ascii=False, indent=2))
+
+
+if __name__ == '__main__':
+    try:
+        main()
+    except ManagementApiError as error:
+        print(error.body, file=sys.stderr)
+        raise
@@ -3,10 +3,11 @@ import argparse
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
 from pathlib import Path
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from management_api import ManagementApiClient, ManagementApiError  # noqa: E402
+
 
 def main():
     parser = argparse.ArgumentParser(description='Run SQL against Supabase Management API database/query endpoint.')
@@ -26,28 +27,14 @@ def main():
         sys.exit(1)
 
     query = Path(args.file).read_text(encoding='utf-8') if args.file else args.query
-    url = f'https://api.supabase.com/v1/projects/{args.project_ref}/database/query'
-    payload = {'query': query}
-    if args.read_only:
-        payload['read_only'] = True
-
-    request = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode(),
-        method='POST',
-        headers={
-            'Authorization': f'Bearer {token}',
-            'User-Agent': 'SupabaseCLI/2.78.1',
-            'Content-Type': 'application/json',
-        },
-    )
 
     try:
-        with urllib.request.urlopen(request, timeout=300) as response:
-            print(response.read().decode())
-    except urllib.error.HTTPError as error:
-        print(error.read().decode(), file=sys.stderr)
-        sys.exit(error.code or 1)
+        with ManagementApiClient(args.project_ref, token, timeout=300) as client:
+            rows = client.query(query, read_only=args.read_only)
+    except ManagementApiError as error:
+        print(error.body, file=sys.stderr)
+        sys.exit(error.status or 1)
+    print(json.dumps(rows, ensure_ascii=False))
 
 
 if __name__ == '__main__':
@@ -3,8 +3,9 @@ import argparse
 import json
 import os
 import sys
-import urllib.error
-import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from management_api import ManagementApiError, run_sql  # noqa: E402
 
 AVAILABLE_TAGS = [
     'new', 'monthly_hot', 'weekly_hot', 'uncensored', 'subtitled', 'exclusive',
@@ -80,71 +81,58 @@ def select_tags_from_rows(rows, limit: int, focus: str, source_site: str, includ
     return merged[: max(int(limit), 1)]
 
 
-def run_sql(project_ref: str, token: str, query: str):
-    url = f'https://api.supabase.com/v1/projects/{project_ref}/database/query'
-    payload = {'query': query, 'read_only': True}
-    request = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode(),
-        method='POST',
-        headers={
-            'Authorization': f'Bearer {token}',
-            'User-Agent': 'SupabaseCLI/2.78.1',
-            'Content-Type': 'application/json',
-        },
-    )
-    with urllib.request.urlopen(request, timeout=120) as response:
-        return json.loads(response.read().decode())
+def tag_order_clause(focus: str) -> str:
+    if focus == 'cover':
+        return "missing_cover_count desc, backlog_count desc, latest_release_date desc nulls last, tag asc"
+    if focus == 'metadata':
+        return "metadata_gap_count desc, pending_count desc, partial_count desc, latest_release_date desc nulls last, tag asc"
+    return "(missing_cover_count * 2 + partial_count + pending_count) desc, latest_release_date desc nulls last, tag asc"
 
 
-def build_query(limit: int, source_site: str, include_51cg: bool, focus: str) -> str:
+def build_backlog_cte(source_site: str, include_51cg: bool) -> str:
     tags = AVAILABLE_TAGS if include_51cg else [tag for tag in AVAILABLE_TAGS if tag not in {'51cg', '51mrds'}]
-    values = ', '.join(f"('{tag}')" for tag in tags)
+    tag_list = ', '.join(f"'{tag}'" for tag in tags)
     source_filter = ''
     if source_site in {'missav', '51cg'}:
-        source_filter = f" and v.source_site = '{source_site}'"
+        source_filter = f" and b.source_site = '{source_site}'"
+    return f"""backlog as (
+  select
+    b.tag,
+    sum(b.backlog_count)::int as backlog_count,
+    sum(b.missing_cover_count)::int as missing_cover_count,
+    sum(b.pending_count)::int as pending_count,
+    sum(b.partial_count)::int as partial_count,
+    greatest(sum(b.partial_count) - sum(b.missing_cover_count), 0)::int as metadata_gap_count,
+    coalesce(sum(b.backlog_count) filter (where b.source_site = 'missav'), 0)::int as missav_count,
+    coalesce(sum(b.backlog_count) filter (where b.source_site = '51cg'), 0)::int as cg_count,
+    max(b.latest_release_date) as latest_release_date
+  from public.video_backlog b
+  where b.tag in ({tag_list})
+   {source_filter}
+  group by b.tag
+)"""
 
-    if focus == 'cover':
-        order_clause = "missing_cover_count desc, backlog_count desc, latest_release_date desc nulls last, tag asc"
-    elif focus == 'metadata':
-        order_clause = "metadata_gap_count desc, pending_count desc, partial_count desc, latest_release_date desc nulls last, tag asc"
-    else:
-        order_clause = "(missing_cover_count * 2 + partial_count + pending_count) desc, latest_release_date desc nulls last, tag asc"
 
+def build_query(limit: int, source_site: str, include_51cg: bool, focus: str) -> str:
     return f"""
-with source_tags(tag) as (
-  values {values}
-), backlog as (
-  select
-    st.tag,
-    count(v.id)::int as backlog_count,
-    count(v.id) filter (where v.cover_url is null)::int as missing_cover_count,
-    count(v.id) filter (where v.detail_status = 'pending')::int as pending_count,
-    count(v.id) filter (where v.detail_status = 'partial')::int as partial_count,
-    greatest(
-      count(v.id) filter (where v.detail_status = 'partial')
-      - count(v.id) filter (where v.cover_url is null),
-      0
-    )::int as metadata_gap_count,
-    count(v.id) filter (where v.source_site = 'missav')::int as missav_count,
-    count(v.id) filter (where v.source_site = '51cg')::int as cg_count,
-    max(v.source_release_date) as latest_release_date
-  from source_tags st
-  left join public.videos v
-    on v.is_active = true
-   and (st.tag = any(v.tags) or st.tag = any(v.categories))
-   and (v.cover_url is null or v.detail_status in ('pending', 'partial'))
-   {source_filter}
-  group by st.tag
-)
+with {build_backlog_cte(source_site, include_51cg)}
 select *
 from backlog
 where backlog_count > 0
-order by {order_clause}
+order by {tag_order_clause(focus)}
 limit {int(limit)};
 """
 
 
+def render_env_output(selected_tags, skip_51cg: bool, source_site: str, focus: str) -> str:
+    return "\n".join([
+        f"SCRAPER_SOURCE_TAGS={','.join(selected_tags)}",
+        f"SKIP_51CG={'true' if skip_51cg else 'false'}",
+        f"BACKFILL_SOURCE_SITE={source_site}",
+        f"BACKFILL_FOCUS={focus}",
+    ])
+
+
 def main():
     parser = argparse.ArgumentParser(description='Pick recommended source tags for targeted backfill.')
     parser.add_argument('--project-ref', default=os.environ.get('SUPABASE_PROJECT_REF', 'gapmmwdbxzcglvvdhhiu'))
@@ -178,10 +166,7 @@ def main():
     }
 
     if args.output == 'env':
-        print(f"SCRAPER_SOURCE_TAGS={','.join(selected_tags)}")
-        print(f"SKIP_51CG={'true' if skip_51cg else 'false'}")
-        print(f"BACKFILL_SOURCE_SITE={args.source_site}")
-        print(f"BACKFILL_FOCUS={args.focus}")
+        print(render_env_output(selected_tags, skip_51cg, args.source_site, args.focus))
     else:
         print(json.dumps(result, ensure_ascii=False, indent=2))
 
@@ -189,6 +174,6 @@ def main():
 if __name__ == '__main__':
     try:
         main()
-    except urllib.error.HTTPError as error:
-        print(error.read().decode(), file=sys.stderr)
+    except ManagementApiError as error:
+        print(error.body, file=sys.stderr)
         raise
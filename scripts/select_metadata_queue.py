@@ -4,25 +4,9 @@ import json
 import os
 import shlex
 import sys
-import urllib.error
-import urllib.request
-
-
-def run_sql(project_ref: str, token: str, query: str):
-    url = f'https://api.supabase.com/v1/projects/{project_ref}/database/query'
-    payload = {'query': query, 'read_only': True}
-    request = urllib.request.Request(
-        url,
-        data=json.dumps(payload).encode(),
-        method='POST',
-        headers={
-            'Authorization': f'Bearer {token}',
-            'User-Agent': 'SupabaseCLI/2.78.1',
-            'Content-Type': 'application/json',
-        },
-    )
-    with urllib.request.urlopen(request, timeout=120) as response:
-        return json.loads(response.read().decode())
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from management_api import ManagementApiError, run_sql  # noqa: E402
 
 
 def build_query(limit: int, source_site: str = 'missav') -> str:
@@ -40,6 +24,7 @@ from public.videos
 where coalesce(is_active, true) = true
   and cover_url is not null
   and detail_status in ('pending', 'partial')
+  and (next_detail_attempt_at is null or next_detail_attempt_at <= now())
   and coalesce(btrim(source_url), '') <> ''
   {source_filter}
 order by source_release_date desc nulls last, created_at desc
@@ -47,6 +32,11 @@ limit {int(limit)};
 """
 
 
+def build_enqueue_query(limit: int, source_site: str = 'missav') -> str:
+    site = source_site if source_site in {'missav', '51cg'} else 'all'
+    return f"select public.enqueue_backfill_targets('metadata', '{site}', {int(limit)}) as enqueued_count;"
+
+
 def _sort_key(row: dict):
     release = row.get('source_release_date') or ''
     created = row.get('created_at') or ''
@@ -77,7 +67,7 @@ def main():
     parser.add_argument('--project-ref', default=os.environ.get('SUPABASE_PROJECT_REF', 'gapmmwdbxzcglvvdhhiu'))
     parser.add_argument('--source-site', choices=['all', 'missav', '51cg'], default='missav')
     parser.add_argument('--limit', type=int, default=50)
-    parser.add_argument('--output', choices=['json', 'env'], default='json')
+    parser.add_argument('--output', choices=['json', 'env', 'queue'], default='json')
     args = parser.parse_args()
 
     token = os.environ.get('SUPABASE_ACCESS_TOKEN')
@@ -85,6 +75,12 @@ def main():
         print('SUPABASE_ACCESS_TOKEN is required', file=sys.stderr)
         sys.exit(1)
 
+    if args.output == 'queue':
+        rows = run_sql(args.project_ref, token, build_enqueue_query(args.limit, args.source_site), read_only=False)
+        enqueued = int((rows[0] if rows else {}).get('enqueued_count') or 0)
+        print(f"METADATA_ENQUEUED_COUNT={enqueued}")
+        return
+
     rows = run_sql(args.project_ref, token, build_query(args.limit, args.source_site))
     selected = select_queue_rows(rows, args.limit)
 
@@ -97,6 +93,6 @@ def main():
 if __name__ == '__main__':
     try:
         main()
-    except urllib.error.HTTPError as error:
-        print(error.read().decode(), file=sys.stderr)
+    except ManagementApiError as error:
+        print(error.body, file=sys.stderr)
         raise
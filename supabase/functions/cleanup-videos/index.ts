@@ -7,17 +7,20 @@ Deno.serve(async (req) => {
   )
 
   try {
-    // 1. 获取 50 个最久未检查的活跃视频
+    // 1. 获取 50 个最久未检查的活跃视频 (按 last_verified_at 轮转)
     const { data: videos, error: fetchError } = await supabase
       .from('videos')
       .select('id, source_url')
       .eq('is_active', true)
-      .order('created_at', { ascending: true })
+      .order('last_verified_at', { ascending: true, nullsFirst: true })
       .limit(50)
 
     if (fetchError) throw fetchError
 
     const results = { checked: 0, deactivated: 0, errors: 0 }
+    const aliveIds: string[] = []
+    const deadIds: string[] = []
+    const errorIds: string[] = []
 
     // 2. 并发检查 URL 状态
     await Promise.all(videos.map(async (video) => {
@@ -28,20 +31,30 @@ Deno.serve(async (req) => {
           headers: { 'User-Agent': 'Mozilla/5.0' } 
         })
 
-        if (response.status === 404) {
+        if (response.status === 404 || response.status === 410) {
           // 如果 404，标记为非活跃
-          await supabase
-            .from('videos')
-            .update({ is_active: false })
-            .eq('id', video.id)
+          deadIds.push(video.id)
           results.deactivated++
+        } else if (response.status < 400) {
+          aliveIds.push(video.id)
+        } else {
+          errorIds.push(video.id)
         }
       } catch (e) {
         results.errors++
+        errorIds.push(video.id)
         console.error(`Failed to check ${video.source_url}:`, e)
       }
     }))
 
+    // 3. 一次性批量写回 last_verified_at / is_active
+    const { error: recordError } = await supabase.rpc('record_video_verification', {
+      alive_ids: aliveIds,
+      dead_ids: deadIds,
+      error_ids: errorIds,
+    })
+    if (recordError) throw recordError
+
     return new Response(JSON.stringify({ message: "Cleanup completed", ...results }), {
       headers: { "Content-Type": "application/json" },
     })
@@ -0,0 +1,204 @@
+-- Precomputed per-tag backfill backlog, kept current by statement-level triggers on public.videos.
+-- Replaces the per-tag nested scan in scripts/select_backfill_targets.py and supabase/sql/backfill_priority_queue.sql.
+
+create table if not exists public.video_backlog (
+  tag text not null,
+  source_site text not null,
+  backlog_count integer not null default 0,
+  missing_cover_count integer not null default 0,
+  pending_count integer not null default 0,
+  partial_count integer not null default 0,
+  metadata_gap_count integer generated always as (greatest(partial_count - missing_cover_count, 0)) stored,
+  latest_release_date date,
+  updated_at timestamptz not null default timezone('utc'::text, now()),
+  primary key (tag, source_site)
+);
+
+create index if not exists idx_video_backlog_source_site
+  on public.video_backlog (source_site, tag);
+
+-- One row per (tag, source_site) a video contributes to. A video only counts while it is
+-- active and still missing its cover or detail metadata, matching the selector filters.
+create or replace function public.video_backlog_contributions(
+  input_is_active boolean,
+  input_source_site text,
+  input_cover_url text,
+  input_detail_status text,
+  input_source_release_date date,
+  input_tags text[],
+  input_categories text[]
+)
+returns table (
+  tag text,
+  source_site text,
+  missing_cover integer,
+  pending integer,
+  partial integer,
+  source_release_date date
+)
+language sql
+immutable
+as $$
+  select distinct
+    t.tag,
+    coalesce(nullif(btrim(input_source_site), ''), 'unknown'),
+    case when input_cover_url is null then 1 else 0 end,
+    case when input_detail_status = 'pending' then 1 else 0 end,
+    case when input_detail_status = 'partial' then 1 else 0 end,
+    input_source_release_date
+  from unnest(coalesce(input_tags, '{}'::text[]) || coalesce(input_categories, '{}'::text[])) as t(tag)
+  where coalesce(input_is_active, true) = true
+    and (input_cover_url is null or input_detail_status in ('pending', 'partial'))
+    and coalesce(btrim(t.tag), '') <> '';
+$$;
+
+create or replace function public.sync_video_backlog()
+returns trigger
+language plpgsql
+as $$
+begin
+  if tg_op = 'INSERT' then
+    insert into public.video_backlog as b (
+      tag, source_site, backlog_count, missing_cover_count, pending_count, partial_count, latest_release_date, updated_at
+    )
+    select
+      c.tag,
+      c.source_site,
+      count(*)::int,
+      sum(c.missing_cover)::int,
+      sum(c.pending)::int,
+      sum(c.partial)::int,
+      max(c.source_release_date),
+      timezone('utc'::text, now())
+    from new_rows n
+    cross join lateral public.video_backlog_contributions(
+      n.is_active, n.source_site, n.cover_url, n.detail_status, n.source_release_date, n.tags, n.categories
+    ) c
+    group by c.tag, c.source_site
+    on conflict (tag, source_site) do update
+      set backlog_count = b.backlog_count + excluded.backlog_count,
+          missing_cover_count = b.missing_cover_count + excluded.missing_cover_count,
+          pending_count = b.pending_count + excluded.pending_count,
+          partial_count = b.partial_count + excluded.partial_count,
+          latest_release_date = greatest(b.latest_release_date, excluded.latest_release_date),
+          updated_at = excluded.updated_at;
+  elsif tg_op = 'UPDATE' then
+    insert into public.video_backlog as b (
+      tag, source_site, backlog_count, missing_cover_count, pending_count, partial_count, latest_release_date, updated_at
+    )
+    select
+      d.tag,
+      d.source_site,
+      sum(d.sign)::int,
+      sum(d.sign * d.missing_cover)::int,
+      sum(d.sign * d.pending)::int,
+      sum(d.sign * d.partial)::int,
+      max(d.source_release_date) filter (where d.sign > 0),
+      timezone('utc'::text, now())
+    from (
+      select -1 as sign, c.*
+      from old_rows o
+      cross join lateral public.video_backlog_contributions(
+        o.is_active, o.source_site, o.cover_url, o.detail_status, o.source_release_date, o.tags, o.categories
+      ) c
+      union all
+      select 1 as sign, c.*
+      from new_rows n
+      cross join lateral public.video_backlog_contributions(
+        n.is_active, n.source_site, n.cover_url, n.detail_status, n.source_release_date, n.tags, n.categories
+      ) c
+    ) d
+    group by d.tag, d.source_site
+    having sum(d.sign) <> 0
+      or sum(d.sign * d.missing_cover) <> 0
+      or sum(d.sign * d.pending) <> 0
+      or sum(d.sign * d.partial) <> 0
+      or max(d.source_release_date) filter (where d.sign > 0)
+         is distinct from max(d.source_release_date) filter (where d.sign < 0)
+    on conflict (tag, source_site) do update
+      set backlog_count = greatest(b.backlog_count + excluded.backlog_count, 0),
+          missing_cover_count = greatest(b.missing_cover_count + excluded.missing_cover_count, 0),
+          pending_count = greatest(b.pending_count + excluded.pending_count, 0),
+          partial_count = greatest(b.partial_count + excluded.partial_count, 0),
+          latest_release_date = greatest(b.latest_release_date, excluded.latest_release_date),
+          updated_at = excluded.updated_at;
+  elsif tg_op = 'DELETE' then
+    update public.video_backlog b
+    set backlog_count = greatest(b.backlog_count - d.backlog_count, 0),
+        missing_cover_count = greatest(b.missing_cover_count - d.missing_cover_count, 0),
+        pending_count = greatest(b.pending_count - d.pending_count, 0),
+        partial_count = greatest(b.partial_count - d.partial_count, 0),
+        updated_at = timezone('utc'::text, now())
+    from (
+      select
+        c.tag,
+        c.source_site,
+        count(*)::int as backlog_count,
+        sum(c.missing_cover)::int as missing_cover_count,
+        sum(c.pending)::int as pending_count,
+        sum(c.partial)::int as partial_count
+      from old_rows o
+      cross join lateral public.video_backlog_contributions(
+        o.is_active, o.source_site, o.cover_url, o.detail_status, o.source_release_date, o.tags, o.categories
+      ) c
+      group by c.tag, c.source_site
+    ) d
+    where b.tag = d.tag
+      and b.source_site = d.source_site;
+  end if;
+  return null;
+end;
+$$;
+
+-- Full rebuild. Also resets latest_release_date, which the incremental path can only move forward.
+create or replace function public.refresh_video_backlog()
+returns integer
+language plpgsql
+as $$
+declare
+  refreshed_rows integer;
+begin
+  delete from public.video_backlog where true;
+
+  insert into public.video_backlog (
+    tag, source_site, backlog_count, missing_cover_count, pending_count, partial_count, latest_release_date, updated_at
+  )
+  select
+    c.tag,
+    c.source_site,
+    count(*)::int,
+    sum(c.missing_cover)::int,
+    sum(c.pending)::int,
+    sum(c.partial)::int,
+    max(c.source_release_date),
+    timezone('utc'::text, now())
+  from public.videos v
+  cross join lateral public.video_backlog_contributions(
+    v.is_active, v.source_site, v.cover_url, v.detail_status, v.source_release_date, v.tags, v.categories
+  ) c
+  group by c.tag, c.source_site;
+
+  get diagnostics refreshed_rows = row_count;
+  return refreshed_rows;
+end;
+$$;
+
+drop trigger if exists trg_video_backlog_insert on public.videos;
+create trigger trg_video_backlog_insert
+  after insert on public.videos
+  referencing new table as new_rows
+  for each statement execute function public.sync_video_backlog();
+
+drop trigger if exists trg_video_backlog_update on public.videos;
+create trigger trg_video_backlog_update
+  after update on public.videos
+  referencing old table as old_rows new table as new_rows
+  for each statement execute function public.sync_video_backlog();
+
+drop trigger if exists trg_video_backlog_delete on public.videos;
+create trigger trg_video_backlog_delete
+  after delete on public.videos
+  referencing old table as old_rows
+  for each statement execute function public.sync_video_backlog();
+
+select public.refresh_video_backlog();
@@ -0,0 +1,143 @@
+-- DB-backed backfill work queue with lease/claim semantics.
+-- Several scraper workers (SCRAPER_RUN_MODE=queue_worker) can drain it in parallel without overlap.
+
+create table if not exists public.backfill_queue (
+  id bigserial primary key,
+  kind text not null,
+  external_id text not null,
+  source_url text not null,
+  source_site text,
+  title text,
+  priority double precision not null default 0,
+  status text not null default 'queued',
+  attempts integer not null default 0,
+  lease_owner text,
+  lease_expires_at timestamptz,
+  last_error text,
+  enqueued_at timestamptz not null default timezone('utc'::text, now()),
+  updated_at timestamptz not null default timezone('utc'::text, now()),
+  constraint backfill_queue_kind_check check (kind in ('null_cover', 'metadata')),
+  constraint backfill_queue_status_check check (status in ('queued', 'leased', 'done', 'failed')),
+  unique (kind, external_id)
+);
+
+create index if not exists idx_backfill_queue_claimable
+  on public.backfill_queue (kind, priority desc, id)
+  where status in ('queued', 'leased');
+
+create or replace function public.enqueue_backfill_targets(
+  queue_kind text,
+  source_filter text default 'missav',
+  limit_count integer default 1000
+)
+returns integer
+language plpgsql
+as $$
+declare
+  enqueued integer;
+begin
+  insert into public.backfill_queue as q (kind, external_id, source_url, source_site, title, priority)
+  select
+    queue_kind,
+    v.external_id,
+    v.source_url,
+    v.source_site,
+    v.title,
+    extract(epoch from coalesce(v.source_release_date::timestamptz, v.created_at))
+  from public.videos v
+  where coalesce(v.is_active, true) = true
+    and coalesce(btrim(v.source_url), '') <> ''
+    and (coalesce(source_filter, 'all') = 'all' or v.source_site = source_filter)
+    and (
+      (queue_kind = 'null_cover' and v.cover_url is null)
+      or (queue_kind = 'metadata' and v.cover_url is not null and v.detail_status in ('pending', 'partial'))
+    )
+  order by v.source_release_date desc nulls last, v.created_at desc
+  limit greatest(limit_count, 1)
+  on conflict (kind, external_id) do update
+    set status = 'queued',
+        attempts = 0,
+        lease_owner = null,
+        lease_expires_at = null,
+        source_url = excluded.source_url,
+        priority = excluded.priority,
+        enqueued_at = timezone('utc'::text, now()),
+        updated_at = timezone('utc'::text, now())
+    where q.status = 'done';
+
+  get diagnostics enqueued = row_count;
+  return enqueued;
+end;
+$$;
+
+create or replace function public.claim_backfill_targets(
+  queue_kind text,
+  worker_id text,
+  batch_size integer default 100,
+  lease_seconds integer default 600,
+  max_attempts integer default 5
+)
+returns setof public.backfill_queue
+language sql
+as $$
+  with candidates as (
+    select q.id
+    from public.backfill_queue q
+    where q.kind = queue_kind
+      and q.attempts < greatest(max_attempts, 1)
+      and (
+        q.status = 'queued'
+        or (q.status = 'leased' and q.lease_expires_at < timezone('utc'::text, now()))
+      )
+    order by q.priority desc, q.id
+    limit greatest(batch_size, 1)
+    for update skip locked
+  )
+  update public.backfill_queue q
+  set status = 'leased',
+      lease_owner = worker_id,
+      lease_expires_at = timezone('utc'::text, now()) + make_interval(secs => greatest(lease_seconds, 30)),
+      attempts = q.attempts + 1,
+      updated_at = timezone('utc'::text, now())
+  from candidates c
+  where q.id = c.id
+  returning q.*;
+$$;
+
+create or replace function public.ack_backfill_targets(
+  worker_id text,
+  done_ids bigint[] default '{}'::bigint[],
+  retry_ids bigint[] default '{}'::bigint[],
+  max_attempts integer default 5,
+  error_text text default null
+)
+returns integer
+language plpgsql
+as $$
+declare
+  acked integer;
+begin
+  update public.backfill_queue q
+  set status = case
+        when q.id = any(coalesce(done_ids, '{}'::bigint[])) then 'done'
+        when q.attempts >= greatest(max_attempts, 1) then 'failed'
+        else 'queued'
+      end,
+      last_error = case
+        when q.id = any(coalesce(done_ids, '{}'::bigint[])) then null
+        else coalesce(error_text, q.last_error)
+      end,
+      lease_owner = null,
+      lease_expires_at = null,
+      updated_at = timezone('utc'::text, now())
+  where q.lease_owner = worker_id
+    and q.status = 'leased'
+    and (
+      q.id = any(coalesce(done_ids, '{}'::bigint[]))
+      or q.id = any(coalesce(retry_ids, '{}'::bigint[]))
+    );
+
+  get diagnostics acked = row_count;
+  return acked;
+end;
+$$;
@@ -0,0 +1,38 @@
+-- Liveness verification rotation: pick the rows checked longest ago and record results set-based.
+
+create index if not exists idx_videos_active_last_verified_at
+  on public.videos (last_verified_at asc nulls first)
+  where is_active = true;
+
+create or replace function public.record_video_verification(
+  alive_ids uuid[] default '{}'::uuid[],
+  dead_ids uuid[] default '{}'::uuid[],
+  error_ids uuid[] default '{}'::uuid[]
+)
+returns integer
+language plpgsql
+as $$
+declare
+  updated integer;
+begin
+  update public.videos v
+  set last_verified_at = timezone('utc'::text, now()),
+      verify_status = case
+        when v.id = any(coalesce(dead_ids, '{}'::uuid[])) then 'dead'
+        when v.id = any(coalesce(alive_ids, '{}'::uuid[])) then 'alive'
+        else 'error'
+      end,
+      verify_fail_count = case
+        when v.id = any(coalesce(alive_ids, '{}'::uuid[])) then 0
+        else coalesce(v.verify_fail_count, 0) + 1
+      end,
+      is_active = case
+        when v.id = any(coalesce(dead_ids, '{}'::uuid[])) then false
+        else v.is_active
+      end
+  where v.id = any(coalesce(alive_ids, '{}'::uuid[]) || coalesce(dead_ids, '{}'::uuid[]) || coalesce(error_ids, '{}'::uuid[]));
+
+  get diagnostics updated = row_count;
+  return updated;
+end;
+$$;
@@ -0,0 +1,9 @@
+-- Adaptive page budgets: the planner writes its plan at run start and per-source page yields at the end.
+
+alter table public.scrape_runs
+  add column if not exists run_plan jsonb,
+  add column if not exists source_yields jsonb;
+
+create index if not exists idx_scrape_runs_source_yields_history
+  on public.scrape_runs (source, started_at desc)
+  where source_yields is not null;
@@ -0,0 +1,15 @@
+-- Cached MissAV source discovery. Index runs load these rows instead of crawling the genre hubs,
+-- and only revisit the hubs once the newest last_seen_at is older than DISCOVERY_CACHE_TTL_HOURS.
+
+create table if not exists public.discovered_sources (
+  url text primary key,
+  tag text not null,
+  source_site text not null default 'missav',
+  first_seen_at timestamptz not null default timezone('utc'::text, now()),
+  last_seen_at timestamptz not null default timezone('utc'::text, now()),
+  last_yield integer,
+  last_crawled_at timestamptz
+);
+
+create index if not exists idx_discovered_sources_site_yield
+  on public.discovered_sources (source_site, last_yield desc nulls last);
@@ -0,0 +1,50 @@
+-- Cover health checks: record the last HTTP check per cover and demote dead covers in bulk so the
+-- rows re-enter the null-cover backlog (cover_url is null) on the next selector run.
+
+alter table public.videos
+  add column if not exists cover_http_status integer,
+  add column if not exists cover_content_length bigint,
+  add column if not exists cover_checked_at timestamptz;
+
+create index if not exists idx_videos_active_cover_checked_at
+  on public.videos (cover_checked_at asc nulls first)
+  where is_active = true and cover_url is not null;
+
+create or replace function public.record_cover_checks(results jsonb default '[]'::jsonb)
+returns integer
+language plpgsql
+as $$
+declare
+  updated integer;
+begin
+  with checks as (
+    select
+      (r->>'id')::uuid as id,
+      r->>'outcome' as outcome,
+      nullif(r->>'http_status', '')::integer as http_status,
+      nullif(r->>'content_length', '')::bigint as content_length
+    from jsonb_array_elements(coalesce(results, '[]'::jsonb)) r
+  )
+  update public.videos v
+  set cover_checked_at = timezone('utc'::text, now()),
+      cover_http_status = c.http_status,
+      cover_content_length = coalesce(c.content_length, v.cover_content_length),
+      cover_url = case when c.outcome = 'dead' then null else v.cover_url end,
+      cover_status = case when c.outcome = 'dead' then 'missing' else v.cover_status end,
+      inventory_status = case
+        when c.outcome = 'dead'
+          then public.video_inventory_status(v.external_id, v.title, v.source_url, null, v.release_date, v.actors, v.tags)
+        else v.inventory_status
+      end,
+      detail_status = case
+        when c.outcome = 'dead'
+          then public.video_detail_status(null, v.duration, v.release_date, v.actors, v.tags)
+        else v.detail_status
+      end
+  from checks c
+  where v.id = c.id;
+
+  get diagnostics updated = row_count;
+  return updated;
+end;
+$$;
@@ -0,0 +1,14 @@
+-- Per-segment lastmod watermarks for sitemap discovery. A segment whose sitemap-index lastmod is
+-- not newer than its stored watermark is skipped on the next run.
+
+create table if not exists public.sitemap_watermarks (
+  url text primary key,
+  source_site text not null default 'missav',
+  lastmod timestamptz,
+  entry_count integer not null default 0,
+  new_count integer not null default 0,
+  scanned_at timestamptz not null default timezone('utc'::text, now())
+);
+
+create index if not exists idx_sitemap_watermarks_site
+  on public.sitemap_watermarks (source_site);
@@ -0,0 +1,10 @@
+-- Per-feed modified watermarks for 51cg WordPress ingestion. Each run asks the REST API (or RSS
+-- feed) only for posts modified after the stored watermark.
+
+create table if not exists public.feed_watermarks (
+  feed text primary key,
+  source_site text not null default '51cg',
+  modified_after timestamptz,
+  post_count integer not null default 0,
+  updated_at timestamptz not null default timezone('utc'::text, now())
+);
@@ -0,0 +1,78 @@
+-- Canonical content keys for MissAV variant slugs (-uncensored-leak, -chinese-subtitle,
+-- -english-subtitle). Variants of one title share a content_key so the app can show one card with
+-- variant badges. The rules mirror missav_content_key()/missav_variant() in scraper/main.py.
+
+create or replace function public.video_content_key(input_external_id text, input_source_site text)
+returns text
+language sql
+immutable
+as $$
+  select case
+    when coalesce(input_source_site, 'missav') <> 'missav' then null
+    when lower(coalesce(input_external_id, '')) !~ '^[a-z0-9]+(-[a-z0-9]+)*-[0-9]+[a-z]?(-uncensored-leak|-chinese-subtitle|-english-subtitle)?$' then null
+    else regexp_replace(lower(input_external_id), '-(uncensored-leak|chinese-subtitle|english-subtitle)$', '')
+  end;
+$$;
+
+create or replace function public.video_variant(input_external_id text, input_source_site text)
+returns text
+language sql
+immutable
+as $$
+  select case
+    when public.video_content_key(input_external_id, input_source_site) is null then null
+    else coalesce(substring(lower(input_external_id) from '-(uncensored-leak|chinese-subtitle|english-subtitle)$'), 'original')
+  end;
+$$;
+
+alter table public.videos
+  add column if not exists content_key text
+    generated always as (public.video_content_key(external_id, source_site)) stored,
+  add column if not exists variant text
+    generated always as (public.video_variant(external_id, source_site)) stored;
+
+create index if not exists idx_videos_content_key
+  on public.videos (content_key)
+  where content_key is not null;
+
+-- Sibling variants for a page of cards. Only ids whose content key has more than one active
+-- variant are returned.
+create or replace function public.get_video_variants(external_ids text[] default '{}'::text[])
+returns table (
+  external_id text,
+  content_key text,
+  variants jsonb
+)
+language sql
+stable
+as $$
+  with requested as (
+    select v.external_id, v.content_key
+    from public.videos v
+    where v.external_id = any(coalesce(external_ids, '{}'::text[]))
+      and v.content_key is not null
+  ),
+  groups as (
+    select
+      s.content_key,
+      jsonb_agg(
+        jsonb_build_object(
+          'external_id', s.external_id,
+          'variant', s.variant,
+          'title', s.title,
+          'source_url', s.source_url,
+          'cover_url', s.cover_url
+        )
+        order by (s.variant = 'original') desc, s.variant
+      ) as variants,
+      count(*) as variant_count
+    from public.videos s
+    where s.is_active = true
+      and s.content_key in (select distinct r.content_key from requested r)
+    group by s.content_key
+  )
+  select r.external_id, r.content_key, g.variants
+  from requested r
+  join groups g on g.content_key = r.content_key
+  where g.variant_count > 1;
+$$;
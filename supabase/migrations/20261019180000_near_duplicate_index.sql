@@ -0,0 +1,215 @@
+-- Near-duplicate index. video_fingerprints holds a 64-bit title SimHash, split into four 16-bit
+-- bands, and a cover-path fingerprint per video. The scraper only loads fingerprints that share a
+-- band or cover with the rows it is processing. Rows matched to an existing item keep their own
+-- row, but duplicate_of points at the canonical external_id.
+
+alter table public.videos
+  add column if not exists duplicate_of text;
+
+create index if not exists idx_videos_duplicate_of
+  on public.videos (duplicate_of)
+  where duplicate_of is not null;
+
+create table if not exists public.video_fingerprints (
+  external_id text primary key,
+  source_site text,
+  title_simhash bigint,
+  simhash_band_0 integer,
+  simhash_band_1 integer,
+  simhash_band_2 integer,
+  simhash_band_3 integer,
+  cover_fingerprint text,
+  duplicate_of text,
+  updated_at timestamptz not null default timezone('utc'::text, now())
+);
+
+create index if not exists idx_video_fingerprints_band_0 on public.video_fingerprints (simhash_band_0);
+create index if not exists idx_video_fingerprints_band_1 on public.video_fingerprints (simhash_band_1);
+create index if not exists idx_video_fingerprints_band_2 on public.video_fingerprints (simhash_band_2);
+create index if not exists idx_video_fingerprints_band_3 on public.video_fingerprints (simhash_band_3);
+create index if not exists idx_video_fingerprints_cover
+  on public.video_fingerprints (cover_fingerprint)
+  where cover_fingerprint is not null;
+
+-- Home sections hide linked duplicates; the canonical row stands in for them.
+drop function if exists public.get_home_payload(integer, integer);
+
+create or replace function public.get_home_payload(section_limit integer default 10, weekly_limit integer default 15)
+returns table (
+  section text,
+  id text,
+  external_id text,
+  title text,
+  cover_url text,
+  source_url text,
+  duration text,
+  source_release_date text,
+  created_at text,
+  actors text[],
+  tags text[],
+  inventory_status text,
+  detail_status text
+)
+language sql
+stable
+as $$
+  (
+    select
+      'new'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  )
+  union all
+  (
+    select
+      'monthly_hot'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and 'monthly_hot' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  )
+  union all
+  (
+    select
+      'weekly_hot'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and 'weekly_hot' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(weekly_limit, 1)
+  )
+  union all
+  (
+    select
+      'uncensored'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and 'uncensored' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  )
+  union all
+  (
+    select
+      'subtitled'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and 'subtitled' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  )
+  union all
+  (
+    select
+      'vr'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and 'vr' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  )
+  union all
+  (
+    select
+      '51cg'::text as section,
+      v.id::text,
+      v.external_id,
+      v.title,
+      v.cover_url,
+      v.source_url,
+      v.duration,
+      v.source_release_date::text,
+      v.created_at::text,
+      v.actors,
+      v.tags,
+      v.inventory_status,
+      v.detail_status
+    from public.videos v
+    where v.is_active = true
+      and v.duplicate_of is null
+      and '51cg' = any(public.normalize_known_taxonomy_aliases(coalesce(v.tags, '{}'::text[]) || coalesce(v.categories, '{}'::text[])))
+    order by v.source_release_date desc nulls last, v.created_at desc
+    limit greatest(section_limit, 1)
+  );
+$$;
@@ -0,0 +1,59 @@
+-- Detail attempt history. The scraper bumps detail_attempts on every detail fetch that leaves a row
+-- short of 'success', and pushes next_detail_attempt_at out with capped exponential backoff. It
+-- clears both once the row is complete. The smart detail policy, the queue selectors and
+-- enqueue_backfill_targets skip rows whose next attempt is still in the future.
+
+alter table public.videos
+  add column if not exists detail_attempts integer not null default 0,
+  add column if not exists detail_last_outcome text,
+  add column if not exists next_detail_attempt_at timestamptz;
+
+create index if not exists idx_videos_next_detail_attempt_at
+  on public.videos (next_detail_attempt_at)
+  where next_detail_attempt_at is not null;
+
+create or replace function public.enqueue_backfill_targets(
+  queue_kind text,
+  source_filter text default 'missav',
+  limit_count integer default 1000
+)
+returns integer
+language plpgsql
+as $$
+declare
+  enqueued integer;
+begin
+  insert into public.backfill_queue as q (kind, external_id, source_url, source_site, title, priority)
+  select
+    queue_kind,
+    v.external_id,
+    v.source_url,
+    v.source_site,
+    v.title,
+    extract(epoch from coalesce(v.source_release_date::timestamptz, v.created_at))
+  from public.videos v
+  where coalesce(v.is_active, true) = true
+    and coalesce(btrim(v.source_url), '') <> ''
+    and (coalesce(source_filter, 'all') = 'all' or v.source_site = source_filter)
+    and (v.next_detail_attempt_at is null or v.next_detail_attempt_at <= now())
+    and (
+      (queue_kind = 'null_cover' and v.cover_url is null)
+      or (queue_kind = 'metadata' and v.cover_url is not null and v.detail_status in ('pending', 'partial'))
+    )
+  order by v.source_release_date desc nulls last, v.created_at desc
+  limit greatest(limit_count, 1)
+  on conflict (kind, external_id) do update
+    set status = 'queued',
+        attempts = 0,
+        lease_owner = null,
+        lease_expires_at = null,
+        source_url = excluded.source_url,
+        priority = excluded.priority,
+        enqueued_at = timezone('utc'::text, now()),
+        updated_at = timezone('utc'::text, now())
+    where q.status = 'done';
+
+  get diagnostics enqueued = row_count;
+  return enqueued;
+end;
+$$;
@@ -0,0 +1,105 @@
+-- enqueue_backfill_targets used to apply its limit before the on-conflict filter. Rows already
+-- queued, leased or failed took slots in the top-N, so permanently failing new rows starved the older
+-- backlog. Those rows are now excluded before the limit.
+-- claim_backfill_targets skipped rows at max_attempts. An expired lease at the cap was never acked
+-- and stayed 'leased' forever. Each claim now marks such rows as failed.
+
+create or replace function public.enqueue_backfill_targets(
+  queue_kind text,
+  source_filter text default 'missav',
+  limit_count integer default 1000
+)
+returns integer
+language plpgsql
+as $$
+declare
+  enqueued integer;
+begin
+  insert into public.backfill_queue as q (kind, external_id, source_url, source_site, title, priority)
+  select
+    queue_kind,
+    v.external_id,
+    v.source_url,
+    v.source_site,
+    v.title,
+    extract(epoch from coalesce(v.source_release_date::timestamptz, v.created_at))
+  from public.videos v
+  where coalesce(v.is_active, true) = true
+    and coalesce(btrim(v.source_url), '') <> ''
+    and (coalesce(source_filter, 'all') = 'all' or v.source_site = source_filter)
+    and (v.next_detail_attempt_at is null or v.next_detail_attempt_at <= now())
+    and (
+      (queue_kind = 'null_cover' and v.cover_url is null)
+      or (queue_kind = 'metadata' and v.cover_url is not null and v.detail_status in ('pending', 'partial'))
+    )
+    and not exists (
+      select 1
+      from public.backfill_queue existing
+      where existing.kind = queue_kind
+        and existing.external_id = v.external_id
+        and existing.status <> 'done'
+    )
+  order by v.source_release_date desc nulls last, v.created_at desc
+  limit greatest(limit_count, 1)
+  on conflict (kind, external_id) do update
+    set status = 'queued',
+        attempts = 0,
+        lease_owner = null,
+        lease_expires_at = null,
+        source_url = excluded.source_url,
+        priority = excluded.priority,
+        enqueued_at = timezone('utc'::text, now()),
+        updated_at = timezone('utc'::text, now())
+    where q.status = 'done';
+
+  get diagnostics enqueued = row_count;
+  return enqueued;
+end;
+$$;
+
+create or replace function public.claim_backfill_targets(
+  queue_kind text,
+  worker_id text,
+  batch_size integer default 100,
+  lease_seconds integer default 600,
+  max_attempts integer default 5
+)
+returns setof public.backfill_queue
+language sql
+as $$
+  with abandoned as (
+    update public.backfill_queue q
+    set status = 'failed',
+        lease_owner = null,
+        lease_expires_at = null,
+        last_error = coalesce(q.last_error, 'lease expired at max attempts'),
+        updated_at = timezone('utc'::text, now())
+    where q.kind = queue_kind
+      and q.status = 'leased'
+      and q.lease_expires_at < timezone('utc'::text, now())
+      and q.attempts >= greatest(max_attempts, 1)
+    returning q.id
+  ),
+  candidates as (
+    select q.id
+    from public.backfill_queue q
+    where q.kind = queue_kind
+      and q.attempts < greatest(max_attempts, 1)
+      and (
+        q.status = 'queued'
+        or (q.status = 'leased' and q.lease_expires_at < timezone('utc'::text, now()))
+      )
+    order by q.priority desc, q.id
+    limit greatest(batch_size, 1)
+    for update skip locked
+  )
+  update public.backfill_queue q
+  set status = 'leased',
+      lease_owner = worker_id,
+      lease_expires_at = timezone('utc'::text, now()) + make_interval(secs => greatest(lease_seconds, 30)),
+      attempts = q.attempts + 1,
+      updated_at = timezone('utc'::text, now())
+  from candidates c
+  where q.id = c.id
+  returning q.*;
+$$;
@@ -0,0 +1,5 @@
+-- The end-of-run report (deadline, browser state, circuit breaker, profile) gets its own column.
+-- Before this, it was appended to error_summary and cut off by the 6000-character limit.
+
+alter table public.scrape_runs
+  add column if not exists run_report jsonb;
@@ -14,34 +14,29 @@ where is_active = true
 group by 1, 2
 order by total desc;
 
--- 2) Weighted tag backlog for metadata-focused backfill (MissAV-first)
+-- 2) Weighted tag backlog for metadata-focused backfill (MissAV-first, precomputed in public.video_backlog)
 select
   tag,
-  count(*)::int as backlog_count,
-  count(*) filter (where detail_status = 'pending')::int as pending_count,
-  count(*) filter (where detail_status = 'partial')::int as partial_count,
-  max(source_release_date) as latest_release_date
-from public.videos,
-     unnest(tags) as tag
-where is_active = true
-  and source_site = 'missav'
-  and detail_status in ('pending', 'partial')
-group by 1
+  backlog_count,
+  pending_count,
+  partial_count,
+  metadata_gap_count,
+  latest_release_date
+from public.video_backlog
+where source_site = 'missav'
+  and (pending_count > 0 or partial_count > 0)
 order by partial_count desc, pending_count desc, latest_release_date desc nulls last, tag asc
 limit 50;
 
--- 3) Weighted tag backlog for cover-focused backfill (MissAV-first)
+-- 3) Weighted tag backlog for cover-focused backfill (MissAV-first, precomputed in public.video_backlog)
 select
   tag,
-  count(*)::int as backlog_count,
-  count(*) filter (where cover_url is null or cover_status = 'missing')::int as missing_cover_count,
-  max(source_release_date) as latest_release_date
-from public.videos,
-     unnest(tags) as tag
-where is_active = true
-  and source_site = 'missav'
-  and (cover_url is null or cover_status = 'missing')
-group by 1
+  backlog_count,
+  missing_cover_count,
+  latest_release_date
+from public.video_backlog
+where source_site = 'missav'
+  and missing_cover_count > 0
 order by missing_cover_count desc, latest_release_date desc nulls last, tag asc
 limit 50;
 